@@ -0,0 +1,206 @@
+"""
+Benchmarks for how the controller library behaves as it grows.
+
+It makes fake libraries of different sizes in a temporary directory (a maya file, a json file and a screenshot
+for every controller) and times how long it takes to find them, read their info, search them and fill the UI.
+The UI is drawn offscreen so this can be run without a display.
+
+Tracing memory makes python several times slower, so each library is gone through twice:
+once to time every step, and once more with tracing on to record the peak memory of every step.
+
+Run it with mayapy so that it has access to Maya:
+
+    mayapy -m controllerLibrary.benchmark --sizes 1000 10000 100000 --output results.json
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+# tracemalloc tells us how much memory python used at its peak, but it only exists in Python 3
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from .fileUtils import timer
+
+# This is enough of a maya ascii file to look real to the library, which never reads inside it
+MAYA_FILE = '//Maya ASCII 2017 scene\n//Name: %s.ma\nrequires maya "2017";\n'
+
+
+class Measure(object):
+    """
+    Times the code inside it, or records the peak memory it used.
+    Never both at once, since tracing the memory slows down the code we'd be timing
+
+    with Measure(results, 'find'):
+        library.find()
+    with Measure(results, 'find', memory=True):
+        library.find()
+    """
+
+    def __init__(self, results, name, memory=False):
+        self.results = results
+        self.name = name
+        self.memory = memory
+
+    def __enter__(self):
+        if self.memory:
+            tracemalloc.start()
+        else:
+            self.start = timer()
+        return self
+
+    def __exit__(self, *args):
+        result = self.results.setdefault(self.name, {})
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result['peakMemory'] = peak
+        else:
+            result['seconds'] = timer() - self.start
+
+
+def makeLibrary(directory, count, screenshot):
+    """
+    Makes a fake library with the given number of controllers
+    Args:
+        directory: where to make it
+        count: how many controllers to make
+        screenshot: the bytes of the jpg to use for every screenshot
+    """
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    sides = ('left', 'right', 'center')
+    for i in range(count):
+        name = 'ctrl_%06d' % i
+        with open(os.path.join(directory, '%s.ma' % name), 'w') as f:
+            f.write(MAYA_FILE % name)
+        with open(os.path.join(directory, '%s.json' % name), 'w') as f:
+            json.dump({'name': name, 'side': sides[i % 3], 'group': 'group%s' % (i % 50),
+                       'screenshot': os.path.join(directory, '%s.jpg' % name)}, f, indent=4)
+        with open(os.path.join(directory, '%s.jpg' % name), 'wb') as f:
+            f.write(screenshot)
+
+
+def makeScreenshot(QtGui, QtCore):
+    # We use Qt to make a small jpg once, and then write the same bytes for every controller
+    image = QtGui.QImage(64, 64, QtGui.QImage.Format_RGB32)
+    image.fill(QtGui.QColor(80, 120, 200))
+    data = QtCore.QByteArray()
+    buff = QtCore.QBuffer(data)
+    buff.open(QtCore.QIODevice.WriteOnly)
+    image.save(buff, 'JPG')
+    return data.data()
+
+
+def measureLibrary(directory, result, app, populate=True, memory=False):
+    """
+    Goes through every step of using a library once, measuring each of them
+    Args:
+        directory: the library to use
+        result: the dictionary to put the measurements of each step in
+        app: the QApplication, so we can let the UI draw
+        populate: whether to measure filling the UI too
+        memory: whether to measure the peak memory of each step instead of timing it
+    """
+    from controllerLibrary import controllerLibrary
+
+    # We start from a new library every time, so both passes do exactly the same work
+    library = controllerLibrary.ControllerLibrary()
+
+    # The first find has to make every entry
+    with Measure(result, 'findCold', memory):
+        library.find(directory)
+
+    # The second find only has to check that nothing changed
+    with Measure(result, 'findWarm', memory):
+        library.find(directory)
+
+    with Measure(result, 'searchName', memory):
+        library.search('ctrl_0001')
+
+    # Reading every json file is the slow part that the library now avoids until it's needed
+    with Measure(result, 'parseInfo', memory):
+        for entry in library.values():
+            entry.info
+
+    with Measure(result, 'searchTag', memory):
+        library.search('side:left')
+
+    if populate:
+        # Building the UI finds and shows every controller in the directory, so that is what we time
+        # Calling populate again afterwards would only time a library that has already been found
+        with Measure(result, 'populate', memory):
+            ui = controllerLibrary.ControllerLibraryUI(directory=directory)
+            app.processEvents()
+        ui.deleteLater()
+        app.processEvents()
+
+
+def run(sizes, populate=True):
+    """
+    Runs the benchmarks for every size of library
+    Returns:
+        dict: the results for every size
+    """
+    # We draw the UI offscreen so that we don't need a display
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    from Qt import QtWidgets, QtGui, QtCore
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    screenshot = makeScreenshot(QtGui, QtCore)
+
+    results = {'python': sys.version.split()[0], 'sizes': {}}
+    root = tempfile.mkdtemp(prefix='controllerLibraryBenchmark')
+
+    try:
+        for size in sizes:
+            directory = os.path.join(root, str(size))
+            result = results['sizes'][str(size)] = {}
+
+            start = timer()
+            makeLibrary(directory, size, screenshot)
+            result['generate'] = {'seconds': timer() - start}
+
+            # We time everything first, and then go through it all again to measure the memory
+            measureLibrary(directory, result, app, populate)
+            if tracemalloc:
+                measureLibrary(directory, result, app, populate, memory=True)
+
+            print('%s controllers: %s' % (size, json.dumps(dict((k, round(v['seconds'], 4))
+                                                                for k, v in result.items()))))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the controller library with fake libraries",
+                                     usage="mayapy -m controllerLibrary.benchmark --sizes 1000 10000")
+    parser.add_argument('-s', '--sizes', nargs='+', type=int, default=[1000, 10000, 100000],
+                        help="The number of controllers in each library")
+    parser.add_argument('--no-populate', action='store_true', help="Skip timing the UI")
+    parser.add_argument('-o', '--output', help="The json file to write the results to. Defaults to printing them")
+    args = parser.parse_args()
+
+    results = run(args.sizes, populate=not args.no_populate)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+    else:
+        print(json.dumps(results, indent=4))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+A content addressed store for controllers.
+
+Instead of writing a new file every time a controller is saved, we name the data by its hash.
+If two controllers have exactly the same curves, or the same controller is saved again without changes,
+the data is only ever stored once. The library directory ends up looking like this:
+
+    blobs/3f/3f2a...e1.ctrl     the data of each unique controller, named by its hash
+    refs.json                   which hash each controller name points to, along with the older hashes it used to point to
+
+The library is usually shared, so several people may save into it at once. Every save reads refs.json again and
+merges its name in while holding refs.json.lock, so nobody's names are lost.
+"""
+import hashlib
+import json
+import os
+import time
+
+# We store our blobs as controller files so that they can be loaded like any other controller
+from . import controllerFormat
+
+# We write our files so that nobody ever sees one half written, and lock the refs while we change them
+from .fileUtils import lockFile, writeFile
+
+
+class BlobStore(object):
+    """
+    Stores data by its hash and keeps a pointer from each name to the hash it currently uses.
+
+    store = BlobStore('/path/to/library')
+    digest, isNew = store.put('star', data)
+    store.path(digest)
+    """
+
+    # The folder the blobs go in and the file that holds our names
+    blobDir = 'blobs'
+    refsFile = 'refs.json'
+    refsLock = 'refs.json.lock'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.refs = {}
+
+        # This set holds every hash we've stored, which makes checking for duplicates instant
+        self.hashes = set()
+
+        self.reload()
+
+    def reload(self):
+        # We read our names back in from disk
+        path = os.path.join(self.directory, self.refsFile)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.refs = json.load(f)
+        else:
+            self.refs = {}
+
+        self.hashes = set()
+        for ref in self.refs.values():
+            self.hashes.update(version['hash'] for version in ref['history'])
+
+    def hash(self, data):
+        # sha1 is plenty to tell controllers apart and gives us short names
+        return hashlib.sha1(data).hexdigest()
+
+    def path(self, digest):
+        # We split the blobs into folders by the first two letters of their hash
+        # so that no single folder ends up with too many files in it
+        return os.path.join(self.directory, self.blobDir, digest[:2], digest + controllerFormat.EXTENSION)
+
+    def __contains__(self, digest):
+        return digest in self.hashes
+
+    def put(self, name, data, **info):
+        """
+        Stores the data under the given name
+        Args:
+            name: the name of the controller
+            data: the bytes to store
+            **info: any extra info to record with this version
+
+        Returns:
+            tuple: the hash of the data, and whether it was new to the store
+        """
+        digest = self.hash(data)
+        path = self.path(digest)
+        # Somebody else may have stored the same data since we last read the refs, so we look on disk too
+        isNew = digest not in self.hashes and not os.path.exists(path)
+
+        # We only write the data if we've never seen it before.
+        # Blobs are named by their data, so two people writing the same one write the same file and don't need a lock
+        if isNew:
+            writeFile(path, data)
+
+        # But the refs are one file for everyone, so we read it again under the lock and only add our name to it
+        with lockFile(os.path.join(self.directory, self.refsLock)):
+            self.reload()
+            self.hashes.add(digest)
+            ref = self.refs.setdefault(name, {'hash': None, 'history': []})
+
+            # If the name already points at this data then there's nothing to record
+            if ref['hash'] != digest:
+                version = dict(info)
+                version['hash'] = digest
+                version['time'] = time.time()
+                ref['hash'] = digest
+                ref['history'].append(version)
+                self.save()
+
+        return digest, isNew
+
+    def get(self, name, version=-1):
+        """
+        Gives back the path to the data for a name
+        Args:
+            name: the name of the controller
+            version: which version to get. -1 is the latest, 0 is the first one ever saved
+        """
+        return self.path(self.refs[name]['history'][version]['hash'])
+
+    def history(self, name):
+        return list(self.refs[name]['history'])
+
+    def names(self):
+        return sorted(self.refs)
+
+    def mtime(self, name):
+        # The time the name was last pointed at new data
+        return self.refs[name]['history'][-1]['time']
+
+    def save(self):
+        # This writes all of our refs over the file, so it should only be called while holding the lock after a reload
+        writeFile(os.path.join(self.directory, self.refsFile),
+                  json.dumps(self.refs, indent=4, sort_keys=True).encode('utf-8'))
@@ -0,0 +1,305 @@
+"""
+Quick checks for the parts of the controller library. Run them from the top of the repository with
+
+    python runChecks.py controllerLibrary
+
+Each check makes whatever it needs in its own temporary directory.
+The HttpBackend is checked against a little web server we start ourselves, so nothing here needs the network.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+
+try:
+    from http.server import HTTPServer, SimpleHTTPRequestHandler
+except ImportError:
+    from BaseHTTPServer import HTTPServer
+    from SimpleHTTPServer import SimpleHTTPRequestHandler
+
+from . import controllerFormat
+from . import libraryPack
+from . import remoteLibrary
+from .blobStore import BlobStore
+from .searchIndex import SearchIndex
+
+
+def makeLibrary(directory, names):
+    """
+    Makes a small library with a maya file and a json file for every name
+    """
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    for name in names:
+        with open(os.path.join(directory, '%s.ma' % name), 'w') as f:
+            f.write('//Maya ASCII 2017 scene\n')
+        with open(os.path.join(directory, '%s.json' % name), 'w') as f:
+            json.dump({'name': name, 'side': 'left' if name.endswith('L') else 'right'}, f)
+
+
+def checkControllerFile(directory):
+    curves = [{'name': 'star', 'degree': 3, 'form': 0, 'matrix': [1.0] * 16,
+               'cvs': [0.0, 1.0, 2.0] * 4, 'knots': [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]}]
+    path = controllerFormat.write(os.path.join(directory, 'star' + controllerFormat.EXTENSION), curves)
+    assert controllerFormat.read(path)[0]['cvs'] == curves[0]['cvs']
+
+    # An array we got from the file can still be used after the file is closed
+    with controllerFormat.ControllerFile(path) as ctrl:
+        cvs = ctrl.cvs(ctrl.curves[0])
+    assert list(cvs) == curves[0]['cvs']
+
+    # And once we let go of it, the file can be replaced
+    del cvs
+    controllerFormat.write(path, curves)
+
+
+def checkBlobStore(directory):
+    store = BlobStore(directory)
+    digest, isNew = store.put('star', b'curves')
+    assert isNew
+    # The same data under another name is only stored once
+    same, isNew = store.put('starCopy', b'curves')
+    assert same == digest and not isNew
+
+    # A new store reads back what the first one saved
+    store = BlobStore(directory)
+    assert store.names() == ['star', 'starCopy']
+    with open(store.get('star'), 'rb') as f:
+        assert f.read() == b'curves'
+
+
+def checkSharedBlobStore(directory):
+    # Two people with the same library open each save a controller, and neither loses the other's
+    first = BlobStore(directory)
+    second = BlobStore(directory)
+    second.put('foo', b'foo curves')
+    first.put('bar', b'bar curves')
+    assert BlobStore(directory).names() == ['bar', 'foo']
+
+    # And the same when they save at the same time, which we do from a few threads that each have their own store
+    def saveMany(prefix):
+        store = BlobStore(directory)
+        for i in range(20):
+            store.put('%s%s' % (prefix, i), ('%s curves %s' % (prefix, i)).encode('utf-8'))
+
+    threads = [threading.Thread(target=saveMany, args=(prefix,)) for prefix in ('arm', 'leg', 'spine')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(BlobStore(directory).names()) == 62, BlobStore(directory).names()
+    assert not os.path.exists(os.path.join(directory, BlobStore.refsLock))
+
+    # A lock left behind by a Maya that crashed doesn't stop anybody saving for good
+    with open(os.path.join(directory, BlobStore.refsLock), 'w') as f:
+        f.write('12345')
+    old = time.time() - 3600
+    os.utime(os.path.join(directory, BlobStore.refsLock), (old, old))
+    first.put('baz', b'baz curves')
+    assert 'baz' in BlobStore(directory).names()
+
+
+def checkLibraryPack(directory):
+    library = os.path.join(directory, 'library')
+    makeLibrary(library, ['armL', 'legR'])
+
+    packPath = os.path.join(directory, 'library.zip')
+    libraryPack.pack(library, packPath)
+    assert libraryPack.isPack(packPath)
+
+    pack = libraryPack.LibraryPack(packPath)
+    try:
+        assert 'armL.ma' in pack and 'legR.json' in pack, pack.names()
+        assert json.loads(pack.read('armL.json').decode('utf-8'))['side'] == 'left'
+    finally:
+        pack.close()
+
+    unpacked = os.path.join(directory, 'unpacked')
+    libraryPack.unpack(packPath, unpacked)
+    assert sorted(os.listdir(unpacked)) == sorted(os.listdir(library))
+
+    # A controller called catalog keeps its info file, but the catalog and sync state of a mirror are left out
+    makeLibrary(library, ['catalog'])
+    libraryPack.pack(library, packPath)
+    pack = libraryPack.LibraryPack(packPath)
+    assert 'catalog.json' in pack, pack.names()
+    pack.close()
+
+    mirror = os.path.join(directory, 'mirror')
+    makeLibrary(mirror, ['armL'])
+    remoteLibrary.writeCatalog(mirror)
+    with open(os.path.join(mirror, remoteLibrary.STATE), 'w') as f:
+        f.write('{}')
+    libraryPack.pack(mirror, packPath)
+    pack = libraryPack.LibraryPack(packPath)
+    assert sorted(pack.names()) == ['armL.json', 'armL.ma'], pack.names()
+    pack.close()
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    # The directory to serve. Older versions of the handler can only serve the current directory, so we set it ourselves
+    root = None
+
+    def translate_path(self, path):
+        path = path.split('?', 1)[0].split('#', 1)[0]
+        return os.path.join(self.root, *[p for p in path.split('/') if p and p != '..'])
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(directory):
+    """
+    Serves a directory on a free port in a background thread
+    Returns:
+        HTTPServer: the server. Call shutdown on it when done
+    """
+    handler = type('Handler', (QuietHandler,), {'root': directory})
+    server = HTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+@contextlib.contextmanager
+def remoteBackend(directory, names):
+    """
+    Serves a small library and gives back an HttpBackend that mirrors it
+    Args:
+        directory: the directory to make the library and the mirror in
+        names: the names of the controllers in the library
+    """
+    library = os.path.join(directory, 'server')
+    makeLibrary(library, names)
+    remoteLibrary.writeCatalog(library)
+
+    server = serve(library)
+    try:
+        url = 'http://127.0.0.1:%s' % server.server_address[1]
+        backend = remoteLibrary.HttpBackend(url, mirror=os.path.join(directory, 'mirror'))
+        try:
+            yield library, backend
+        finally:
+            backend.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def checkHttpBackend(directory):
+    with remoteBackend(directory, ['armL', 'legR']) as (library, backend):
+        mirror = backend.sync()
+        assert backend.stats['downloaded'] == 4, backend.stats
+        # The mirror has every controller file, but not the catalog itself
+        assert sorted(f for f in os.listdir(mirror) if f != remoteLibrary.STATE) == \
+            sorted(f for f in os.listdir(library) if f != remoteLibrary.CATALOG), os.listdir(mirror)
+
+        # Removing a controller on the server removes it from the mirror, and nothing else is downloaded again
+        os.remove(os.path.join(library, 'legR.ma'))
+        os.remove(os.path.join(library, 'legR.json'))
+        remoteLibrary.writeCatalog(library)
+        backend.sync()
+        assert backend.stats['removed'] == 2 and backend.stats['downloaded'] == 0, backend.stats
+        assert not os.path.exists(os.path.join(mirror, 'legR.ma'))
+
+
+def checkConditionalDownloads(directory):
+    with remoteBackend(directory, ['armL']) as (library, backend):
+        # The server only gives us a last-modified we can use for files that weren't changed in the last second
+        old = time.time() - 100
+        for name in os.listdir(library):
+            os.utime(os.path.join(library, name), (old, old))
+        remoteLibrary.writeCatalog(library)
+        backend.sync()
+        assert backend.stats['downloaded'] == 2, backend.stats
+
+        # A file the catalog says has changed is still only downloaded if the server says it's different
+        os.utime(os.path.join(library, 'armL.ma'), (old - 100, old - 100))
+        remoteLibrary.writeCatalog(library)
+        backend.sync()
+        assert backend.stats['notModified'] == 1 and backend.stats['downloaded'] == 0, backend.stats
+
+        # Without the server, sync fails with an IOError and leaves the mirror alone
+        offline = remoteLibrary.HttpBackend('http://127.0.0.1:1', mirror=backend.mirror)
+        try:
+            offline.sync()
+        except IOError:
+            pass
+        else:
+            raise AssertionError('sync should fail without a server')
+        assert os.path.exists(os.path.join(backend.mirror, 'armL.ma'))
+
+
+def checkSearchIndex(directory):
+    index = SearchIndex(loader=lambda name: {'side': 'left' if name.endswith('L') else 'right'})
+    index.add('armL')
+    index.addMany([('legL', None), ('Arm_R', None), ('armL', None)])
+
+    assert len(index) == 3, index.names
+    assert index.names == ['Arm_R', 'armL', 'legL'], index.names
+    assert index.search('arm') == set(['armL', 'Arm_R'])
+    assert index.search('arm side:l') == set(['armL'])
+
+    index.remove('armL')
+    # Removing a name that isn't there is fine
+    index.remove('armL')
+    assert 'armL' not in index
+    assert index.search('side:l') == set(['legL'])
+
+
+def checkControllerLibrary(directory):
+    from . import controllerLibrary
+
+    # We read the library through the HttpBackend, which means the backend and the search index get checked too
+    with remoteBackend(directory, ['armL', 'legR']) as (server, backend):
+        library = controllerLibrary.ControllerLibrary(backend=backend)
+        library.find()
+        assert sorted(library) == ['armL', 'legR'], sorted(library)
+        assert library['armL']['side'] == 'left'
+        assert library.search('side:left') == set(['armL'])
+
+        # A screenshot added afterwards is picked up by the next find
+        with open(os.path.join(server, 'armL.jpg'), 'wb') as f:
+            f.write(b'jpg')
+        remoteLibrary.writeCatalog(server)
+        library.find()
+        assert library['armL'].screenshot, library['armL']
+
+        # Without the server we still find everything from the last sync
+        offline = controllerLibrary.ControllerLibrary(backend=remoteLibrary.HttpBackend('http://127.0.0.1:1',
+                                                                                         mirror=backend.mirror))
+        offline.find()
+        assert sorted(offline) == ['armL', 'legR'], sorted(offline)
+
+
+def checkFindPack(directory):
+    from . import controllerLibrary
+
+    library = os.path.join(directory, 'library')
+    makeLibrary(library, ['armL'])
+    packPath = os.path.join(directory, 'library.zip')
+    libraryPack.pack(library, packPath)
+
+    controllers = controllerLibrary.ControllerLibrary()
+    controllers.find(packPath)
+    assert sorted(controllers) == ['armL'], sorted(controllers)
+    old = controllers.packs[packPath]
+    old.extract('armL.ma')
+
+    # When the pack changes, the one we had open is closed and its extracted files are cleaned up
+    makeLibrary(library, ['legR'])
+    libraryPack.pack(library, packPath)
+    os.utime(packPath, (old.mtime + 10, old.mtime + 10))
+    controllers.find(packPath)
+    assert sorted(controllers) == ['armL', 'legR'], sorted(controllers)
+    assert controllers.packs[packPath] is not old and old.cache is None
+    controllers.packs[packPath].close()
+
+
+# The checks that work in plain Python
+CHECKS = [checkControllerFile, checkBlobStore, checkSharedBlobStore, checkLibraryPack, checkHttpBackend, checkConditionalDownloads, checkSearchIndex]
+
+# And the ones that need Maya, which are only run in mayapy
+MAYA_CHECKS = [checkControllerLibrary, checkFindPack]
@@ -0,0 +1,267 @@
+"""
+A compact binary format for controllers.
+
+Saving a controller as a full Maya ASCII scene is a lot of text to parse when all we really want back is a few curves.
+This module packs the curves of a controller into a single small file that looks like this:
+
+    magic     4 bytes   'CTRL'
+    version   uint32    the version of the format
+    indexSize uint64    the size of the index in bytes
+    index     json      a list with one entry per curve describing where its data lives
+    padding             spaces so that the data starts on an 8 byte boundary
+    data                contiguous little endian float64 arrays of matrices, CVs and knots
+
+Because all the numbers live in one contiguous block, we can memory map the file and look at the arrays directly
+without copying them or parsing any text. If NumPy is available we hand out NumPy arrays, otherwise memoryviews.
+
+The Maya specific parts (reading curves from the scene and rebuilding them) live in controllerLibrary.py
+"""
+
+# The struct module converts between python values and raw bytes
+import struct
+
+# The array module gives us compact arrays of numbers
+import array
+
+# mmap lets us map a file into memory so that we can read it without copying it
+import mmap
+
+import json
+import sys
+
+# NumPy is optional. It's the nicest way to work with arrays of numbers, but not every Maya install ships with it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The magic is the first few bytes of the file, it lets us quickly tell if a file is one of ours
+MAGIC = b'CTRL'
+
+# If we ever change the layout we bump the version so that old files can still be recognized
+VERSION = 1
+
+# The file extension we use for these files
+EXTENSION = '.ctrl'
+
+# The header is the magic, the version and the size of the index
+# < means little endian, 4s is 4 bytes, I is an unsigned int and Q is an unsigned long long
+HEADER = struct.Struct('<4sIQ')
+
+# Every number is stored as an 8 byte double
+ITEMSIZE = 8
+
+
+def pack(curves):
+    """
+    Packs a list of curves into the bytes of a controller file
+    Args:
+        curves (list): A list of dictionaries with the following keys
+                        name: the name of the curve shape
+                        transform: the name of the transform the shape lives under
+                        degree: the degree of the curve
+                        form: the form of the curve (1 open, 2 closed, 3 periodic)
+                        matrix: 16 floats with the world matrix of the transform
+                        cvs: a flat list of x, y, z values for every cv
+                        knots: the list of knot values
+
+    Returns:
+        bytes: The contents of the file
+    """
+    index = []
+    data = array.array('d')
+
+    for curve in curves:
+        entry = {
+            'name': curve['name'],
+            'transform': curve.get('transform', curve['name']),
+            'degree': int(curve['degree']),
+            'form': int(curve['form']),
+        }
+
+        # For each array we remember where it starts in the data block and how many numbers it holds
+        for key in ('matrix', 'cvs', 'knots'):
+            values = [float(v) for v in curve[key]]
+            entry[key] = [len(data) * ITEMSIZE, len(values)]
+            data.extend(values)
+
+        index.append(entry)
+
+    # We always write little endian, so on the rare big endian machine we swap the bytes first
+    if sys.byteorder != 'little':
+        data.byteswap()
+
+    # sort_keys makes sure the same curves always give us the exact same bytes
+    indexBytes = json.dumps(index, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+    # We pad the index so that the data block starts on an 8 byte boundary, which lets us view it as doubles
+    padding = -(HEADER.size + len(indexBytes)) % ITEMSIZE
+    indexBytes += b' ' * padding
+
+    header = HEADER.pack(MAGIC, VERSION, len(indexBytes))
+    return header + indexBytes + _toBytes(data)
+
+
+def canonicalize(curves, precision=6):
+    """
+    Puts the curves in a standard form so that the same controller always packs to the exact same bytes.
+    The curves are sorted by name and every number is rounded, so tiny floating point differences don't count as changes.
+    Args:
+        curves (list): the curve dictionaries described in pack()
+        precision (int): the number of decimal places to keep
+
+    Returns:
+        list: new curve dictionaries
+    """
+    canonical = []
+    for curve in sorted(curves, key=lambda c: (c.get('transform', c['name']), c['name'])):
+        data = dict(curve)
+        data.setdefault('transform', data['name'])
+        for key in ('matrix', 'cvs', 'knots'):
+            # Adding 0.0 turns -0.0 into 0.0, otherwise they would give different bytes
+            data[key] = [round(float(v), precision) + 0.0 for v in curve[key]]
+        canonical.append(data)
+    return canonical
+
+
+def write(path, curves):
+    """
+    Writes the given curves to a controller file. See pack() for what the curves should look like.
+    """
+    with open(path, 'wb') as f:
+        f.write(pack(curves))
+    return path
+
+
+def isControllerFile(path):
+    """
+    Checks the magic of the given file to see if it's a controller file
+    """
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class ControllerFile(object):
+    """
+    Reads a controller file by memory mapping it.
+
+    The arrays it gives back point straight into the mapped file so nothing is copied.
+    Each array keeps the mapping alive, so it stays valid even after the file is closed,
+    and the file is only unmapped once we and every array are done with it.
+    On Windows a file can't be replaced while it's mapped, so copy the arrays with list() if you keep them around.
+    Use it with the with statement like so
+
+    with ControllerFile('star.ctrl') as ctrl:
+        for curve in ctrl.curves:
+            print(curve['name'], ctrl.cvs(curve))
+    """
+
+    def __init__(self, path=None, data=None):
+        # We can either map a file on disk, or read from bytes we already have in memory
+        self.path = path
+        self._file = None
+
+        if data is None:
+            self._file = open(path, 'rb')
+            # A length of 0 maps the whole file, and ACCESS_READ keeps it read only
+            data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._data = data
+
+        magic, version, indexSize = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("%s is not a controller file" % path)
+        if version > VERSION:
+            self.close()
+            raise ValueError("%s was written with a newer version (%s) of the controller format" % (path, version))
+
+        indexStart = HEADER.size
+        self.curves = json.loads(bytes(data[indexStart:indexStart + indexSize]).decode('utf-8'))
+
+        # This is where the block of numbers starts
+        self._offset = indexStart + indexSize
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        # We close the file, which the map doesn't need once it's made, and let go of the map.
+        # We don't close the map ourselves: Python 3 won't while arrays we handed out still use it,
+        # and Python 2 would let it and then crash when they're read. Once nothing uses it, it's unmapped by itself
+        if self._file:
+            self._file.close()
+            self._file = None
+        self._data = None
+
+    def array(self, curve, key):
+        """
+        Gives back one of the arrays of a curve without copying it
+        Args:
+            curve (dict): an entry from self.curves
+            key (str): matrix, cvs or knots
+
+        Returns:
+            numpy.ndarray or memoryview: The array of doubles
+        """
+        start, count = curve[key]
+        start += self._offset
+
+        if numpy is not None:
+            return numpy.frombuffer(self._data, dtype='<f8', count=count, offset=start)
+
+        view = memoryview(self._data)[start:start + count * ITEMSIZE]
+        # Python 3 lets us view the bytes as doubles directly
+        if hasattr(view, 'cast') and sys.byteorder == 'little':
+            return view.cast('d')
+
+        # Older pythons have to copy the numbers into an array
+        values = array.array('d')
+        _fromBytes(values, view.tobytes())
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return values
+
+    def matrix(self, curve):
+        return self.array(curve, 'matrix')
+
+    def cvs(self, curve):
+        return self.array(curve, 'cvs')
+
+    def knots(self, curve):
+        return self.array(curve, 'knots')
+
+    def toCurves(self):
+        """
+        Copies everything out of the file into plain lists, in the same layout that pack() takes
+        """
+        curves = []
+        for curve in self.curves:
+            data = dict(curve)
+            for key in ('matrix', 'cvs', 'knots'):
+                data[key] = list(self.array(curve, key))
+            curves.append(data)
+        return curves
+
+
+def read(path):
+    """
+    A convenience function to read all the curves out of a controller file into plain lists
+    """
+    with ControllerFile(path) as ctrl:
+        return ctrl.toCurves()
+
+
+# array.tobytes and array.frombytes were called tostring and fromstring in Python 2
+def _toBytes(values):
+    return values.tobytes() if hasattr(values, 'tobytes') else values.tostring()
+
+
+def _fromBytes(values, data):
+    if hasattr(values, 'frombytes'):
+        values.frombytes(data)
+    else:
+        values.fromstring(data)
@@ -19,9 +19,33 @@ import os
 # It is used to format dictionaries in a nice way
 import pprint
 
+# contextlib lets us make our own context managers to use with the with statement
+import contextlib
+
+# shutil helps us move files around
+import shutil
+
 # Finally this is our old faithful maya library
 from maya import cmds
 
+# We'll also use the newer python Maya API to read and create curves quickly
+from maya.api import OpenMaya as om
+
+# This is our own module that knows how to read and write the compact binary controller files
+from . import controllerFormat
+
+# And this one stores controllers by their hash so that identical controllers are only saved once
+from .blobStore import BlobStore
+
+# And this one lets us read a whole library from a single packed file
+from . import libraryPack
+
+# And this one lets us search our controllers quickly
+from .searchIndex import SearchIndex
+
+# And finally we'll use this timer to measure how long each controller takes to load
+from .fileUtils import timer
+
 
 # We want to create a default directory that we can refer to later
 # We use os.path.join because it uses the correct path separator for our operating system
@@ -30,12 +54,142 @@ from maya import cmds
 DIRECTORY = os.path.join( cmds.internalVar(userAppDir=True), 'controllerLibrary')
 
 
+# Each controller we find is stored as one of these entries
+# Reading every json file up front is slow when all we want is a list of names,
+# so an entry only knows the few things we get for free from listing the directory,
+# and it reads the json file the first time someone actually asks for the info inside it
+class ControllerEntry(object):
+    # __slots__ tells python exactly which attributes this class has
+    # This means it doesn't need to make a dictionary for every instance, which saves a lot of memory on big libraries
+    __slots__ = ('name', 'path', 'mtime', 'screenshot', 'infoFile', 'infoMtime', 'pack', '_info')
+
+    def __init__(self, name, path, mtime=None, screenshot=None, infoFile=None, info=None, pack=None):
+        self.name = name
+        self.path = path
+        self.mtime = mtime
+        self.screenshot = screenshot
+        self.infoFile = infoFile
+        # When the json file was last changed when we read it, so find can tell if it needs reading again
+        self.infoMtime = None
+        # If the controller lives inside a library pack, this is the pack and the paths are the names of files inside it
+        self.pack = pack
+        # If we were given the info already (like when we save), we don't ever need to read the file
+        self._info = info
+
+    @property
+    def info(self):
+        # The first time we are asked for the info, we read it from the json file and hold on to it
+        if self._info is None:
+            if self.pack and self.infoFile:
+                self._info = json.loads(self.pack.read(self.infoFile).decode('utf-8'))
+            elif self.infoFile and os.path.exists(self.infoFile):
+                self.infoMtime = os.path.getmtime(self.infoFile)
+                with open(self.infoFile, 'r') as f:
+                    self._info = json.load(f)
+            else:
+                self._info = {}
+        return self._info
+
+    @property
+    def loaded(self):
+        # Lets other code check if the info has been read without reading it
+        return self._info is not None
+
+    # The rest of these methods let an entry act like the dictionaries we used to store
+    # The name, path and screenshot come from the entry itself, everything else comes from the info
+    def __getitem__(self, key):
+        if key == 'name':
+            return self.name
+        if key == 'path':
+            return self.path
+        if key == 'screenshot' and self.screenshot:
+            return self.screenshot
+        return self.info[key]
+
+    def __setitem__(self, key, value):
+        if key in ('name', 'path', 'screenshot'):
+            setattr(self, key, value)
+        else:
+            self.info[key] = value
+
+    def __contains__(self, key):
+        return key in ('name', 'path') or key in self.info
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self.asDict().keys())
+
+    def items(self):
+        return list(self.asDict().items())
+
+    def asDict(self):
+        data = dict(self.info)
+        data['name'] = self.name
+        data['path'] = self.path
+        if self.screenshot:
+            data['screenshot'] = self.screenshot
+        return data
+
+    def __repr__(self):
+        return repr(self.asDict())
+
+
 # We start by creating our code so that it can work without the UI
 # Dictionaries are a good way to store data
 # We aren't adding much, so it's easiest to just inherit from a dictionary.
 # This lets our library act like its a dictionary while giving us our custom features
 class ControllerLibrary(dict):
 
+    def __init__(self, backend=None):
+        super(ControllerLibrary, self).__init__()
+        # We keep one blob store per directory so that its index of hashes is only read once
+        self.stores = {}
+
+        # Similarly we keep any library packs we've opened so that we only read their index once
+        self.packs = {}
+
+        # The search index lets us find controllers by name or info instantly
+        # It reads an entry's info only when a search needs it
+        self.index = SearchIndex(loader=lambda name: self[name].info)
+
+        # A backend lets us find controllers that aren't on our own disk, like the HttpBackend in remoteLibrary.py
+        # It copies the library to a local directory for us, and we read that directory like any other
+        self.backend = backend
+
+    # Every time find or save stores an entry in us, we update the search index too
+    # That way the index is always in sync without having to rebuild it
+    def __setitem__(self, name, entry):
+        super(ControllerLibrary, self).__setitem__(name, entry)
+        # If the entry has already read its info, we may as well index its tags now
+        self.index.add(name, info=entry.info if entry.loaded else None)
+
+    def __delitem__(self, name):
+        super(ControllerLibrary, self).__delitem__(name)
+        self.index.remove(name)
+
+    def addEntries(self, entries):
+        """
+        Stores many entries at once. find uses this so that the search index is sorted once instead of once per entry
+        Args:
+            entries: a list of ControllerEntry
+        """
+        for entry in entries:
+            super(ControllerLibrary, self).__setitem__(entry.name, entry)
+        self.index.addMany((entry.name, entry.info if entry.loaded else None) for entry in entries)
+
+    def search(self, query):
+        """
+        Searches the library by name and info. See searchIndex.py for what the query can look like
+        Returns:
+            set: the names of the controllers that matched
+        """
+        return self.index.search(query)
+
     # First of all we need a function to create a directory
     # We allow the code to set another directory, but we set a default value of our current directory
     def createDir(self, directory=DIRECTORY):
@@ -49,20 +203,22 @@ class ControllerLibrary(dict):
     # similar to how we used *args in the previous example to capture all arguments
     # ** is used to capture all keyword arguments into the variable called info
     # Info will be a dictionary
-    def save(self, name, screenshot=True, directory=DIRECTORY, **info):
+    def save(self, name, screenshot=True, directory=DIRECTORY, format='ma', **info):
         """
         The save function will save the current scene as a controller
         Args:
             name: the name to save the controller as
             screenshot: Whether or not to save a screenshot
             directory: the directory to save to
+            format: 'ma' to save a maya ascii file, 'ctrl' to save only the curves in the compact binary format,
+                    or 'blob' to save the curves in the binary format inside the content addressed blob store
             **info: any extra info we might want to store
         """
         # We will start by creating the directory just to make sure it exists
         self.createDir(directory)
 
-        # We use the same os.path.join to construct the name of our output maya file
-        path = os.path.join(directory, '%s.ma' % name)
+        # We use the same os.path.join to construct the name of our output file
+        path = os.path.join(directory, '%s.%s' % (name, format))
 
         # Similarly we construct the name of our json file that will store any info
         infoFile = os.path.join(directory, '%s.json' % name)
@@ -73,21 +229,44 @@ class ControllerLibrary(dict):
             # Then we use the return value of that to store in the info dictionary
             info['screenshot'] = self.saveScreenshot(name, directory=directory)
 
+        if format == 'blob':
+            # The blob store names the data by its hash, so saving the same curves again costs us nothing
+            # We put the curves in a standard form first so that the same controller always gives the same hash
+            curves = controllerFormat.canonicalize(getCurveData(selection=bool(cmds.ls(selection=True))))
+            store = self.getStore(directory)
+            digest, isNew = store.put(name, controllerFormat.pack(curves))
+            path = store.path(digest)
+            info['hash'] = digest
+
+            # Let whoever called us know if this exact controller was already in the library
+            if not isNew:
+                cmds.warning('%s is identical to a controller that is already stored, reusing it' % name)
+
         # We store some more information in the info dictionary
         info['name'] = name
         info['path'] = path
 
-        # Now we rename the file to what we want it to be saved as
-        cmds.file(rename=path)
-
-        # If something is selected, we only export the selection, otherwise we save the wholefile
-        if cmds.ls(selection=True):
-            cmds.file(force=True, exportSelected=True)
+        if format == 'blob':
+            # The data is already saved, so there's nothing more to write
+            pass
+        elif format == 'ctrl':
+            # The binary format only stores curves, so we read them from the selection (or the scene) and write them out
+            controllerFormat.write(path, getCurveData(selection=bool(cmds.ls(selection=True))))
         else:
-            cmds.file(save=True, force=True)
+            # Now we rename the file to what we want it to be saved as
+            cmds.file(rename=path)
+
+            # If something is selected, we only export the selection, otherwise we save the wholefile
+            if cmds.ls(selection=True):
+                cmds.file(force=True, exportSelected=True)
+            else:
+                cmds.file(save=True, force=True)
 
         # Since we are a dictionary, we can save data to ourself
-        self[name] = info
+        # We already have the info, so the entry never has to read it back from disk
+        mtime = self.getStore(directory).mtime(name) if format == 'blob' else os.path.getmtime(path)
+        self[name] = ControllerEntry(name, path, mtime=mtime, screenshot=info.get('screenshot'),
+                                     infoFile=infoFile, info=info)
 
         # Finally we open a file to write to on disk
         # The with keyword is used to denote a context wheree the file is called f
@@ -98,81 +277,583 @@ class ControllerLibrary(dict):
             # and we give each line an indentation of 4 spaces to be easy to read
             json.dump(info, f, indent=4)
 
+        # We just wrote the info ourselves, so the entry doesn't need to read it again
+        self[name].infoMtime = os.path.getmtime(infoFile)
+
     # Now we have a find function that will be used to find all the controllers in the given directory
     def find(self, directory=DIRECTORY):
+        # If we have a backend, we ask it to bring its copy of the library up to date and look there instead
+        if self.backend:
+            try:
+                directory = self.backend.sync()
+            except (IOError, OSError) as e:
+                # If we can't reach the server we can still show everything from the last time we could
+                directory = self.backend.mirror
+                cmds.warning("Could not update the controller library, showing the copy from the last update (%s)" % e)
+
         # First we check if the directory even exists, because why waste our time otherwise?
         if not os.path.exists(directory):
             return
 
+        # A library pack is a single file with the whole library inside it, so it gets its own method
+        if libraryPack.isPack(directory):
+            return self.findPack(directory)
+
         # Now we list all the files in that directory
-        files = os.listdir(directory)
+        # We keep them in a set so that checking if a file exists is instant
+        files = set(os.listdir(directory))
 
-        # We are only interested in finding all the maya ascii files
+        # We are only interested in finding all the maya ascii files and our binary controller files
         # We use list comprehension to reduce the files we're looking at
-        mayaFiles = [f for f in files if f.endswith('.ma')]
+        # We sort them so that if a controller is saved in both formats, the binary one comes last and wins
+        mayaFiles = sorted([f for f in files if f.endswith(('.ma', controllerFormat.EXTENSION))],
+                           key=lambda f: f.endswith(controllerFormat.EXTENSION))
+
+        # We gather up the new entries by name and store them all at once when we're done
+        entries = {}
 
         # Now we loop through the maya files we found
         for ma in mayaFiles:
             # We grab the name and the file extension of the file
             name, ext = os.path.splitext(ma)
+            path = os.path.join(directory, ma)
 
-            # We'll have to construct the name of the screenshot and the json file so that we can find them
-            infoFile = '%s.json' % name
-            screenshot = '%s.jpg' % name
+            # If the controller is saved in both formats the binary one wins, so we don't need to look at the other
+            if ext == '.ma' and name + controllerFormat.EXTENSION in files:
+                continue
 
-            # If the infoFile exists, we'll construct its full path and try to read it in
-            if infoFile in files:
-                infoFile = os.path.join(directory, infoFile)
+            # We only need to know when the file last changed
+            mtime = os.path.getmtime(path)
 
-                # Similar to the way we wrote out the file, we'll read it in
-                with open(infoFile, 'r') as f:
-                    # The JSON module will read our file, and convert it to a python dictionary
-                    data = json.load(f)
-            else:
-                # But if the file doesn't exist, we'll just make an empty dictionary
-                data = {}
+            # If we already have this controller and it hasn't changed, we keep the entry we have
+            # That way any info we've already read doesn't need to be read again
+            existing = dict.get(self, name)
+            if existing is not None and existing.path == path and existing.mtime == mtime:
+                # The screenshot and json file can be added or changed without touching the controller though
+                self.refreshSidecars(existing, directory, files)
+                continue
 
-            # If we have a screenshot, lets store the info in the dictionary so we know where to find it later
-            if screenshot in files:
-                data['screnshot'] = os.path.join(directory, screenshot)
-
-            # Then lets store some basic information
-            data['name'] = name
-            data['path'] = os.path.join(directory, ma)
+            # We'll have to construct the name of the screenshot and the json file so that we can find them
+            # We don't read the json file here. The entry will do that when the info is needed
+            infoFile = '%s.json' % name
+            screenshot = '%s.jpg' % name
 
-            # Finally since we're a dictionary, we can save data to ourselves like we would to a dictionary
-            self[name] = data
+            # Finally we make the entry, which we'll save to ourselves like we would to a dictionary
+            entries[name] = ControllerEntry(
+                name, path, mtime=mtime,
+                screenshot=os.path.join(directory, screenshot) if screenshot in files else None,
+                infoFile=os.path.join(directory, infoFile) if infoFile in files else None
+            )
+
+        # The blob store below checks which of these we already have, so we store them before moving on
+        self.addEntries(list(entries.values()))
+
+        # Controllers saved into the blob store are listed in its refs file instead of having their own files
+        if BlobStore.refsFile in files:
+            store = self.getStore(directory)
+            store.reload()
+
+            entries = []
+            for name in store.names():
+                path = store.get(name)
+                mtime = store.mtime(name)
+
+                # If the controller is also saved as a regular file, we use whichever was saved last
+                existing = dict.get(self, name)
+                if existing is not None and (existing.path == path or existing.mtime > mtime):
+                    if existing.path == path:
+                        self.refreshSidecars(existing, directory, files)
+                    continue
+
+                entries.append(ControllerEntry(
+                    name, path, mtime=mtime,
+                    screenshot=os.path.join(directory, '%s.jpg' % name) if '%s.jpg' % name in files else None,
+                    infoFile=os.path.join(directory, '%s.json' % name) if '%s.json' % name in files else None
+                ))
+            self.addEntries(entries)
+
+    def refreshSidecars(self, entry, directory, files):
+        """
+        Picks up a screenshot or json file that was added, removed or changed since we made an entry
+        Args:
+            entry: the ControllerEntry we're keeping
+            directory: the library directory
+            files: the set of files in the directory
+        """
+        screenshot = '%s.jpg' % entry.name
+        entry.screenshot = os.path.join(directory, screenshot) if screenshot in files else None
+
+        infoFile = '%s.json' % entry.name
+        infoFile = os.path.join(directory, infoFile) if infoFile in files else None
+
+        # If we've read the info and its file has changed since, we forget it so that it's read again when needed
+        # We only need to check the time on files we've actually read
+        if entry.loaded and (infoFile != entry.infoFile or
+                             (infoFile and os.path.getmtime(infoFile) != entry.infoMtime)):
+            entry._info = None
+            # The search index has the old info's tags, so we add it again without them
+            self.index.add(entry.name)
+        entry.infoFile = infoFile
+
+    def findPack(self, path):
+        """
+        Finds all the controllers inside a library pack.
+        The pack's index tells us about every file, so we never have to read any of the files themselves here
+        """
+        # We keep the pack open so that entries can read their info and screenshots from it later
+        pack = self.packs.get(path)
+        if pack is None or pack.mtime != os.path.getmtime(path):
+            # The pack changed, so we let go of the old one's file handle and the files we extracted from it
+            if pack is not None:
+                pack.close()
+            pack = self.packs[path] = libraryPack.LibraryPack(path)
+
+        members = set(pack.names())
+
+        # We find the controllers exactly like we do in a directory, but the paths are names inside the pack
+        controllers = [(os.path.splitext(m)[0], m) for m in members
+                       if '/' not in m and m.endswith(('.ma', controllerFormat.EXTENSION))]
+
+        # Controllers from the blob store are listed in its refs file, which we read from the pack
+        if BlobStore.refsFile in members:
+            refs = json.loads(pack.read(BlobStore.refsFile).decode('utf-8'))
+            for name, ref in refs.items():
+                digest = ref['hash']
+                controllers.append((name, '%s/%s/%s%s' % (BlobStore.blobDir, digest[:2], digest,
+                                                          controllerFormat.EXTENSION)))
+
+        # Binary controllers come last, so if a controller is in both formats the binary one wins
+        self.addEntries([ControllerEntry(
+            name, member, mtime=pack.mtimeOf(member), pack=pack,
+            screenshot='%s.jpg' % name if '%s.jpg' % name in members else None,
+            infoFile='%s.json' % name if '%s.json' % name in members else None
+        ) for name, member in sorted(controllers, key=lambda c: c[1].endswith(controllerFormat.EXTENSION))])
+
+    def getStore(self, directory=DIRECTORY):
+        # We only make one blob store for each directory
+        if directory not in self.stores:
+            self.stores[directory] = BlobStore(directory)
+        return self.stores[directory]
+
+    # This function will be used to load the controllers with the given names
+    def load(self, names, namespace=None):
+        """
+        Imports one or more controllers in a single batch
+        Args:
+            names: a controller name, or a list where each item is either a name or a dictionary with these keys
+                    name: the name of the controller
+                    namespace: an optional namespace to import it into
+                    translate, rotate, scale: optional transforms to set on the top nodes of the controller
+            namespace: a namespace to use for any items that don't give their own
+
+        Returns:
+            list: a dictionary for every controller with its name, the nodes it made and how many seconds it took
+        """
+        # We allow a single name to be given to keep this simple for the common case
+        if not isinstance(names, (list, tuple)):
+            names = [names]
+
+        report = []
+
+        # Importing many files at once is slow if Maya redraws and records an undo for every one of them
+        # So we do all of them inside a single batch
+        with sceneBatch('loadControllers'):
+            for item in names:
+                # Every item becomes a dictionary so that the logic below only has to deal with one kind of thing
+                if not isinstance(item, dict):
+                    item = {'name': item}
+
+                start = timer()
+                nodes = self.loadOne(item['name'], namespace=item.get('namespace', namespace))
+
+                # If we've been given any transforms, we set them on all the top level nodes in one call
+                transforms = dict((key, item[key]) for key in ('translate', 'rotate', 'scale') if key in item)
+                roots = cmds.ls(nodes, assemblies=True, long=True)
+                if transforms and roots:
+                    cmds.xform(roots, **transforms)
+
+                report.append({'name': item['name'], 'nodes': nodes, 'seconds': timer() - start})
+
+        return report
+
+    def loadOne(self, name, namespace=None):
+        # This imports a single controller and gives back the nodes it created
+        entry = self[name]
+        path = entry.path
+
+        # Binary controllers aren't maya files, so we build their curves ourselves
+        if path.endswith(controllerFormat.EXTENSION):
+            # If it's in a pack, we can read it straight out of the pack without extracting it
+            if entry.pack:
+                return buildCurves(controllerFormat.ControllerFile(data=entry.pack.read(path)), namespace=namespace)
+
+            with controllerFormat.ControllerFile(path) as ctrl:
+                return buildCurves(ctrl, namespace=namespace)
+
+        # The file command can only read files from disk, so maya files in a pack have to be extracted first
+        # We only extract the one file we need
+        if entry.pack:
+            path = entry.pack.extract(path)
+
+        # We tell the file command to import and give us back the nodes it made
+        # If we weren't given a namespace we tell it to not use any nameSpaces
+        if namespace:
+            return cmds.file(path, i=True, namespace=namespace, returnNewNodes=True)
+        return cmds.file(path, i=True, usingNamespaces=False, returnNewNodes=True)
+
+    # These two functions convert an existing controller between the maya ascii and binary formats
+    def convertToBinary(self, name, directory=DIRECTORY):
+        info = self[name]
+        path = os.path.join(directory, '%s%s' % (name, controllerFormat.EXTENSION))
+        convertToBinary(info['path'], path)
+        info['path'] = path
+        return path
 
-    # This function will be used to load the controller with the given name
-    def load(self, name):
-        path = self[name]['path']
-        # We tell the file command to import, and tell it to not use any nameSpaces
-        cmds.file(path, i=True, usingNamespaces=False)
+    def convertToMaya(self, name, directory=DIRECTORY):
+        info = self[name]
+        path = os.path.join(directory, '%s.ma' % name)
+        convertToMaya(info['path'], path)
+        info['path'] = path
+        return path
 
     # This function will save a screenshot to the given directory with the given name
     def saveScreenshot(self, name, directory=DIRECTORY):
         path = os.path.join(directory, '%s.jpg' % name)
 
-        # We'll fit the view to the objects in our scene or our selection
-        cmds.viewFit()
+        # The session takes care of setting up our render settings and putting them back afterwards
+        with ScreenshotSession() as session:
+            # We'll fit the view to the objects in our scene or our selection and save out the image
+            session.capture(path)
+
+        # Return the path of the file we saved
+        return path
+
+    # This function rebuilds the screenshots for many controllers at once
+    def saveScreenshots(self, names=None, directory=DIRECTORY, force=False, capture=None):
+        """
+        Regenerates the screenshots for controllers in the library.
+        This is best run in an empty scene, since each controller is imported, captured and then removed again.
+        Args:
+            names: the names of the controllers to capture. Defaults to every controller in the directory
+            directory: the library directory
+            force: capture even if the screenshot is newer than the controller
+            capture: an optional function to take the image instead of playblasting. See ScreenshotSession
 
+        Returns:
+            list: the paths of the screenshots we wrote
+        """
+        # Make sure we know about everything in the directory
+        self.find(directory)
+
+        if names is None:
+            names = sorted(self.keys())
+
+        written = []
+
+        # We only set up the camera and render settings once, no matter how many controllers we capture
+        with ScreenshotSession(camera='controllerLibraryCapture', capture=capture) as session:
+            for name in names:
+                entry = self[name]
+                path = os.path.join(directory, '%s.jpg' % name)
+
+                # If the screenshot was written after the controller was saved, then it's still up to date
+                if not force and os.path.exists(path) and os.path.getmtime(path) >= entry.mtime:
+                    continue
+
+                # We bring the controller in, take its picture and get rid of it again
+                nodes = self.loadOne(name, namespace='controllerLibraryCapture')
+                try:
+                    session.capture(path, nodes=cmds.ls(nodes, dag=True, long=True))
+                finally:
+                    cmds.namespace(removeNamespace='controllerLibraryCapture', deleteNamespaceContent=True)
+
+                entry.screenshot = path
+                written.append(path)
+
+        return written
+
+
+class ScreenshotSession(object):
+    """
+    Sets up everything we need to take screenshots and puts it all back when we're done.
+    This lets us change the render settings once and then take as many screenshots as we like.
+
+    with ScreenshotSession() as session:
+        session.capture('/path/to/image.jpg')
+
+    If a camera name is given, a camera is created for the session and all screenshots are taken through it.
+    When Maya is running without a UI (like in mayapy) we can't playblast, so we try the viewport renderer instead.
+    That needs a graphics context, which mayapy often doesn't have and which hasn't been tested there,
+    so headless runs should give a custom capture function. It will be called with the path, the camera and the width and height.
+    """
+
+    def __init__(self, camera=None, width=200, height=200, capture=None):
+        self.camera = camera
+        self.width = width
+        self.height = height
+        self.customCapture = capture
+
+        # We'll remember the settings we change here so we can restore them
+        self.imageFormat = None
+        self.createdCamera = None
+        self.focus = None
+        self.panel = None
+        self.panelCamera = None
+        self.batch = cmds.about(batch=True)
+
+    def __enter__(self):
         # We'll change our render format to jpg
+        self.imageFormat = cmds.getAttr("defaultRenderGlobals.imageFormat")
         cmds.setAttr("defaultRenderGlobals.imageFormat", 8) # This is the value for jpeg
 
-        # Finally we'll save out our image using the playblast module
-        # There are a lot of arguments here so it's good to use the documentation to know what's going on
-        cmds.playblast(completeFilename=path, forceOverwrite=True, format='image', width=200, height=200,
-                       showOrnaments=False, startTime=1, endTime=1, viewer=False)
+        if self.camera:
+            # We make our capture camera if it doesn't exist yet
+            if not cmds.objExists(self.camera):
+                self.camera, shape = cmds.camera(name=self.camera)
+                self.createdCamera = self.camera
+                cmds.xform(self.camera, rotation=(-30, 45, 0), worldSpace=True)
+
+            # When we have a UI, we look through our camera in a viewport so that playblast uses it
+            if not self.batch:
+                self.focus = cmds.getPanel(withFocus=True)
+                self.panel = self.findPanel(self.focus)
+                if self.panel:
+                    self.panelCamera = cmds.modelPanel(self.panel, query=True, camera=True)
+                    cmds.lookThru(self.panel, self.camera)
+                    # playblast uses the viewport that has focus, so we give it to ours if something else had it
+                    if self.panel != self.focus:
+                        cmds.setFocus(self.panel)
+
+        return self
+
+    def findPanel(self, focus):
+        """
+        Finds the viewport to take our screenshots in
+        Args:
+            focus: the panel that has focus, which is the one we use if it's a viewport
 
-        # Return the path of the file we saved
+        Returns:
+            str: the name of the modelPanel, or None if there isn't one
+        """
+        if focus and cmds.getPanel(typeOf=focus) == 'modelPanel':
+            return focus
+
+        # Otherwise the focus is on something like the outliner, or our own window, so we look for a viewport ourselves
+        # We'd rather use one that can be seen, but any viewport will do
+        modelPanels = cmds.getPanel(type='modelPanel') or []
+        visible = cmds.getPanel(visiblePanels=True) or []
+        for panel in modelPanels:
+            if panel in visible:
+                return panel
+        return modelPanels[0] if modelPanels else None
+
+    def __exit__(self, *args):
+        # We put everything back the way we found it
+        if self.panelCamera:
+            cmds.lookThru(self.panel, self.panelCamera)
+        if self.panel and self.focus and self.panel != self.focus:
+            cmds.setFocus(self.focus)
+        if self.createdCamera and cmds.objExists(self.createdCamera):
+            cmds.delete(self.createdCamera)
+        cmds.setAttr("defaultRenderGlobals.imageFormat", self.imageFormat)
+
+    def capture(self, path, nodes=None):
+        # We'll fit the view to the given nodes, or to the objects in our scene or our selection if we don't have any
+        # viewFit only looks at the selection, so we select the nodes for it and put the selection back afterwards
+        fitArgs = [self.camera] if self.camera else []
+        if nodes:
+            selection = cmds.ls(selection=True, long=True)
+            cmds.select(nodes, replace=True)
+            try:
+                cmds.viewFit(*fitArgs)
+            finally:
+                if selection:
+                    cmds.select(selection, replace=True)
+                else:
+                    cmds.select(clear=True)
+        else:
+            cmds.viewFit(*fitArgs)
+
+        if self.customCapture:
+            self.customCapture(path, self.camera, self.width, self.height)
+        elif self.batch:
+            self.render(path)
+        else:
+            # Finally we'll save out our image using the playblast module
+            # There are a lot of arguments here so it's good to use the documentation to know what's going on
+            cmds.playblast(completeFilename=path, forceOverwrite=True, format='image', width=self.width,
+                           height=self.height, showOrnaments=False, startTime=1, endTime=1, viewer=False)
         return path
 
+    def render(self, path):
+        # Without a UI we render the frame with the viewport renderer, which writes the image wherever the render settings say
+        # So we move the image to where we want it afterwards
+        image = cmds.ogsRender(camera=self.camera or 'persp', width=self.width, height=self.height, currentFrame=True)
+        if os.path.exists(path):
+            os.remove(path)
+        shutil.move(image, path)
+
+
+# This counts how many sceneBatches we're inside of, so that only the outermost one turns refreshing back on
+_batchDepth = [0]
+
+
+@contextlib.contextmanager
+def sceneBatch(name):
+    """
+    A context manager that turns off viewport refreshes and records everything inside it as one undo
+    Args:
+        name: the name of the undo chunk
+    """
+    cmds.undoInfo(openChunk=True, chunkName=name)
+    if not _batchDepth[0]:
+        cmds.refresh(suspend=True)
+    _batchDepth[0] += 1
+    try:
+        yield
+    finally:
+        # The finally makes sure we turn everything back on even if there was an error
+        _batchDepth[0] -= 1
+        if not _batchDepth[0]:
+            cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+
+
+# The following functions are the maya side of our binary controller format
+# They move curves between the maya scene and the plain dictionaries that controllerFormat reads and writes
+def getCurveData(nodes=None, selection=False):
+    """
+    Reads the curves under the given nodes
+    Args:
+        nodes: a list of nodes to look under. If not given, we look at the selection or the whole scene
+        selection: whether to use the selection when no nodes are given
+
+    Returns:
+        list: a list of curve dictionaries that controllerFormat.pack can write
+    """
+    # We find every curve shape, skipping the intermediate shapes that maya keeps around for deformers
+    if nodes:
+        shapes = cmds.ls(nodes, dag=True, type='nurbsCurve', noIntermediate=True, long=True)
+    else:
+        shapes = cmds.ls(selection=selection, dag=True, type='nurbsCurve', noIntermediate=True, long=True)
+
+    # The API lets us read every CV and knot in a single call instead of one getAttr per CV
+    selectionList = om.MSelectionList()
+    for shape in shapes:
+        selectionList.add(shape)
+
+    curves = []
+    for i in range(selectionList.length()):
+        dagPath = selectionList.getDagPath(i)
+        fn = om.MFnNurbsCurve(dagPath)
+
+        # The transform is the parent of the shape
+        transform = cmds.listRelatives(dagPath.fullPathName(), parent=True, fullPath=True)[0]
+
+        cvs = []
+        for point in fn.cvPositions(om.MSpace.kObject):
+            cvs.extend((point.x, point.y, point.z))
+
+        curves.append({
+            'name': dagPath.partialPathName().split('|')[-1],
+            'transform': transform.split('|')[-1],
+            'degree': fn.degree,
+            'form': fn.form,
+            'matrix': cmds.xform(transform, query=True, matrix=True, worldSpace=True),
+            'cvs': cvs,
+            'knots': list(fn.knots()),
+        })
+
+    return curves
+
+
+def buildCurves(curves, namespace=None):
+    """
+    Creates curves in the scene from a controllerFormat.ControllerFile or a list of curve dictionaries
+    Args:
+        curves: the controller file or curve dictionaries
+        namespace: an optional namespace to put the curves in
+
+    Returns:
+        list: the transforms that were created
+    """
+    # We accept either an open controller file or the plain dictionaries
+    if isinstance(curves, controllerFormat.ControllerFile):
+        curves = curves.toCurves()
+
+    # If we have a namespace, every name we give out will start with it
+    prefix = '%s:' % namespace if namespace else ''
+
+    # Curves that share a transform in the file should share a transform when we rebuild them
+    transforms = {}
+    created = []
+
+    for curve in curves:
+        cvs = curve['cvs']
+        points = om.MPointArray([om.MPoint(cvs[i], cvs[i + 1], cvs[i + 2]) for i in range(0, len(cvs), 3)])
+
+        parent = transforms.get(curve['transform'], om.MObject.kNullObj)
+
+        # When there's no parent, maya creates a new transform for us and returns it, otherwise it returns the shape
+        node = om.MFnNurbsCurve().create(points, om.MDoubleArray(curve['knots']), curve['degree'],
+                                         curve['form'], False, True, parent)
+
+        if parent.isNull():
+            transform = om.MFnDagNode(node)
+            transform.setName(prefix + curve['transform'], createNamespace=True)
+            transforms[curve['transform']] = node
+            shape = om.MFnDagNode(transform.child(0))
+            created.append(transform.fullPathName())
+
+            # We put the transform back where it was
+            cmds.xform(transform.fullPathName(), matrix=list(curve['matrix']), worldSpace=True)
+        else:
+            shape = om.MFnDagNode(node)
+
+        shape.setName(prefix + curve['name'], createNamespace=True)
+
+    return created
+
+
+def convertToBinary(mayaPath, ctrlPath):
+    """
+    Converts a maya ascii controller to the binary format without touching the rest of the scene
+    """
+    # We import into a temporary namespace so that we know exactly which nodes came from the file
+    nodes = cmds.file(mayaPath, i=True, namespace='controllerConvert', returnNewNodes=True)
+    try:
+        curves = getCurveData(nodes=nodes)
+        for curve in curves:
+            # We strip the namespace back off so that the names are the same as in the original file
+            curve['name'] = curve['name'].split(':')[-1]
+            curve['transform'] = curve['transform'].split(':')[-1]
+        controllerFormat.write(ctrlPath, curves)
+    finally:
+        cmds.namespace(removeNamespace='controllerConvert', deleteNamespaceContent=True)
+    return ctrlPath
+
+
+def convertToMaya(ctrlPath, mayaPath):
+    """
+    Converts a binary controller to a maya ascii file without touching the rest of the scene
+    """
+    with controllerFormat.ControllerFile(ctrlPath) as ctrl:
+        transforms = buildCurves(ctrl)
+
+    try:
+        # We export just the curves we made
+        cmds.select(transforms, replace=True)
+        cmds.file(mayaPath, force=True, exportSelected=True, type='mayaAscii')
+    finally:
+        cmds.delete(transforms)
+    return mayaPath
+
 
 # This will be our first Qt UI!
 # We'll be creating a dialog, so lets start by inheriting from Qt's QDialog
 class ControllerLibraryUI(QtWidgets.QDialog):
 
-    def __init__(self):
+    def __init__(self, directory=DIRECTORY):
         # super is an interesting function
         # It gets the class that our class is inheriting from
         # This is called the superclass
@@ -186,6 +867,9 @@ class ControllerLibraryUI(QtWidgets.QDialog):
         # We store our library as a variable that we can access from inside us
         self.library = ControllerLibrary()
 
+        # And we remember which directory the library lives in
+        self.directory = directory
+
         # Finally we build our UI
         self.buildUI()
 
@@ -218,6 +902,13 @@ class ControllerLibraryUI(QtWidgets.QDialog):
         # and then we add it to our save layout
         saveLayout.addWidget(saveBtn)
 
+        # We add a field to search our controllers
+        # Every time its text changes we filter the list to only show the controllers that match
+        self.searchField = QtWidgets.QLineEdit()
+        self.searchField.setPlaceholderText('Search by name, or by info like side:left')
+        self.searchField.textChanged.connect(self.filter)
+        layout.addWidget(self.searchField)
+
         # Now we'll set up the list of all our items
         # The size is for the size of the icons we will display
         size = 64
@@ -231,6 +922,11 @@ class ControllerLibraryUI(QtWidgets.QDialog):
         self.listWidget.setResizeMode(QtWidgets.QListWidget.Adjust)
         # Finally we set the grid size to be just a little larger than our icons to store our text label too
         self.listWidget.setGridSize(QtCore.QSize(size+12, size+12))
+        # We let the user select many controllers at once so they can import them together
+        self.listWidget.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        # We want to know when the mouse moves over an item so we can show its info
+        self.listWidget.setMouseTracking(True)
+        self.listWidget.itemEntered.connect(self.showInfo)
         # And finally, finally, we add it to our main layout
         layout.addWidget(self.listWidget)
 
@@ -261,17 +957,18 @@ class ControllerLibraryUI(QtWidgets.QDialog):
         self.populate()
 
     def load(self):
-        # We will ask the listWidget what our currentItem is
-        currentItem = self.listWidget.currentItem()
+        # We will ask the listWidget what items are selected
+        items = self.listWidget.selectedItems()
 
-        # If we don't have anything selected, it will tell us None is selected, so we can skip this method
-        if not currentItem:
+        # If we don't have anything selected, it will give us an empty list, so we can skip this method
+        if not items:
             return
 
-        # We then get the text label of the current item. This will be the name of our control
-        name = currentItem.text()
-        # Then we tell our library to load it
-        self.library.load(name)
+        # We then get the text label of the items. These will be the names of our controls
+        names = [item.text() for item in items]
+        # Then we tell our library to load them all in one go
+        # It gives back how long each one took, which scripts can use, but there's no need to show it here
+        self.library.load(names)
 
     def save(self):
         # We start off by getting the name in the text field
@@ -284,20 +981,52 @@ class ControllerLibraryUI(QtWidgets.QDialog):
             return
 
         # We use our library to save with the given name
-        self.library.save(name)
+        self.library.save(name, directory=self.directory)
         # Then we repopulate our UI with the new data
         self.populate()
         # And finally, lets remove the text in the name field so that they don't accidentally overwrite the file
         self.saveNameField.setText('')
 
+    def showInfo(self, item):
+        # If we've already set the tooltip, we don't need to do it again
+        if item.toolTip():
+            return
+
+        # We set its tooltip to be the info from the json
+        # This is the first time the entry needs its info so this is when it reads the json file
+        # The pprint.pformat will format our dictionary nicely
+        entry = self.library.get(item.text())
+        if entry is not None:
+            item.setToolTip(pprint.pformat(entry.asDict()))
+
+    def filter(self, query=None):
+        # This function hides every item that doesn't match the search
+        if query is None:
+            query = self.searchField.text()
+
+        matches = self.library.search(query)
+
+        # Showing and hiding items is the slow part, so we only touch the items whose visibility actually changes
+        # The ^ gives us the names that are in one set but not the other
+        for name in self.visible ^ matches:
+            item = self.items.get(name)
+            if item is not None:
+                item.setHidden(name not in matches)
+
+        self.visible = set(matches) & set(self.items)
+
     def populate(self):
         # This function will be used to populate the UI. Shocking. I know.
 
         # First lets clear all the items that are in the list to start fresh
         self.listWidget.clear()
 
+        # We keep track of the item for every name, and which of them are showing, so that we can filter them quickly
+        self.items = {}
+        self.visible = set()
+
         # Then we ask our library to find everything again in case things changed
-        self.library.find()
+        self.library.find(self.directory)
 
         # Now we iterate through the dictionary
         # This is why I based our library on a dictionary, because it gives us all the nice tricks a dictionary has
@@ -305,14 +1034,19 @@ class ControllerLibraryUI(QtWidgets.QDialog):
             # We create an item for the list widget and tell it to have our controller name as a label
             item = QtWidgets.QListWidgetItem(name)
 
-            # We set its tooltip to be the info from the json
-            # The pprint.pformat will format our dictionary nicely
-            item.setToolTip(pprint.pformat(info))
+            # We don't set the tooltip here because that would mean reading every json file
+            # Instead we set it when the mouse first moves over the item. Have a look at the showInfo method
 
             # Finally we check if there's a screenshot available
-            screenshot = info.get('screenshot')
+            # We ask the entry directly so that we don't read its json file just to find out there's no screenshot
+            screenshot = info.screenshot
             # If there is, then we will load it
-            if screenshot:
+            if screenshot and info.pack:
+                # If the controller is in a pack, we read the image from the pack instead of from a file
+                pixmap = QtGui.QPixmap()
+                pixmap.loadFromData(info.pack.read(screenshot))
+                item.setIcon(QtGui.QIcon(pixmap))
+            elif screenshot:
                 # So first we make an icon with the path to our screenshot
                 icon = QtGui.QIcon(screenshot)
                 # then we set the icon onto our item
@@ -320,6 +1054,12 @@ class ControllerLibraryUI(QtWidgets.QDialog):
 
             # Finally we add our item to the list
             self.listWidget.addItem(item)
+            self.items[name] = item
+            self.visible.add(name)
+
+        # If there's something in the search field, we apply it to the new items
+        if self.searchField.text():
+            self.filter()
 
 # This is a convenience function to display our UI
 def showUI():
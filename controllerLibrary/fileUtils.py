@@ -0,0 +1,84 @@
+"""
+Small helpers that the modules of the controller library share.
+"""
+import contextlib
+import errno
+import os
+import time
+
+# perf_counter is the most precise timer, but Python 2 doesn't have it so we fall back to time.time
+timer = getattr(time, 'perf_counter', time.time)
+
+
+def writeFile(path, data):
+    """
+    Writes a file so that nobody reading it at the same time ever sees it half written.
+    We write to a temporary file next to it and then rename it into place
+    Args:
+        path: the file to write. Any folders it needs are made for us
+        data: the bytes to write
+    """
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+
+    # The process id keeps two processes writing the same file from using the same temporary file
+    temp = '%s.%s.tmp' % (path, os.getpid())
+    with open(temp, 'wb') as f:
+        f.write(data)
+
+    # os.replace swaps the file in one step, so a reader sees either the old file or the new one.
+    # Python 2 doesn't have it, and on Windows it won't rename over a file that exists, so there we remove it first
+    if hasattr(os, 'replace'):
+        os.replace(temp, path)
+        return
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(temp, path)
+
+
+@contextlib.contextmanager
+def lockFile(path, timeout=30, stale=60):
+    """
+    Holds a lock file while the with block runs, so that only one Maya at a time changes a file that's shared.
+    Making a file with O_EXCL either makes it or fails because it's already there, even on network drives,
+    so whoever manages to make it has the lock.
+    Args:
+        path: the lock file to make
+        timeout: how many seconds to wait for somebody else's lock before giving up with an IOError
+        stale: a lock older than this many seconds was left behind by a Maya that crashed, so we take it over
+    """
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+
+    start = timer()
+    while True:
+        try:
+            handle = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        try:
+            if time.time() - os.path.getmtime(path) > stale:
+                os.remove(path)
+                continue
+        except OSError:
+            # The lock went away while we were looking at it, so we can try again straight away
+            continue
+
+        if timer() - start > timeout:
+            raise IOError("Timed out waiting for %s to be unlocked" % path)
+        time.sleep(0.05)
+
+    try:
+        # We write our process id in the lock so that somebody looking at a stuck lock knows whose it is
+        try:
+            os.write(handle, str(os.getpid()).encode('utf-8'))
+        finally:
+            os.close(handle)
+        yield
+    finally:
+        os.remove(path)
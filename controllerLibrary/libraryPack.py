@@ -0,0 +1,176 @@
+"""
+Packs a whole controller library into a single zip file.
+
+A library is made of thousands of tiny files, and copying lots of tiny files around a network is very slow.
+A zip file keeps all of them in one file with an index (the central directory) at the end,
+so we can list every controller by reading just that index, and read any single file without unpacking the rest.
+
+From the command line:
+
+    python libraryPack.py pack /path/to/library library.zip
+    python libraryPack.py unpack library.zip /path/to/library
+
+And in Maya the ControllerLibrary can find controllers straight from the pack
+
+    library.find('/path/to/library.zip')
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+# The extension of our pack files
+EXTENSION = '.zip'
+
+# These files are already compressed, so trying to compress them again just wastes time
+STORED = ('.jpg', '.ctrl')
+
+# Files ending with these are only there while something is being written, so we don't pack them
+SKIPPED = ('.tmp', '.lock')
+
+# The catalog and sync state of a library mirrored with remoteLibrary only make sense on the machine that made them.
+# They only ever live at the top of the library, so we only skip them there
+CATALOG = 'catalog.json'
+REMOTE_STATE = '.remote.json'
+
+
+def isPack(path):
+    """
+    Checks if the given path is a library pack
+    """
+    return path.endswith(EXTENSION) and os.path.isfile(path)
+
+
+def isCatalog(path):
+    """
+    Checks if a catalog.json is really a remoteLibrary catalog.
+    A controller called catalog has an info file with the same name, and we must not leave that out
+    """
+    try:
+        with open(path, 'r') as f:
+            return list(json.load(f)) == ['files']
+    except (IOError, ValueError):
+        return False
+
+
+def pack(directory, packPath):
+    """
+    Packs everything in a library directory into a single file
+    Args:
+        directory: the library directory
+        packPath: the path of the pack to write
+
+    Returns:
+        int: the number of files that were packed
+    """
+    count = 0
+    packPath = os.path.abspath(packPath)
+    with zipfile.ZipFile(packPath, 'w') as zf:
+        # We walk the whole directory so that the folders of the blob store are included too
+        for root, dirs, names in os.walk(directory):
+            for name in sorted(names):
+                if name.endswith(SKIPPED):
+                    continue
+
+                path = os.path.join(root, name)
+                # We don't want to pack the pack into itself
+                if os.path.abspath(path) == packPath:
+                    continue
+
+                # Zip files always use forward slashes
+                member = os.path.relpath(path, directory).replace(os.sep, '/')
+                if member == REMOTE_STATE or (member == CATALOG and isCatalog(path)):
+                    continue
+
+                compression = zipfile.ZIP_STORED if name.endswith(STORED) else zipfile.ZIP_DEFLATED
+                zf.write(path, member, compress_type=compression)
+                count += 1
+    return count
+
+
+def unpack(packPath, directory):
+    """
+    Unpacks a library pack back into a directory
+    Returns:
+        int: the number of files that were unpacked
+    """
+    with zipfile.ZipFile(packPath, 'r') as zf:
+        zf.extractall(directory)
+        return len(zf.namelist())
+
+
+class LibraryPack(object):
+    """
+    Reads files out of a library pack without unpacking it
+
+    pack = LibraryPack('library.zip')
+    pack.names()
+    pack.read('star.json')
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+
+        # Opening the zip file reads the central directory once, after that every lookup is instant
+        self.zipFile = zipfile.ZipFile(path, 'r')
+        self.members = dict((info.filename, info) for info in self.zipFile.infolist())
+
+        # Files that have to be on disk (like maya files for the file command) get extracted here one at a time
+        self.cache = None
+
+    def names(self):
+        return list(self.members)
+
+    def __contains__(self, member):
+        return member in self.members
+
+    def mtimeOf(self, member):
+        # Zip files store times as a date tuple, so we turn it into the same kind of number os.path.getmtime gives us
+        return time.mktime(self.members[member].date_time + (0, 0, -1))
+
+    def read(self, member):
+        return self.zipFile.read(member)
+
+    def extract(self, member):
+        """
+        Extracts a single file to a temporary directory, for the things that can only read files from disk
+        Returns:
+            str: the path of the extracted file
+        """
+        if self.cache is None:
+            self.cache = tempfile.mkdtemp(prefix='controllerLibraryPack')
+
+        path = os.path.join(self.cache, *member.split('/'))
+        if not os.path.exists(path):
+            self.zipFile.extract(member, self.cache)
+        return path
+
+    def close(self):
+        self.zipFile.close()
+        if self.cache:
+            shutil.rmtree(self.cache, ignore_errors=True)
+            self.cache = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Packs a controller library into a single file or unpacks it again",
+                                     usage="python libraryPack.py pack /path/to/library library.zip")
+    parser.add_argument('command', choices=['pack', 'unpack'], help="Whether to pack or unpack")
+    parser.add_argument('source', help="The directory to pack, or the pack to unpack")
+    parser.add_argument('destination', help="The pack to write, or the directory to unpack to")
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        count = pack(args.source, args.destination)
+    else:
+        count = unpack(args.source, args.destination)
+
+    print('%sed %s files' % (args.command.capitalize(), count))
+
+
+if __name__ == '__main__':
+    main()
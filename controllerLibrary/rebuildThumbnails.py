@@ -0,0 +1,59 @@
+"""
+A command line tool to rebuild the screenshots of a controller library without opening Maya's UI.
+
+Run it with mayapy so that it has access to Maya:
+
+    mayapy -m controllerLibrary.rebuildThumbnails /path/to/library --force
+
+Controllers whose screenshots are newer than the controller file are skipped unless --force is given.
+
+Without a UI we can't playblast, and the viewport renderer (ogsRender) that ScreenshotSession falls back to
+needs a graphics context that mayapy often doesn't have. It hasn't been tested there, so for headless runs
+pass --capture with a function that takes the image instead, like one that renders with your batch renderer:
+
+    mayapy -m controllerLibrary.rebuildThumbnails /path/to/library --capture studioTools.thumbnails.render
+
+The function is called with the path to write, the camera, and the width and height. See ScreenshotSession.
+"""
+import argparse
+import importlib
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuilds the screenshots for every controller in a library",
+                                     usage="mayapy -m controllerLibrary.rebuildThumbnails /path/to/library")
+    parser.add_argument('directory', nargs='?', help="The library to rebuild. Defaults to the user's library")
+    parser.add_argument('-n', '--name', action='append', help="Only rebuild this controller. Can be given many times")
+    parser.add_argument('-f', '--force', action='store_true', help="Rebuild screenshots even if they are up to date")
+    parser.add_argument('-c', '--capture', help="The dotted path of a function to take each image with, "
+                                                "instead of the viewport renderer")
+    args = parser.parse_args()
+
+    # We need to start Maya before we can use any of its commands
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    # We can only import the library once Maya is running because it asks Maya where our documents are
+    from controllerLibrary import controllerLibrary
+    from maya import cmds
+
+    directory = os.path.abspath(args.directory) if args.directory else controllerLibrary.DIRECTORY
+
+    # We start from an empty scene so that nothing else ends up in our screenshots
+    cmds.file(newFile=True, force=True)
+
+    capture = None
+    if args.capture:
+        # We import the module the function lives in and grab the function from it
+        moduleName, functionName = args.capture.rsplit('.', 1)
+        capture = getattr(importlib.import_module(moduleName), functionName)
+
+    library = controllerLibrary.ControllerLibrary()
+    written = library.saveScreenshots(names=args.name, directory=directory, force=args.force, capture=capture)
+
+    print('Rebuilt %s screenshots in %s' % (len(written), directory))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""
+A backend that lets the controller library browse a library that lives on a web server.
+
+Browsing a big library over a network share is slow because every file has to be listed and opened across the network.
+Instead, the server publishes a small catalog that lists every file in the library along with its size and time.
+We keep a mirror of the library on the local disk and only download the files that changed since we last looked.
+
+On the server side, any plain web server will do. To try it out you can do
+
+    python -m controllerLibrary.remoteLibrary catalog /path/to/library
+    cd /path/to/library && python -m http.server 8000
+
+And then in Maya
+
+    library = ControllerLibrary(backend=HttpBackend('http://localhost:8000'))
+    library.find()
+"""
+import argparse
+import json
+import os
+import threading
+
+# The http and url libraries were renamed in Python 3, so we try the new names first and fall back to the old ones
+try:
+    import http.client as httplib
+    from urllib.parse import urlsplit, quote
+except ImportError:
+    import httplib
+    from urlparse import urlsplit
+    from urllib import quote
+
+# This lets us read the dates that web servers send us
+from email.utils import parsedate_tz, mktime_tz
+
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
+
+# We write the files we download so that nobody ever sees one half written
+from .fileUtils import writeFile
+
+
+# The name of the catalog file that the server publishes
+CATALOG = 'catalog.json'
+
+# The name of the file where we remember what we've already downloaded
+STATE = '.remote.json'
+
+
+def writeCatalog(directory):
+    """
+    Writes the catalog for a library directory so that it can be served to HttpBackends
+    Args:
+        directory: the library directory
+
+    Returns:
+        str: the path of the catalog
+    """
+    # A controller called catalog would have its info file written over by the catalog, so we stop before that happens
+    name = os.path.splitext(CATALOG)[0]
+    if any(os.path.exists(os.path.join(directory, name + extension)) for extension in ('.ma', '.ctrl')):
+        raise ValueError("%s has a controller called %s, which can't be published. Please rename it" % (directory, name))
+
+    files = {}
+
+    # We walk the whole directory so that the folders of the blob store are included too
+    for root, dirs, names in os.walk(directory):
+        for name in names:
+            if name in (CATALOG, STATE) or name.endswith('.tmp'):
+                continue
+            path = os.path.join(root, name)
+            # The catalog always uses forward slashes since that's what urls use
+            relPath = os.path.relpath(path, directory).replace(os.sep, '/')
+            stat = os.stat(path)
+            files[relPath] = [stat.st_size, stat.st_mtime]
+
+    path = os.path.join(directory, CATALOG)
+    with open(path, 'w') as f:
+        json.dump({'files': files}, f, sort_keys=True)
+    return path
+
+
+def strongLastModified(headers):
+    """
+    Gives back the last-modified time of a response if it's safe to ask the server about changes since then.
+    The time is only to the second, so a file changed again in the same second it was sent to us would look unchanged.
+    If the file was modified less than a second before the server sent it, we don't use the time at all
+    Args:
+        headers: the headers of the response
+
+    Returns:
+        str: the last-modified header, or None
+    """
+    lastModified = headers.get('last-modified')
+    date = headers.get('date')
+    if not lastModified or not date:
+        return None
+
+    lastModifiedTime = parsedate_tz(lastModified)
+    dateTime = parsedate_tz(date)
+    if not lastModifiedTime or not dateTime or mktime_tz(dateTime) - mktime_tz(lastModifiedTime) < 1:
+        return None
+    return lastModified
+
+
+class ConnectionPool(object):
+    """
+    Keeps a few connections to a server open so that we don't have to connect again for every request
+    """
+
+    def __init__(self, host, port=None, scheme='http', size=4, timeout=30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connectionClass = httplib.HTTPSConnection if scheme == 'https' else httplib.HTTPConnection
+
+        # The queue holds the connections that aren't being used right now
+        # It is safe to use from many threads at once
+        self.pool = Queue(size)
+
+    def connect(self):
+        return self.connectionClass(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, headers=None):
+        """
+        Makes a request on one of our connections
+        Returns:
+            tuple: the status, the response headers as a dictionary and the body
+        """
+        # We take a connection that's already open if we have one
+        try:
+            connection = self.pool.get_nowait()
+        except Empty:
+            connection = self.connect()
+
+        try:
+            try:
+                connection.request(method, path, headers=headers or {})
+                response = connection.getresponse()
+            except (httplib.HTTPException, IOError):
+                # The server may have closed a connection we were holding on to, so we try once more on a fresh one
+                connection.close()
+                connection = self.connect()
+                connection.request(method, path, headers=headers or {})
+                response = connection.getresponse()
+
+            # We must read the whole body before the connection can be used again
+            body = response.read()
+            result = response.status, dict((k.lower(), v) for k, v in response.getheaders()), body
+        except Exception:
+            connection.close()
+            raise
+
+        # We give the connection back so the next request can use it
+        try:
+            self.pool.put_nowait(connection)
+        except Exception:
+            connection.close()
+
+        return result
+
+    def close(self):
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except Empty:
+                break
+
+
+class HttpBackend(object):
+    """
+    Mirrors a library from a web server to the local disk.
+
+    The ControllerLibrary calls sync() before it looks for controllers, and then reads the mirror like any other directory.
+    """
+
+    def __init__(self, url, mirror=None, poolSize=4):
+        parts = urlsplit(url)
+        self.root = parts.path.rstrip('/')
+        self.pool = ConnectionPool(parts.hostname, parts.port, scheme=parts.scheme, size=poolSize)
+
+        # By default we mirror into a folder named after the server inside our temp directory
+        if not mirror:
+            import tempfile
+            mirror = os.path.join(tempfile.gettempdir(), 'controllerLibrary',
+                                  '%s_%s' % (parts.hostname, parts.port or 80) + self.root.replace('/', '_'))
+        self.mirror = mirror
+
+        self.lock = threading.Lock()
+        self.state = self.loadState()
+
+        # These count what the last sync did, which is handy for seeing how much we transfer
+        self.stats = {}
+
+    def loadState(self):
+        state = {}
+        path = os.path.join(self.mirror, STATE)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                state = json.load(f)
+
+        # files has the size and time of every file we have, and validators the etag and last-modified we got with it
+        for key in ('catalog', 'files', 'validators'):
+            state.setdefault(key, {})
+        return state
+
+    def saveState(self):
+        with open(os.path.join(self.mirror, STATE), 'w') as f:
+            json.dump(self.state, f)
+
+    def get(self, relPath, cache=None):
+        """
+        Downloads a file from the server, asking the server to skip it if it hasn't changed
+        Args:
+            relPath: the path of the file inside the library
+            cache: a dictionary with the etag and last-modified we got the last time we downloaded this file
+
+        Returns:
+            tuple: the status, the headers and the body. A status of 304 means the file hasn't changed
+        """
+        headers = {}
+        if cache:
+            # These are conditional requests, the server only sends the file back if it's different from ours
+            if cache.get('etag'):
+                headers['If-None-Match'] = cache['etag']
+            if cache.get('lastModified'):
+                headers['If-Modified-Since'] = cache['lastModified']
+
+        try:
+            status, responseHeaders, body = self.pool.request('GET', '%s/%s' % (self.root, quote(relPath)), headers)
+        except httplib.HTTPException as e:
+            # We turn these into IOErrors, so that whoever calls us only has one kind of error to look out for
+            raise IOError("Could not get %s from the server (%s)" % (relPath, e))
+        if status not in (200, 304):
+            raise IOError("Could not get %s from the server (%s)" % (relPath, status))
+        return status, responseHeaders, body
+
+    def sync(self):
+        """
+        Brings the local mirror up to date with the server
+        Raises:
+            IOError: if the server can't be reached. The mirror is left as it was, so it can still be read
+        Returns:
+            str: the directory of the mirror, which can be given to ControllerLibrary.find
+        """
+        with self.lock:
+            if not os.path.exists(self.mirror):
+                os.makedirs(self.mirror)
+
+            self.stats = {'requests': 1, 'downloaded': 0, 'notModified': 0, 'removed': 0}
+
+            cached = self.state['catalog']
+            status, headers, body = self.get(CATALOG, cached)
+
+            # If the catalog hasn't changed, then nothing in the library has either and we're done
+            if status == 304:
+                return self.mirror
+
+            catalog = json.loads(body.decode('utf-8'))['files']
+            local = self.state['files']
+            validators = self.state['validators']
+
+            # We only ask for the files whose size or time are different to the last time we saw them
+            for relPath, stat in sorted(catalog.items()):
+                path = self.localPath(relPath)
+                exists = os.path.exists(path)
+                if local.get(relPath) == stat and exists:
+                    continue
+
+                # A file can be saved again without changing, so if we have it we ask the server to only send it if not
+                self.stats['requests'] += 1
+                fileStatus, fileHeaders, data = self.get(relPath, validators.get(relPath) if exists else None)
+                if fileStatus == 304:
+                    self.stats['notModified'] += 1
+                else:
+                    self.write(path, data)
+                    validators[relPath] = {'etag': fileHeaders.get('etag'),
+                                           'lastModified': strongLastModified(fileHeaders)}
+                    self.stats['downloaded'] += 1
+                local[relPath] = stat
+
+            # Anything we have that isn't on the server anymore gets removed
+            for relPath in [p for p in local if p not in catalog]:
+                path = self.localPath(relPath)
+                if os.path.exists(path):
+                    os.remove(path)
+                del local[relPath]
+                validators.pop(relPath, None)
+                self.stats['removed'] += 1
+
+            self.state['catalog'] = {'etag': headers.get('etag'), 'lastModified': strongLastModified(headers)}
+            self.saveState()
+
+        return self.mirror
+
+    def localPath(self, relPath):
+        return os.path.join(self.mirror, *relPath.split('/'))
+
+    def write(self, path, data):
+        writeFile(path, data)
+
+    def close(self):
+        self.pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publishes a controller library so it can be browsed over http",
+                                     usage="python -m controllerLibrary.remoteLibrary catalog /path/to/library")
+    parser.add_argument('command', choices=['catalog'], help="catalog writes the catalog for a library")
+    parser.add_argument('directory', help="The library directory")
+    args = parser.parse_args()
+
+    if args.command == 'catalog':
+        print('Wrote %s' % writeCatalog(args.directory))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+An index to quickly search the controllers in a library.
+
+Searching by looping over every controller and checking its name gets slow once a library has thousands of controllers.
+Instead we keep the names in a sorted list, so finding every name that starts with some text is a quick binary search,
+and we keep a dictionary of the info keys and values that were saved with each controller so we can look those up instantly.
+
+A search is a few words separated by spaces. Every word has to match for a controller to be found:
+
+    arm             names that start with arm
+    side:           controllers that have a side saved in their info
+    side:l          controllers whose side starts with l
+"""
+# The bisect module lets us search and insert into sorted lists quickly
+import bisect
+
+
+class SearchIndex(object):
+    """
+    Indexes controller names and their info so they can be searched quickly.
+
+    Reading the info of every controller is slow, so the tags are only indexed when info is given to add,
+    or the first time a search asks for a tag. The loader is the function used to get the info of a controller then.
+    """
+
+    # These keys are in every controller's info, so they're not interesting to search by
+    ignoredKeys = ('name', 'path', 'screenshot', 'hash')
+
+    def __init__(self, loader=None):
+        self.loader = loader
+
+        # These two lists are kept sorted together
+        # keys holds the lower case names that we search, and names holds the real name for each of them
+        self.keys = []
+        self.names = []
+        # We also keep the names in a set, so checking if a name is already indexed doesn't need a search
+        self.members = set()
+
+        # The tags are a dictionary of info keys, each holding a dictionary of values and the names that have that value
+        self.tags = {}
+
+        # We remember which names have their tags indexed, and which tags they had so we can remove them later
+        self.tagged = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.members
+
+    def add(self, name, info=None):
+        """
+        Adds a controller to the index. If it's already there, it is updated
+        Args:
+            name: the name of the controller
+            info: the info of the controller, if we already have it
+        """
+        # Only names we already have need taking out first
+        if name in self.members:
+            self.remove(name)
+
+        key = name.lower()
+        # We find where the name belongs in the sorted list and put it there
+        i = bisect.bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.names.insert(i, name)
+        self.members.add(name)
+
+        if info is not None:
+            self.addTags(name, info)
+
+    def addMany(self, items):
+        """
+        Adds many controllers to the index at once. This is much quicker than calling add for each of them,
+        since inserting into the middle of a list means moving everything after it
+        Args:
+            items: a list of the name and info (or None) of each controller
+        """
+        # If a name is given more than once, the last one wins just like it would with add
+        items = dict(items)
+        if not items:
+            return
+
+        # Any names we already have are taken out of their tags, and left out of the lists we rebuild below
+        replaced = self.members.intersection(items)
+        for name in replaced:
+            self.removeTags(name)
+
+        # We sort everything in one go instead of inserting each name where it belongs
+        pairs = [(key, name) for key, name in zip(self.keys, self.names) if name not in replaced]
+        pairs.extend((name.lower(), name) for name in items)
+        pairs.sort()
+        self.keys = [key for key, name in pairs]
+        self.names = [name for key, name in pairs]
+        self.members.update(items)
+
+        for name, info in items.items():
+            if info is not None:
+                self.addTags(name, info)
+
+    def remove(self, name):
+        if name not in self.members:
+            return
+        self.members.discard(name)
+
+        key = name.lower()
+        i = bisect.bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i] == key:
+            if self.names[i] == name:
+                del self.keys[i]
+                del self.names[i]
+                break
+            i += 1
+
+        self.removeTags(name)
+
+    def removeTags(self, name):
+        # We take the name out of every tag it was in
+        for tag, value in self.tagged.pop(name, ()):
+            values = self.tags[tag]
+            values[value].discard(name)
+            if not values[value]:
+                del values[value]
+            if not values:
+                del self.tags[tag]
+
+    def addTags(self, name, info):
+        # Every key in the info becomes a tag, and we store its value as lower case text so searches can ignore case
+        tags = []
+        for tag, value in info.items():
+            if tag in self.ignoredKeys:
+                continue
+            tag = tag.lower()
+            value = ('%s' % value).lower()
+            self.tags.setdefault(tag, {}).setdefault(value, set()).add(name)
+            tags.append((tag, value))
+        self.tagged[name] = tags
+
+    def indexTags(self):
+        # Any names that haven't had their tags indexed yet get their info read and indexed now
+        if not self.loader:
+            return
+        for name in self.names:
+            if name not in self.tagged:
+                self.addTags(name, self.loader(name))
+
+    def prefix(self, text):
+        """
+        Gives back every name that starts with the given text, ignoring case
+        """
+        text = text.lower()
+        start = bisect.bisect_left(self.keys, text)
+        # Every name that starts with the text sorts before the text followed by the highest possible character
+        end = bisect.bisect_left(self.keys, text + u'\U0010ffff', lo=start)
+        return self.names[start:end]
+
+    def tag(self, tag, value=''):
+        """
+        Gives back the names that have the given tag, and whose value starts with the given value
+        """
+        self.indexTags()
+        values = self.tags.get(tag.lower(), {})
+        value = value.lower()
+
+        names = set()
+        for v, tagged in values.items():
+            if v.startswith(value):
+                names.update(tagged)
+        return names
+
+    def search(self, query):
+        """
+        Searches the index. See the top of this module for what the query can look like
+        Returns:
+            set: the names that matched every word of the query
+        """
+        results = None
+        for word in query.split():
+            if ':' in word:
+                tag, value = word.split(':', 1)
+                found = self.tag(tag, value)
+            else:
+                found = set(self.prefix(word))
+
+            # Every word has to match, so we only keep the names that all the words found
+            results = found if results is None else results & found
+
+            # If nothing is left, the other words can't bring anything back
+            if not results:
+                break
+
+        # An empty search finds everything
+        if results is None:
+            return set(self.names)
+        return results
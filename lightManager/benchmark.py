@@ -0,0 +1,259 @@
+"""
+Benchmarks for the Lighting Manager, shared by every version of it (lightManager and lightManager2016Below).
+
+There are three sets of numbers we care about:
+
+    import      how long importing each version's module takes, which every artist pays for when Maya starts
+    firstPaint  how long it takes from asking for each version's Lighting Manager until it has drawn itself for the first time
+    engine      how long the light data engine in lightCore takes to read, edit, snapshot and save the lights
+
+The import is timed in a fresh mayapy for every run, since once a module is imported python doesn't import it again.
+We also record whether Qt and PyMel got imported along with it, because they are the slow ones.
+The first paint and the engine are timed in scenes with different numbers of lights.
+Before the first paint is timed, the UI module is imported and a manager is opened once in an empty scene,
+so the version we happen to time first isn't charged for the imports and Qt's own setup.
+The UI is drawn offscreen so this can be run without a display.
+Both versions share the engine, so it is only timed once, but the import and first paint are timed for each version
+so we can see that the thin layer each version adds doesn't cost anything.
+
+Run it with mayapy so that it has access to Maya:
+
+    mayapy -m lightManager.benchmark --lights 10 1000 --runs 5 --output results.json
+"""
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from .profiling import timer
+
+# These are the versions of the Lighting Manager we benchmark. Each one is a module in our package
+VERSIONS = ('lightManager', 'lightManager2016Below')
+
+# This is run in a fresh mayapy to time the import. It prints its results as json on the last line
+# The name of the module to import is given to it as its first argument
+IMPORT_SCRIPT = '''
+import importlib, json, sys, time
+timer = getattr(time, 'perf_counter', time.time)
+import maya.standalone
+maya.standalone.initialize(name='python')
+before = set(sys.modules)
+start = timer()
+module = importlib.import_module('lightManager.' + sys.argv[1])
+seconds = timer() - start
+loaded = set(sys.modules) - before
+print(json.dumps({'seconds': seconds, 'modules': len(loaded),
+                  'qt': 'Qt' in loaded, 'pymel': 'pymel.core' in loaded}))
+'''
+
+
+def timeImport(runs, version='lightManager'):
+    """
+    Times importing a version of the Lighting Manager in a fresh mayapy
+    Args:
+        runs: how many times to do it
+        version: the name of the module to import, from VERSIONS
+
+    Returns:
+        dict: the fastest and slowest times, and what else was imported along with it
+    """
+    # We make sure the child can find our package
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (root, env.get('PYTHONPATH')) if p)
+
+    results = []
+    for i in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', IMPORT_SCRIPT, version], env=env)
+        results.append(json.loads(output.decode('utf-8').strip().splitlines()[-1]))
+
+    seconds = [result['seconds'] for result in results]
+    summary = dict(results[0])
+    summary.update({'seconds': min(seconds), 'slowest': max(seconds), 'runs': runs})
+    return summary
+
+
+def makeLights(count):
+    """
+    Makes a new scene with the given number of lights
+    """
+    from maya import cmds
+    cmds.file(new=True, force=True)
+
+    types = ('pointLight', 'spotLight', 'directionalLight')
+    for i in range(count):
+        transform = cmds.createNode('transform', name='light%s' % i)
+        cmds.createNode(types[i % len(types)], name='light%sShape' % i, parent=transform)
+        cmds.setAttr('%s.translate' % transform, i, 0, 0, type='double3')
+
+
+def startMaya():
+    """
+    Starts a headless Maya in this process, once
+    """
+    import maya.standalone
+    try:
+        maya.standalone.initialize(name='python')
+    except RuntimeError:
+        # It was already started
+        pass
+
+
+def timeFirstPaint(counts, table=False, version='lightManager'):
+    """
+    Times opening the Lighting Manager until it has drawn itself, in scenes with different numbers of lights
+    Args:
+        counts: the numbers of lights to time it with
+        table: whether to open it with the table view
+        version: the name of the module to open it from, from VERSIONS
+
+    Returns:
+        dict: the results for every number of lights
+    """
+    # We draw the UI offscreen so that we don't need a display
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    startMaya()
+
+    from Qt import QtWidgets
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+    module = importlib.import_module('lightManager.' + version)
+
+    # Every version only imports lightManagerUI when its manager is first made.
+    # We import it here so that whichever version we time first doesn't pay for that import, since timeImport covers it
+    importlib.import_module('lightManager.lightManagerUI')
+
+    # Qt also does some work of its own the first time a window is shown, so we open one with no lights before timing
+    makeLights(0)
+    openManager(app, module, table)
+
+    results = {}
+    for count in counts:
+        makeLights(count)
+
+        results[str(count)] = openManager(app, module, table)
+        rounded = dict((k, round(v, 4)) for k, v in results[str(count)].items())
+        print('%s %s lights: %s' % (version, count, json.dumps(rounded)))
+
+    return results
+
+
+def openManager(app, module, table=False):
+    """
+    Opens a version's Lighting Manager, makes it paint, and closes it again
+    Args:
+        app: the QApplication, so we can let the UI draw
+        module: the module of the version to open it from
+        table: whether to open it with the table view
+
+    Returns:
+        dict: how long it took to make it, and how long until it had painted
+    """
+    start = timer()
+    manager = module.LightingManager(table=table)
+    constructed = timer() - start
+    # Showing the window only asks for a paint, so we let Qt handle its events and then make it paint right away
+    app.processEvents()
+    manager.repaint()
+    painted = timer() - start
+
+    manager.parent().close()
+    manager.parent().deleteLater()
+    app.processEvents()
+
+    return {'construct': constructed, 'firstPaint': painted}
+
+
+def timeEngine(counts):
+    """
+    Times the light data engine that every version shares, in scenes with different numbers of lights
+    Args:
+        counts: the numbers of lights to time it with
+
+    Returns:
+        dict: how long each part of the engine took for every number of lights
+    """
+    startMaya()
+
+    from lightManager import lightCore, lightRig
+
+    directory = tempfile.mkdtemp(prefix='lightManagerBenchmark')
+
+    results = {}
+    for count in counts:
+        makeLights(count)
+        times = {}
+
+        # Each step is timed on its own, and they run in an order where each undoes or checks the one before it
+        start = timer()
+        lights = lightCore.getLightStates()
+        times['getLightStates'] = timer() - start
+
+        start = timer()
+        snapshot = lightCore.Snapshot.capture('before')
+        times['snapshot'] = timer() - start
+
+        start = timer()
+        lightCore.editLights(lights, scale=2.0, visibility='toggle')
+        times['editLights'] = timer() - start
+
+        start = timer()
+        lightCore.applySnapshot(snapshot)
+        times['applySnapshot'] = timer() - start
+
+        for compress in (False, True):
+            suffix = 'Compressed' if compress else ''
+            path = os.path.join(directory, 'lights%s%s' % (count, lightRig.BINARY_EXTENSION if compress
+                                                           else lightRig.EXTENSION))
+
+            start = timer()
+            lightCore.exportLights(path, lights=lights, compress=compress)
+            times['export' + suffix] = timer() - start
+
+            start = timer()
+            rig = lightRig.read(path)
+            times['read' + suffix] = timer() - start
+
+        # Nothing changed since the snapshot put everything back, so this times finding that out
+        start = timer()
+        lightCore.applyRig(rig, create=False)
+        times['applyRig'] = timer() - start
+
+        results[str(count)] = times
+        print('engine %s lights: %s' % (count, json.dumps(dict((k, round(v, 4)) for k, v in times.items()),
+                                                           sort_keys=True)))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks every version of the Lighting Manager and the engine they share",
+                                     usage="mayapy -m lightManager.benchmark --lights 10 1000")
+    parser.add_argument('-l', '--lights', nargs='+', type=int, default=[10, 1000],
+                        help="The number of lights in each scene that we open the manager in")
+    parser.add_argument('-r', '--runs', type=int, default=5, help="How many times to time the import")
+    parser.add_argument('--table', action='store_true', help="Open the manager with the table view")
+    parser.add_argument('-v', '--versions', nargs='+', choices=VERSIONS, default=list(VERSIONS),
+                        help="The versions of the Lighting Manager to benchmark")
+    parser.add_argument('-o', '--output', help="The json file to write the results to. Defaults to printing them")
+    args = parser.parse_args()
+
+    results = {'python': sys.version.split()[0]}
+    results['import'] = dict((version, timeImport(args.runs, version)) for version in args.versions)
+    results['firstPaint'] = dict((version, timeFirstPaint(args.lights, table=args.table, version=version))
+                                 for version in args.versions)
+    results['engine'] = timeEngine(args.lights)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+    else:
+        print(json.dumps(results, indent=4))
+
+
+if __name__ == '__main__':
+    main()
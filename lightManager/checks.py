@@ -0,0 +1,201 @@
+"""
+Quick checks for the parts of the Lighting Manager. Run them from the top of the repository with
+
+    python runChecks.py lightManager
+
+Each check makes whatever it needs in its own temporary directory.
+"""
+import json
+import os
+
+from . import extractRigs
+from . import lightRig
+from . import profiling
+from . import sceneEvents
+
+
+class Light(object):
+    """
+    A stand-in for the LightRecords that lightCore reads from the scene
+    """
+
+    def __init__(self, name, uuid, intensity=1.0, color=(1.0, 1.0, 1.0), visibility=True):
+        self.name = name
+        self.uuid = uuid
+        self.lightType = 'pointLight'
+        self.visibility = visibility
+        self.intensity = intensity
+        self.color = color
+        self.translate = (0.0, 1.0, 2.0)
+        self.rotate = (0.0, 0.0, 0.0)
+
+
+def makeLights(count):
+    return [Light('light%s' % i, 'uuid-%s' % i, intensity=float(i), color=(1.0, 0.5, 0.25)) for i in range(count)]
+
+
+def checkLightRig(directory):
+    rig = lightRig.LightRig.fromLights(makeLights(100), scene='shot.ma')
+
+    # Both flavors give back exactly what was written
+    for extension in (lightRig.EXTENSION, lightRig.BINARY_EXTENSION):
+        path = lightRig.write(os.path.join(directory, 'lights' + extension), rig)
+        loaded = lightRig.read(path)
+        assert len(loaded) == 100
+        assert loaded.info['scene'] == 'shot.ma'
+        assert list(loaded.lights()) == list(rig.lights())
+
+
+def checkLegacy(directory):
+    path = os.path.join(directory, 'old.json')
+    with open(path, 'w') as f:
+        json.dump({'key': {'lightType': 'spotLight', 'intensity': 2, 'color': [1, 0, 0],
+                           'translate': [0, 0, 0], 'rotation': [0, 90, 0]}}, f)
+
+    rig = lightRig.read(path)
+    light, = rig.lights()
+    assert light['name'] == 'key' and light['intensity'] == 2.0 and light['rotate'] == (0.0, 90.0, 0.0), light
+
+
+def checkDelta(directory):
+    lights = makeLights(3)
+    rig = lightRig.LightRig.fromLights(lights)
+
+    # Nothing has changed, so there is nothing to do
+    assert not lightRig.delta(rig, lights)
+
+    # A light found by its name when its uuid changed, one changed light, and one that is gone
+    lights[0].uuid = 'renamed'
+    lights[1].intensity = 10.0
+    del lights[2]
+
+    result = lightRig.delta(rig, lights)
+    assert result.unchanged == 1, result.report()
+    assert result.report()['changed'] == {'light1': {'intensity': 1.0}}, result.report()
+    assert result.report()['missing'] == ['light2'], result.report()
+
+
+def checkExtractRigs(directory):
+    scenes = []
+    for i in range(4):
+        rig = lightRig.LightRig.fromLights(makeLights(i + 1))
+        scenes.append(lightRig.write(os.path.join(directory, 'shot%s%s' % (i, lightRig.EXTENSION)), rig))
+
+    # A scene that can't be read goes in the report as an error, and doesn't stop the others
+    broken = os.path.join(directory, 'broken%s' % lightRig.EXTENSION)
+    with open(broken, 'w') as f:
+        f.write('not a rig')
+    scenes.append(broken)
+
+    # We check it both in this process and with a pool of processes
+    for processes in (1, 2):
+        results = list(extractRigs.extractAll(scenes, reader='standin', processes=processes,
+                                              rigDirectory=os.path.join(directory, 'rigs%s' % processes)))
+        counts = dict((os.path.basename(r['scene']), r.get('count')) for r in results)
+        assert counts == {'shot0.rig': 1, 'shot1.rig': 2, 'shot2.rig': 3, 'shot3.rig': 4, 'broken.rig': None}, counts
+        assert sum('error' in r for r in results) == 1
+
+    # Scenes with the same name in different folders each get their own rig
+    for shot in ('shotA', 'shotB'):
+        os.makedirs(os.path.join(directory, shot))
+    scenes = [lightRig.write(os.path.join(directory, shot, 'lighting' + lightRig.EXTENSION),
+                             lightRig.LightRig.fromLights(makeLights(count)))
+              for shot, count in (('shotA', 1), ('shotB', 2))]
+    rigDirectory = os.path.join(directory, 'rigs')
+    results = extractRigs.extractAll(scenes, reader='standin', processes=1, rigDirectory=rigDirectory)
+    rigs = dict((os.path.relpath(r['rig'], rigDirectory), len(lightRig.read(r['rig']))) for r in results)
+    assert rigs == {os.path.join('shotA', 'lighting.rig'): 1, os.path.join('shotB', 'lighting.rig'): 2}, rigs
+
+
+def checkProfiling(directory):
+    profiler = profiling.Profiler(enabled=True, output=os.path.join(directory, 'profile.jsonl'))
+    with profiler.span('outer', lights=3):
+        profiler.count('sceneQueries')
+        with profiler.span('inner'):
+            profiler.count('sceneQueries', 2)
+    profiler.close()
+
+    # Every span counts what happened inside it, including inside the spans within it
+    inner, outer = profiler.events
+    assert outer['args'] == {'lights': 3, 'sceneQueries': 3}, outer
+    assert inner['args'] == {'sceneQueries': 2}, inner
+
+    trace = profiler.chromeTrace()['traceEvents']
+    assert [event['name'] for event in trace] == ['inner', 'outer']
+
+    with open(os.path.join(directory, 'profile.jsonl')) as f:
+        assert len(f.readlines()) == 2
+
+
+def checkCreateLights(directory):
+    from . import lightCore
+    from maya import cmds
+
+    # The lights we make from a rig can be read back from the scene
+    cmds.file(new=True, force=True)
+    created = lightCore.createLights(lightRig.LightRig.fromLights(makeLights(3)))
+    assert len(created) == 3, created
+    states = lightCore.getLightStates()
+    assert sorted(light.intensity for light in states) == [0.0, 1.0, 2.0]
+
+
+def checkSceneWatcher(directory):
+    # The watcher reads lights from our stand-ins by their uuids, so we can see what it hands over without Maya
+    lights = dict((light.uuid, light) for light in makeLights(4))
+    batches = []
+    watcher = sceneEvents.SceneWatcher(lambda *batch: batches.append(batch), sceneEvents.EventSource(),
+                                       read=lambda uuids: [lights[uuid] for uuid in uuids if uuid in lights])
+
+    source = watcher.source
+    source.nodeAdded('uuid-0')
+    source.attributeChanged('uuid-0')
+    source.attributeChanged('uuid-1')
+    source.attributeChanged('uuid-1')
+    source.nodeRemoved('uuid-2')
+    # A light that was made and deleted before the flush is never handed over
+    source.nodeAdded('uuid-3')
+    source.nodeRemoved('uuid-3')
+    watcher.flush()
+
+    # A new light isn't also handed over as changed, and every light is only handed over once
+    added, removed, changed = batches.pop()
+    assert [light.uuid for light in added] == ['uuid-0'], added
+    assert removed == ['uuid-2'], removed
+    assert [light.uuid for light in changed] == ['uuid-1'], changed
+
+    # Once stopped, nothing reaches the watcher
+    watcher.stop()
+    source.nodeAdded('uuid-3')
+    watcher.flush()
+    assert batches.pop() == ([], [], [])
+
+
+def checkWatchTransform(directory):
+    from . import lightCore
+    from maya import cmds
+
+    # Renaming or moving a light's transform changes its record, so the watcher has to hear about it
+    cmds.file(new=True, force=True)
+    light, = lightCore.createLights(lightRig.LightRig.fromLights(makeLights(1)))
+    record, = lightCore.getLightStates([light])
+
+    batches = []
+    watcher = sceneEvents.SceneWatcher(lambda *batch: batches.append(batch), lightCore.MayaEventSource(),
+                                       read=lambda uuids: lightCore.getLightStates(cmds.ls(uuids, long=True)))
+    try:
+        watcher.watch([record.uuid])
+        transform = cmds.rename(record.transform, 'keyLight')
+        cmds.setAttr(transform + '.translateX', 5)
+        watcher.flush()
+    finally:
+        watcher.stop()
+
+    added, removed, changed = batches.pop()
+    assert [(r.name, r.translate[0]) for r in changed] == [('keyLight', 5.0)], changed
+
+
+# The checks that work in plain Python
+CHECKS = [checkLightRig, checkLegacy, checkDelta, checkExtractRigs, checkProfiling, checkSceneWatcher]
+
+# And the ones that need Maya, which are only run in mayapy
+MAYA_CHECKS = [checkCreateLights, checkWatchTransform]
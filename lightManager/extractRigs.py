@@ -0,0 +1,236 @@
+"""
+A command line tool that takes an inventory of the lights in many scene files at once, without opening Maya's UI.
+
+Run it with mayapy so that it has access to Maya:
+
+    mayapy -m lightManager.extractRigs shots/*.ma --processes 8 --report lights.jsonl --rigs /path/to/rigs
+
+Opening scenes one at a time in a single Maya is slow, so we use a pool of processes instead.
+Each process starts its own headless Maya once, and then opens one scene after another.
+
+The report is JSON lines, with one line for each scene holding its lights as the columns of a rig,
+followed by one line with a summary. Each line is written as soon as its scene is done,
+so the report can be read while it's still being written, and a crash part way through doesn't lose what was done.
+
+Referenced scenes are loaded, so lights that come in from a referenced light rig are counted just like the Lighting
+Manager shows them. Giving --no-references skips loading them, which is quicker but leaves those lights out.
+
+With --rigs, the rigs are laid out in the same folders as the scenes, starting from the folder they all share,
+so shotA/lighting.ma and shotB/lighting.ma get their own rigs.
+
+Giving --reader standin reads rig files in place of scenes, which lets us try this out without Maya.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+
+from . import lightRig
+from .profiling import timer
+
+
+class MayaSceneReader(object):
+    """
+    Opens scenes in a headless Maya and reads their lights
+    """
+
+    def __init__(self, loadReferences=True):
+        self.loadReferences = loadReferences
+
+        # We need to start Maya before we can use any of its commands, and we only want to do that once per process
+        import maya.standalone
+        maya.standalone.initialize(name='python')
+
+        from maya import cmds
+        from . import lightCore
+        self.cmds = cmds
+        self.lightCore = lightCore
+
+    def read(self, path):
+        # Light rigs are often referenced into a shot, so we load the references to read their lights too
+        depth = 'all' if self.loadReferences else 'none'
+        self.cmds.file(path, open=True, force=True, prompt=False, loadReferenceDepth=depth)
+        return lightRig.LightRig.fromLights(self.lightCore.getLightStates(), scene=path)
+
+
+class StandInSceneReader(object):
+    """
+    Reads rig files as if they were scenes, so we can run everything without Maya
+    """
+
+    def __init__(self, loadReferences=True):
+        # Rig files don't have references, so there's nothing to load
+        pass
+
+    def read(self, path):
+        rig = lightRig.read(path)
+        rig.info['scene'] = path
+        return rig
+
+
+# These are the readers that can be picked from the command line
+READERS = {'maya': MayaSceneReader, 'standin': StandInSceneReader}
+
+# Each worker process keeps its own reader here, so Maya is only started once per process
+_reader = None
+
+
+def startWorker(reader, loadReferences=True):
+    """
+    Runs once in each worker process when it starts
+    Args:
+        reader: the name of the reader to use from READERS
+        loadReferences: whether the reader should load the references of each scene
+    """
+    global _reader
+    _reader = READERS[reader](loadReferences=loadReferences)
+
+
+def rigPaths(paths, rigDirectory, extension):
+    """
+    Works out where the rig of each scene goes, so that no two scenes write over each other's rig.
+    The rigs go in the same folders as the scenes, starting from the folder all of the scenes share
+    Args:
+        paths: the scenes to read
+        rigDirectory: the directory to write the rigs to
+        extension: the extension of the rigs
+
+    Returns:
+        dict: the path of the rig for each scene
+    """
+    # commonprefix compares letter by letter, so we take the folder of it to get a folder all the scenes are in
+    root = os.path.dirname(os.path.commonprefix([os.path.abspath(path) for path in paths]))
+
+    rigs = {}
+    taken = set()
+    for path in paths:
+        if path in rigs:
+            continue
+        relative, sceneExtension = os.path.splitext(os.path.relpath(os.path.abspath(path), root))
+        # The same scene saved as both .ma and .mb would still share a name, so those keep their extension in it
+        if relative in taken:
+            relative += '_' + sceneExtension.lstrip('.')
+        taken.add(relative)
+        rigs[path] = os.path.join(rigDirectory, relative + extension)
+    return rigs
+
+
+def extract(job):
+    """
+    Reads the lights of a single scene in a worker process
+    Args:
+        job: a tuple of the scene path and the path to write its rig to, or None to not write one
+
+    Returns:
+        dict: the line of the report for this scene
+    """
+    path, rigPath = job
+    start = timer()
+    try:
+        rig = _reader.read(path)
+        result = {'scene': path, 'count': len(rig), 'columns': rig.columns}
+
+        if rigPath:
+            result['rig'] = lightRig.write(rigPath, rig)
+    except Exception as e:
+        # One broken scene shouldn't stop the others, so we put the error in the report and carry on
+        result = {'scene': path, 'error': '%s: %s' % (type(e).__name__, e)}
+
+    result['seconds'] = timer() - start
+    return result
+
+
+def extractAll(paths, reader='maya', processes=None, rigDirectory=None, compress=False, loadReferences=True):
+    """
+    Reads the lights of many scenes using a pool of processes
+    Args:
+        paths: the scenes to read
+        reader: the name of the reader to use from READERS
+        processes: how many processes to use. Defaults to the number of CPUs, and 1 runs everything in this process
+        rigDirectory: if given, a rig is written here for every scene, in the same folders as the scenes
+        compress: whether to write the binary flavor of the rigs
+        loadReferences: whether to load the references of each scene, so the lights in them are read too
+
+    Yields:
+        dict: a line of the report for every scene, in the order they finish
+    """
+    rigs = {}
+    if rigDirectory:
+        rigs = rigPaths(paths, rigDirectory, lightRig.BINARY_EXTENSION if compress else lightRig.EXTENSION)
+        # We make all the folders before we start, so the workers don't race each other to make the same one
+        for folder in set(os.path.dirname(rig) for rig in rigs.values()):
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+
+    jobs = [(path, rigs.get(path)) for path in paths]
+
+    if processes == 1:
+        startWorker(reader, loadReferences)
+        for job in jobs:
+            yield extract(job)
+        return
+
+    # The initializer gives each worker its own reader when it starts
+    pool = multiprocessing.Pool(processes, initializer=startWorker, initargs=(reader, loadReferences))
+    try:
+        # imap_unordered hands us each result as soon as it's ready instead of waiting for all of them
+        for result in pool.imap_unordered(extract, jobs):
+            yield result
+    finally:
+        pool.close()
+        pool.join()
+
+
+def writeReport(results, f):
+    """
+    Writes the results to a report as they come in, one JSON line each, followed by a summary line
+    Returns:
+        dict: the summary
+    """
+    start = timer()
+    summary = {'scenes': 0, 'lights': 0, 'errors': 0}
+    for result in results:
+        f.write(json.dumps(result, sort_keys=True) + '\n')
+        # We flush every line so anyone reading the report sees it straight away
+        f.flush()
+
+        summary['scenes'] += 1
+        summary['lights'] += result.get('count', 0)
+        summary['errors'] += 'error' in result
+
+    summary['seconds'] = timer() - start
+    f.write(json.dumps({'summary': summary}, sort_keys=True) + '\n')
+    f.flush()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Takes an inventory of the lights in many scene files",
+                                     usage="mayapy -m lightManager.extractRigs shots/*.ma --report lights.jsonl")
+    parser.add_argument('scenes', nargs='+', help="The scene files to read")
+    parser.add_argument('-p', '--processes', type=int, help="How many processes to use. Defaults to the number of CPUs")
+    parser.add_argument('-r', '--report', help="The JSON lines file to write the report to. Defaults to printing it")
+    parser.add_argument('--rigs', help="Also write a rig for every scene to this directory")
+    parser.add_argument('--compress', action='store_true', help="Write the rigs as compressed binary files")
+    parser.add_argument('--no-references', dest='loadReferences', action='store_false',
+                        help="Don't load referenced scenes. This is quicker, but the lights in them are left out")
+    parser.add_argument('--reader', choices=sorted(READERS), default='maya',
+                        help="How to read the scenes. standin reads rig files in place of scenes, for testing")
+    args = parser.parse_args()
+
+    results = extractAll(args.scenes, reader=args.reader, processes=args.processes,
+                         rigDirectory=args.rigs, compress=args.compress, loadReferences=args.loadReferences)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            summary = writeReport(results, f)
+    else:
+        summary = writeReport(results, sys.stdout)
+
+    # The summary goes to stderr too so that it isn't lost among the report lines
+    sys.stderr.write('Read %(lights)s lights from %(scenes)s scenes with %(errors)s errors in %(seconds).2fs\n' % summary)
+
+
+if __name__ == '__main__':
+    main()
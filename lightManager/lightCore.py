@@ -0,0 +1,547 @@
+"""
+The light data engine of the Lighting Manager, which everything that doesn't need a UI lives in.
+
+It reads the state of many lights in one go, writes many changes as a single undo, and saves and loads rigs.
+Both versions of the Lighting Manager (lightManager for Maya 2017 and above, lightManager2016Below for older Mayas)
+and the command line tools use this, so a fix made here is made for all of them.
+
+Importing Qt and PyMel takes a long time, and this module gets imported when Maya starts up for every artist,
+even the ones who never open the Lighting Manager. So this module only uses maya.cmds and the Maya API,
+which Maya has already loaded, and the UI in lightManagerUI is only imported the first time we open it.
+"""
+import array
+import logging
+import math
+import os
+import time
+import contextlib
+from maya import cmds
+from maya.api import OpenMaya as om
+
+# The rig format we save and load our lights with
+from . import lightRig
+
+# Spans and counters that let us see where the time goes. They do nothing unless profiling is turned on
+from . import profiling
+
+# The event source that our Maya one builds on, which doesn't need Maya itself
+from .sceneEvents import EventSource
+
+# We want a logger specifically for this tool, so lets grab one so that we can control it on its own
+logger = logging.getLogger('LightingManager')
+
+# Loggers have different levels we can log to.
+# We can configure the current level to make it disable certain logs when we don't want it.
+# We show info and above unless the LIGHTMANAGER_LOG_LEVEL environment variable asks for something else, like DEBUG
+logger.setLevel(os.environ.get('LIGHTMANAGER_LOG_LEVEL', 'INFO').upper())
+
+# These are all the types of lights our manager knows about
+LIGHT_TYPES = ["areaLight", "spotLight", "pointLight", "directionalLight", "volumeLight"]
+
+
+class LightRecord(object):
+    """
+    A plain record of the state of a single light.
+
+    Our widgets used to ask the scene for each value they needed, one at a time, for every light.
+    Instead we read everything about all the lights in one go with getLightStates and hand these records to the widgets.
+    """
+    # __slots__ tells python exactly which attributes this class has so it doesn't need a dictionary for each record
+    __slots__ = ('shape', 'transform', 'name', 'uuid', 'lightType', 'visibility', 'intensity', 'color',
+                 'translate', 'rotate')
+
+    def __init__(self, shape, transform, name, uuid, lightType, visibility, intensity, color, translate, rotate):
+        # The full paths of the light shape and its transform, which are always unique
+        self.shape = shape
+        self.transform = transform
+        # The short name of the transform that we show to the user
+        self.name = name
+        # The uuid stays the same even if the light is renamed
+        self.uuid = uuid
+        self.lightType = lightType
+        self.visibility = visibility
+        self.intensity = intensity
+        self.color = color
+        self.translate = translate
+        self.rotate = rotate
+
+    def __repr__(self):
+        return 'LightRecord(%r)' % self.name
+
+    def sameAs(self, other):
+        # Two records are the same if every value in them is the same
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.__slots__)
+
+
+def getLightStates(lights=None):
+    """
+    Reads the state of many lights in a single pass
+    Args:
+        lights: a list of light shapes or transforms. If not given, every light in the scene is read
+
+    Returns:
+        list: a LightRecord for every light
+    """
+    # A single ls call finds all our lights, and also turns any transforms we're given into their light shapes
+    profiling.count('sceneQueries')
+    if lights is None:
+        shapes = cmds.ls(type=LIGHT_TYPES, long=True)
+    else:
+        shapes = cmds.ls([str(light) for light in lights], dag=True, type=LIGHT_TYPES, long=True) if lights else []
+
+    # We put all of them in one selection list so that the API can look them all up at once
+    selection = om.MSelectionList()
+    for shape in shapes:
+        selection.add(shape)
+
+    records = []
+    for i in range(selection.length()):
+        shapePath = selection.getDagPath(i)
+        node = om.MFnDependencyNode(shapePath.node())
+
+        # The transform is the shape's path with the last part removed
+        transformPath = om.MDagPath(shapePath)
+        transformPath.pop()
+        transform = om.MFnTransform(transformPath)
+
+        # Reading the plugs through the API is much faster than a getAttr for each of them
+        color = node.findPlug('color', False)
+        translation = transform.translation(om.MSpace.kTransform)
+        rotation = transform.rotation()
+
+        records.append(LightRecord(
+            shape=shapePath.fullPathName(),
+            transform=transformPath.fullPathName(),
+            name=transformPath.partialPathName(),
+            uuid=node.uuid().asString(),
+            lightType=node.typeName,
+            visibility=node.findPlug('visibility', False).asBool(),
+            intensity=node.findPlug('intensity', False).asDouble(),
+            color=tuple(color.child(c).asDouble() for c in range(3)),
+            translate=(translation.x, translation.y, translation.z),
+            # The API gives us radians, but everything else in Maya uses degrees
+            rotate=(math.degrees(rotation.x), math.degrees(rotation.y), math.degrees(rotation.z)),
+        ))
+
+    return records
+
+
+# This counts how many sceneBatches we're inside of, so that only the outermost one turns refreshing back on
+_batchDepth = [0]
+
+
+@contextlib.contextmanager
+def sceneBatch(name):
+    """
+    A context manager that turns off viewport refreshes and records everything inside it as one undo
+    Args:
+        name: the name of the undo chunk
+    """
+    cmds.undoInfo(openChunk=True, chunkName=name)
+    if not _batchDepth[0]:
+        cmds.refresh(suspend=True)
+    _batchDepth[0] += 1
+    try:
+        yield
+    finally:
+        # The finally makes sure we turn everything back on even if there was an error
+        _batchDepth[0] -= 1
+        if not _batchDepth[0]:
+            cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+
+
+def setVisibilities(lights, visible):
+    """
+    Shows and hides many lights at once, as a single undo
+    Args:
+        lights: the LightRecords of the lights to change
+        visible: whether each of those lights should be visible
+
+    Returns:
+        list: the records of the lights that actually changed, which have been updated to match the scene
+    """
+    # We only touch the lights that aren't already how we want them
+    changed = [(light, bool(value)) for light, value in zip(lights, visible) if light.visibility != bool(value)]
+    if not changed:
+        return []
+
+    # hide and showHidden take a whole list of nodes, so this is two commands no matter how many lights there are
+    shown = [light.shape for light, value in changed if value]
+    hidden = [light.shape for light, value in changed if not value]
+
+    # We put it all in one undo, and stop the viewport from redrawing until we're done
+    with sceneBatch('lightVisibility'):
+        if shown:
+            cmds.showHidden(shown)
+        if hidden:
+            cmds.hide(hidden)
+    profiling.count('sceneWrites', bool(shown) + bool(hidden))
+
+    for light, value in changed:
+        light.visibility = value
+    return [light for light, value in changed]
+
+
+def createLights(rig):
+    """
+    Creates all the lights in a rig in one go, as a single undo
+    Args:
+        rig: a LightRig, or a list of light dictionaries like LightRig.lights gives
+
+    Returns:
+        list: the full paths of the transforms of the lights that were created
+    """
+    transforms = []
+    lights = rig.lights() if isinstance(rig, lightRig.LightRig) else rig
+
+    # We put it all in one undo, and stop the viewport from redrawing until we're done
+    with sceneBatch('createLights'):
+        for light in lights:
+            lightType = light.get('lightType')
+            if lightType not in LIGHT_TYPES:
+                logger.info('Cannot find a corresponding light type for %s (%s)', light['name'], lightType)
+                continue
+
+            # createNode is much quicker than going through PyMel or shadingNode, and Maya fixes up clashing names for us
+            name = light['name'].split('|')[-1]
+            transform = cmds.createNode('transform', name=name)
+            shape = cmds.createNode(lightType, name='%sShape' % name, parent=transform)
+
+            cmds.setAttr('%s.translate' % transform, *light.get('translate', (0, 0, 0)), type='double3')
+            cmds.setAttr('%s.rotate' % transform, *light.get('rotate', (0, 0, 0)), type='double3')
+            cmds.setAttr('%s.intensity' % shape, light.get('intensity', 1))
+            cmds.setAttr('%s.color' % shape, *light.get('color', (1, 1, 1)), type='double3')
+            cmds.setAttr('%s.visibility' % shape, light.get('visibility', True))
+            # That's two nodes made and five attributes set
+            profiling.count('sceneWrites', 7)
+
+            transforms.append(transform)
+
+        # Lights only light the scene when they're in the default light set, so we add all of them with one command
+        if transforms:
+            cmds.sets(transforms, add='defaultLightSet')
+            profiling.count('sceneWrites')
+
+    return cmds.ls(transforms, long=True)
+
+
+def applyRig(rig, create=True):
+    """
+    Makes the lights in the scene match a rig, by only changing the values that are different.
+    Lights in the rig are matched to the lights in the scene by their uuid, or by their name if the uuid isn't found.
+    Args:
+        rig: a LightRig
+        create: whether to create the lights in the rig that don't exist in the scene
+
+    Returns:
+        dict: what changed, with the attributes that were set on each light, the lights that were missing,
+              the lights that were created and how many lights were already the same
+    """
+    # We read every light in one go and work out what's different without touching the scene
+    delta = lightRig.delta(rig, getLightStates())
+    report = delta.report()
+    report['created'] = []
+
+    # If nothing is different, we don't even need an undo
+    if not delta:
+        return report
+
+    with sceneBatch('applyLightRig'):
+        writeChanges(delta.changed)
+
+        if create and delta.missing:
+            report['created'] = createLights(delta.missing)
+
+    return report
+
+
+def writeChanges(changes, name='lightChanges'):
+    """
+    Writes changes to many lights at once, as a single undo
+    Args:
+        changes: a list of each LightRecord to change, with a dictionary of the attributes to set and their new values
+        name: the name of the undo chunk
+
+    Returns:
+        list: the records that were changed, which have been updated to match the scene
+    """
+    if not changes:
+        return []
+
+    with sceneBatch(name):
+        # Visibility can be set for many lights with one command, so we gather it up
+        shown = []
+        hidden = []
+
+        for light, values in changes:
+            for attr, value in values.items():
+                if attr == 'visibility':
+                    (shown if value else hidden).append(light.shape)
+                    continue
+
+                # The position lives on the transform and everything else on the light shape
+                node = light.transform if attr in ('translate', 'rotate') else light.shape
+                if isinstance(value, (tuple, list)):
+                    cmds.setAttr('%s.%s' % (node, attr), *value, type='double3')
+                else:
+                    cmds.setAttr('%s.%s' % (node, attr), value)
+                profiling.count('sceneWrites')
+
+        if shown:
+            cmds.showHidden(shown)
+        if hidden:
+            cmds.hide(hidden)
+        profiling.count('sceneWrites', bool(shown) + bool(hidden))
+
+    for light, values in changes:
+        for attr, value in values.items():
+            setattr(light, attr, value)
+    return [light for light, values in changes]
+
+
+def editLights(lights, scale=None, offset=None, tint=None, color=None, visibility=None):
+    """
+    Edits many lights at once, as a single undo
+    Args:
+        lights: the LightRecords of the lights to edit
+        scale: multiplies the intensity of every light
+        offset: is added to the intensity of every light, after it's scaled
+        tint: an r, g, b color that every light's color is multiplied by
+        color: an r, g, b color that replaces every light's color
+        visibility: True or False to show or hide every light, or 'toggle' to flip each of them
+
+    Returns:
+        list: the records of the lights that changed, which have been updated to match the scene
+    """
+    lights = list(lights)
+
+    # We work out the new values for a whole column at once, then only keep the ones that are actually different
+    columns = {}
+    if scale is not None or offset is not None:
+        scale = 1.0 if scale is None else scale
+        offset = offset or 0.0
+        columns['intensity'] = [light.intensity * scale + offset for light in lights]
+
+    if color is not None:
+        columns['color'] = [tuple(color)] * len(lights)
+    elif tint is not None:
+        r, g, b = tint
+        columns['color'] = [(light.color[0] * r, light.color[1] * g, light.color[2] * b) for light in lights]
+
+    if visibility == 'toggle':
+        columns['visibility'] = [not light.visibility for light in lights]
+    elif visibility is not None:
+        columns['visibility'] = [bool(visibility)] * len(lights)
+
+    changes = []
+    for i, light in enumerate(lights):
+        values = dict((attr, column[i]) for attr, column in columns.items() if getattr(light, attr) != column[i])
+        if values:
+            changes.append((light, values))
+
+    return writeChanges(changes, name='editLights')
+
+
+# These are the values a snapshot keeps for each light, with their kind and how many values each light has
+SNAPSHOT_COLUMNS = [column for column in lightRig.COLUMNS if column[0] in lightRig.APPLIED]
+
+
+class Snapshot(object):
+    """
+    The state of many lights at one moment, kept in memory so we can switch back to it quickly.
+
+    Saving and importing a rig file to flip between two lighting setups means going through the disk every time.
+    A snapshot instead keeps each value in a compact array, one for each attribute, laid out in the same order as its uuids.
+
+    a = Snapshot.capture('key light warm')
+    ... change some lights ...
+    applySnapshot(a)
+    """
+
+    def __init__(self, name, lights):
+        lights = list(lights)
+        self.name = name
+        # The uuids find our lights again even if they've been renamed
+        self.uuids = [light.uuid for light in lights]
+        self.rows = dict((uuid, row) for row, uuid in enumerate(self.uuids))
+
+        self.values = {}
+        for attr, kind, size in SNAPSHOT_COLUMNS:
+            values = array.array(lightRig.TYPECODES[kind])
+            if size == 1:
+                values.extend(getattr(light, attr) for light in lights)
+            else:
+                values.extend(value for light in lights for value in getattr(light, attr))
+            self.values[attr] = values
+
+    @classmethod
+    def capture(cls, name, lights=None):
+        """
+        Takes a snapshot of the given lights, or of every light in the scene
+        """
+        return cls(name, getLightStates(lights))
+
+    def __len__(self):
+        return len(self.uuids)
+
+    def __repr__(self):
+        return 'Snapshot(%r, %s lights)' % (self.name, len(self))
+
+    def changes(self, lights, tolerance=1e-6):
+        """
+        Works out which values have to change for the given lights to match this snapshot
+        Args:
+            lights: the LightRecords of the lights as they are now. Lights that aren't in the snapshot are left alone
+            tolerance: numbers closer together than this count as the same
+
+        Returns:
+            list: each record that differs, with a dictionary of the attributes to change and their values in the snapshot
+        """
+        result = []
+        for light in lights:
+            row = self.rows.get(light.uuid)
+            if row is None:
+                continue
+
+            changes = {}
+            for attr, kind, size in SNAPSHOT_COLUMNS:
+                values = self.values[attr]
+                current = getattr(light, attr)
+                if size == 1:
+                    value = values[row]
+                    if kind == 'bool':
+                        value = bool(value)
+                        different = value != bool(current)
+                    else:
+                        different = abs(value - current) > tolerance
+                else:
+                    value = tuple(values[row * size:(row + 1) * size])
+                    different = any(abs(a - b) > tolerance for a, b in zip(value, current))
+
+                if different:
+                    changes[attr] = value
+
+            if changes:
+                result.append((light, changes))
+        return result
+
+
+def applySnapshot(snapshot):
+    """
+    Puts the lights back the way they were in a snapshot, only changing the values that are different, as a single undo
+    Returns:
+        list: the records of the lights that changed, which have been updated to match the scene
+    """
+    # We look up the lights by their uuids in one go, and any that have been deleted since are just skipped
+    nodes = cmds.ls(snapshot.uuids, long=True) if snapshot.uuids else []
+    profiling.count('sceneQueries')
+    return writeChanges(snapshot.changes(getLightStates(nodes)), name='applySnapshot')
+
+
+class MayaEventSource(EventSource):
+    """
+    Listens to Maya's scene messages using the API.
+    Callbacks must be removed when we're done with them, otherwise Maya will keep calling into code that's gone.
+    """
+
+    def __init__(self):
+        super(MayaEventSource, self).__init__()
+        self.callbacks = []
+        # The callbacks for each light are on its shape and its transform, so we keep them by uuid to remove them later
+        self.nodeCallbacks = {}
+
+    def start(self, watcher):
+        super(MayaEventSource, self).start(watcher)
+        # We only want to hear about our light types being added or removed
+        for lightType in LIGHT_TYPES:
+            self.callbacks.append(om.MDGMessage.addNodeAddedCallback(self.onNodeAdded, lightType))
+            self.callbacks.append(om.MDGMessage.addNodeRemovedCallback(self.onNodeRemoved, lightType))
+
+    def stop(self):
+        super(MayaEventSource, self).stop()
+        ids = self.callbacks + [i for ids in self.nodeCallbacks.values() for i in ids]
+        if ids:
+            om.MMessage.removeCallbacks(ids)
+        self.callbacks = []
+        self.nodeCallbacks = {}
+
+    def watch(self, uuids):
+        for uuid in uuids:
+            if uuid in self.nodeCallbacks:
+                continue
+            selection = om.MSelectionList()
+            try:
+                selection.add(om.MUuid(uuid))
+            except RuntimeError:
+                # The light is already gone
+                continue
+            shape = selection.getDependNode(0)
+
+            # Our records have the name, translate and rotate of the light's transform too, so we listen to it as well.
+            # Whichever of the two changes, we pass on the uuid of the light shape, since that's what our records use
+            ids = []
+            for node in (shape, om.MFnDagNode(shape).parent(0)):
+                ids.append(om.MNodeMessage.addAttributeChangedCallback(node, self.onAttributeChanged, uuid))
+                ids.append(om.MNodeMessage.addNameChangedCallback(node, self.onNameChanged, uuid))
+            self.nodeCallbacks[uuid] = ids
+
+    def unwatch(self, uuids):
+        ids = [i for uuid in uuids for i in self.nodeCallbacks.pop(uuid, [])]
+        if ids:
+            om.MMessage.removeCallbacks(ids)
+
+    # Maya calls these for us. We just find the uuid and pass it on
+    def onNodeAdded(self, node, *args):
+        self.nodeAdded(om.MFnDependencyNode(node).uuid().asString())
+
+    def onNodeRemoved(self, node, *args):
+        self.nodeRemoved(om.MFnDependencyNode(node).uuid().asString())
+
+    def onAttributeChanged(self, message, plug, otherPlug, uuid):
+        # This is called for lots of things, but we only care about values being set
+        if message & om.MNodeMessage.kAttributeSet:
+            self.attributeChanged(uuid)
+
+    def onNameChanged(self, node, previousName, uuid):
+        self.attributeChanged(uuid)
+
+
+def getDirectory():
+    """
+    Gives back the directory we save our rigs in, creating it if it doesn't exist
+    """
+    directory = os.path.join(cmds.internalVar(userAppDir=True), 'lightManager')
+    if not os.path.exists(directory):
+        os.mkdir(directory)
+    return directory
+
+
+def exportLights(path=None, lights=None, compress=False):
+    """
+    Saves lights to a rig file. This doesn't need a UI, so it works in mayapy and batch scripts too
+    Args:
+        path: the file to write. If not given, a new file named after the current time is made in getDirectory()
+        lights: the lights to save, as names or LightRecords. If not given, every light in the scene is saved
+        compress: whether to write the binary flavor of the rig when no path is given
+
+    Returns:
+        str: the path of the rig
+    """
+    # We read the current state of the lights all in one go, in case they've been changed since we got their records
+    if lights is None:
+        lights = getLightStates()
+    else:
+        lights = getLightStates([getattr(light, 'shape', light) for light in lights])
+
+    # The rig stores the lights as columns of values, with a header that says which version of the format it is
+    rig = lightRig.LightRig.fromLights(lights, scene=cmds.file(query=True, sceneName=True))
+
+    # Naming the file down to the second means we never overwrite an older rig
+    if not path:
+        extension = lightRig.BINARY_EXTENSION if compress else lightRig.EXTENSION
+        path = os.path.join(getDirectory(), 'lightRig_%s%s' % (time.strftime('%Y%m%d_%H%M%S'), extension))
+
+    lightRig.write(path, rig)
+    logger.info('Saving file to %s', path)
+    return path
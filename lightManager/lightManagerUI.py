@@ -0,0 +1,1307 @@
+"""
+Fair Warning: This will be the most complex example in the course using more advanced maya features alongside
+              more advanced python features than previous examples.
+"""
+
+# First of all let me grab the Qt module because it has somethings I want that I don't need to use often
+import Qt
+
+# I will use the following modules more often, so let me import them directly
+from Qt import QtWidgets, QtCore, QtGui
+
+# This is the logging module
+# It is a much better way of logging output instead of using print statements
+import logging
+
+# We'll do a basic configuration of the loggers
+# This module is only imported when the Lighting Manager is opened, so this doesn't happen when Maya starts up
+logging.basicConfig()
+
+# Everything that doesn't need a UI lives in the lightCore module, and we share its logger too
+from .lightCore import (logger, LIGHT_TYPES, LightRecord, getLightStates, setVisibilities, createLights, applyRig,
+                           MayaEventSource, Snapshot, applySnapshot, exportLights, getDirectory, editLights)
+from . import lightRig
+from . import profiling
+from . import sceneEvents
+
+# Okay, so this is kind of messy but necessary at the moment.
+# While Qt.py lets us abstract the actual Qt library, there are a few things it cannot do yet and a few support libraries we need that we have to import ourtselves
+# So I need to check the correct binding we're using under Qt.py
+# If you're specifically using a Qt binding, then just use the import that makes sense for you. I'll elaborate below
+if Qt.__binding__.startswith('PyQt'):
+    # If we're using PyQt4 or PyQt5 we need to import sip
+    logger.debug('Using sip')
+    # So we import wrapInstance from sip and alias it to wrapInstance so that it's the same as the others
+    from sip import wrapinstance as wrapInstance
+    # Also PyQt uses pyqtSignal instead of Signal so we will import it and alias it to Signal
+    from Qt.QtCore import pyqtSignal as Signal
+elif Qt.__binding__ == 'PySide':
+    # If we're using PySide (Maya 2016 and earlier), we'll use shiboken instead
+    logger.debug('Using shiboken')
+    # Shiboken already uses the correct names for both wrapInstance and Signal so we just need to import them without aliasing them
+    from shiboken import wrapInstance
+    from Qt.QtCore import Signal
+else:
+    # Finally, the only option left is PySide2(Maya 2017 and higher) which uses shiboken2
+    logger.debug('Using shiboken2')
+    # Again, this uses the correct naming so we just import without aliasing
+    from shiboken2 import wrapInstance
+    from Qt.QtCore import Signal
+
+# For the import statemnets above, if you feel like simplifying the process, then just use the part that is relevant to the Maya version you're using
+
+# This is the Maya API library for dealing with UIs
+# This is the extent of the internal Maya API that we will be using directly for this course.
+from maya import OpenMayaUI as omui
+
+# We used to use pyMel instead of maya.cmds for this project
+# PyMel is like a layer above maya.cmds and the Maya API that bridges them together to make a more python like API
+# That said, it has its shortcomings, and one of them is that importing it takes a few seconds
+# Since everything we need from it is also in maya.cmds, we use that instead
+
+# Finally from the functional tools library we import partial that will be useful for craeting temporary functions
+from functools import partial
+
+from maya import cmds
+
+
+class Throttle(QtCore.QObject):
+    """
+    Calls a function with the latest value it was given, but never more often than the given rate.
+
+    A slider fires its valueChanged signal for every pixel it moves, which means hundreds of scene writes in a single drag.
+    Instead we push every value into the throttle, it writes the first one straight away,
+    and then at most one value per interval. flush() writes whatever is still waiting, which we do when the drag ends.
+    """
+
+    def __init__(self, callback, rate=30, parent=None):
+        super(Throttle, self).__init__(parent)
+        self.callback = callback
+        # We use a sentinel object to mean nothing is waiting, since None could be a real value
+        self.empty = object()
+        self.pending = self.empty
+
+        self.timer = QtCore.QTimer(self)
+        # The rate is how many times a second we call the function
+        self.timer.setInterval(int(1000.0 / rate))
+        self.timer.timeout.connect(self.onTimeout)
+
+    def push(self, value):
+        self.pending = value
+        # If we haven't called the function recently, we call it straight away and then wait for the interval
+        if not self.timer.isActive():
+            self.flush()
+            self.timer.start()
+
+    def onTimeout(self):
+        # If nothing came in while we were waiting, we can stop the timer
+        if self.pending is self.empty:
+            self.timer.stop()
+        else:
+            self.flush()
+
+    def flush(self):
+        if self.pending is not self.empty:
+            value, self.pending = self.pending, self.empty
+            self.callback(value)
+
+
+class SceneWatcher(sceneEvents.SceneWatcher):
+    """
+    Hands over the changes to lights in batches, once Maya is idle again.
+    The collecting and batching is done by sceneEvents.SceneWatcher, this adds the Qt timer and reads the lights from Maya
+    """
+
+    def __init__(self, callback, source=None, parent=None):
+        # A timer with an interval of 0 fires as soon as Qt has nothing else to do
+        # It belongs to our parent, so it goes away with it
+        self.timer = QtCore.QTimer(parent)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.flush)
+
+        super(SceneWatcher, self).__init__(callback, source or MayaEventSource())
+
+    def schedule(self):
+        self.timer.start()
+
+    def read(self, uuids):
+        # cmds.ls can find nodes by their uuids, so we read all the lights in one go
+        return getLightStates(cmds.ls(uuids, long=True))
+
+    def stop(self):
+        self.timer.stop()
+        super(SceneWatcher, self).stop()
+
+
+# Setting a style sheet on a widget makes Qt parse it and restyle the widget, which adds up with hundreds of lights
+# So instead we draw each color swatch once, and every button showing that color shares it
+# Colors are rounded to 64 levels per channel, which looks the same but means similar colors share a swatch too
+SWATCH_LEVELS = 64
+# If the cache gets bigger than this we start it over, so it can't keep growing forever
+SWATCH_CACHE_SIZE = 4096
+_swatches = {}
+
+
+def quantizeColor(color):
+    """
+    Rounds a color of floats from 0 to 1 to one of our swatch levels
+    Returns:
+        tuple: the r, g, b levels
+    """
+    top = SWATCH_LEVELS - 1
+    return tuple(int(round(max(0.0, min(1.0, c)) * top)) for c in color)
+
+
+def swatchColor(color):
+    """
+    Gives back the QColor for the swatch of a color
+    """
+    top = SWATCH_LEVELS - 1
+    return QtGui.QColor(*[level * 255 // top for level in quantizeColor(color)])
+
+
+def swatchIcon(color, size=16):
+    """
+    Gives back an icon filled with the given color, drawing it only the first time that color is asked for
+    Args:
+        color: r, g, b floats from 0 to 1
+        size: the width and height of the icon
+
+    Returns:
+        QtGui.QIcon: the swatch
+    """
+    key = quantizeColor(color) + (size,)
+    icon = _swatches.get(key)
+    if icon is None:
+        if len(_swatches) >= SWATCH_CACHE_SIZE:
+            _swatches.clear()
+        pixmap = QtGui.QPixmap(size, size)
+        pixmap.fill(swatchColor(color))
+        icon = _swatches[key] = QtGui.QIcon(pixmap)
+    return icon
+
+
+class LightWidget(QtWidgets.QWidget):
+    """
+    Now on to the good stuff
+    This is our Basic controller for controlling lights
+
+    to display it, give it the name of a light like so
+
+    ui = LightWidget('directionalLight1')
+    ui.show()
+
+    It can also be given a LightRecord from getLightStates, which is what the LightingManager does
+    """
+
+    # This is our solo signal
+    # We are creating our own signal for other Qt objects to connect to
+    # Qt demands that we make the signal here so it knows what the class looks like
+    onSolo = Signal(bool)
+
+    # This lets the manager know that our light has been deleted, with its uuid
+    onDeleted = Signal(str)
+
+    # This is the most times a second that dragging the intensity slider will write to the scene
+    intensityRate = 30
+
+    # The size of the color swatch on our color button
+    swatchSize = 14
+
+    def __init__(self, light):
+        # Our init function takes the name of a light
+
+        # We then call the init from QWidget to make sure that our object is initialized properly
+        super(LightWidget, self).__init__()
+
+        # If we weren't given a record, we read one for the light
+        # This works for light names, transform names as well
+        if not isinstance(light, LightRecord):
+            light = getLightStates([light])[0]
+
+        # Then we store the record on this class
+        self.light = light
+
+        # Finally we call the buildUI method
+        self.buildUI()
+
+    def buildUI(self):
+        # We create a GridLayout
+        # GridLayouts are very flexible and allow us to quickly position widgets in a grid
+        layout = QtWidgets.QGridLayout(self)
+
+        # We make a checkbox with the label of our Light node's transform
+        # Our record already knows the name, so we don't need to ask the scene for it
+        self.name = name = QtWidgets.QCheckBox(self.light.name)
+        # Lets make sure its value is the same as the lights visibility
+        name.setChecked(self.light.visibility)
+        # We connect the toggled signal from the checkbox to a lambda. It will be called anytime the checkbox value changes
+        # A lambda is another name for an unnamed function that will be called later
+        # It is the same as this piece of code
+        #
+        # def setLightVisibility(self, val):
+        #     self.setAttr('visibility', val)
+        #
+        # I like using lambdas when the logic is very simple. If your logic is more complex, use a real function or method
+        name.toggled.connect(lambda val: self.setAttr('visibility', val))
+        # Finally we add it to the layout in position 0, 0 (row 0, column 0)
+        layout.addWidget(name, 0, 0)
+
+        # Now we need a button to solo the light
+        self.soloBtn = solo = QtWidgets.QPushButton('Solo')
+        # Buttons can also be checkable, in that when you click them they will stay pressed till you unpress them
+        solo.setCheckable(True)
+        # Finally we connect the toggled value of the button to another lambda
+        # This lambda will in turn tell our custom onSolo signal to emit with the same value it receive
+        # This is the same as this piece of code
+        #
+        # def emitSoloSignal(self, value):
+        #     self.onSolo.emit(value)
+        #
+        # Again, for a simple one line function that we never use again, a lambda is a good fit
+        solo.toggled.connect(lambda val: self.onSolo.emit(val))
+        # Then we add it to the grid layout in position (row 0, column 1)
+        layout.addWidget(solo, 0, 1)
+
+        # This will be our button to delete the light
+        delete = QtWidgets.QPushButton('X')
+        # The delete Light function is a little more complex so we will make it a real method and connect to it
+        delete.clicked.connect(self.deleteLight)
+        # We set the maximum width to 10, so that it's not super wide
+        delete.setMaximumWidth(10)
+        # Finally we add it to the same row, but the next column over
+        layout.addWidget(delete, 0, 2)
+
+        # We want a slider that can control the intensity of the light
+        # We tell it that we want it to be horizontal by passing it the Qt value for Horizontal
+        intensity = QtWidgets.QSlider(QtCore.Qt.Horizontal)
+        # We set the minimum and maximum value of the slider
+        intensity.setMinimum(1)
+        intensity.setMaximum(1000)
+        # Then we set its current value based of the intensity of the light itself
+        intensity.setValue(int(self.light.intensity))
+        # We then connect its value changed signal to a throttle that sets the lights intensity
+        # The throttle makes sure we don't write to the scene on every single pixel the slider moves
+        self.intensityThrottle = Throttle(lambda val: self.setAttr('intensity', val), rate=self.intensityRate, parent=self)
+        intensity.valueChanged.connect(self.intensityThrottle.push)
+        self.intensitySlider = intensity
+        # While the slider is being dragged we record everything as a single undo
+        # and when it's released we make sure the last value is written
+        intensity.sliderPressed.connect(self.startIntensityDrag)
+        intensity.sliderReleased.connect(self.endIntensityDrag)
+        # Finally we add it to the grid, on the next row down.
+        # If you notice this takes two extra variables, which tell it how many rows and columns to occupy
+        # So we are adding it to row 1, column 2 and telling it to take 1 row and 2 columns of space
+        # If you don't provide the last two arguments, they default to 1 each
+        layout.addWidget(intensity, 1, 0, 1, 2)
+
+        # This will be our button to display the color of the light
+        self.colorBtn = QtWidgets.QPushButton()
+        # We set the width and height of the button to our liking
+        self.colorBtn.setMaximumWidth(20)
+        self.colorBtn.setMaximumHeight(20)
+        self.colorBtn.setIconSize(QtCore.QSize(self.swatchSize, self.swatchSize))
+        # We remember which swatch the button shows so we don't set the same one again
+        self.swatch = None
+        # Finally we call a method to sat the buttons color based on the lights current color
+        self.setButtonColor()
+        # We then connect it to our setColor method, again something too complex to be a lambda
+        self.colorBtn.clicked.connect(self.setColor)
+        # Finally we add it to the grid again, at row 1, column 2 with the default sizing
+        layout.addWidget(self.colorBtn, 1, 2)
+
+        # Now this is a weird Qt thing where we tell it the kind of sizing we want it respect
+        # We are saying that the widget should never be larger than the maximum space it needs
+        self.setSizePolicy(QtWidgets.QSizePolicy.Maximum, QtWidgets.QSizePolicy.Maximum)
+
+    def setAttr(self, attr, value):
+        # This sets an attribute on our light and keeps our record up to date so we never need to read it back
+        if attr == 'color':
+            cmds.setAttr('%s.color' % self.light.shape, *value, type='double3')
+        else:
+            cmds.setAttr('%s.%s' % (self.light.shape, attr), value)
+        profiling.count('sceneWrites')
+        setattr(self.light, attr, value)
+
+    def updateLight(self, light):
+        # This updates the widget to show a new record for our light, for when the light is changed outside of our UI
+        self.light = light
+
+        # We block the signals while we set the values, otherwise we would write the same values back to the scene
+        self.name.blockSignals(True)
+        self.name.setText(light.name)
+        self.name.setChecked(light.visibility)
+        self.name.blockSignals(False)
+
+        # If the user is dragging the slider, they know better than the scene what the value should be
+        if not self.intensitySlider.isSliderDown():
+            self.intensitySlider.blockSignals(True)
+            self.intensitySlider.setValue(int(light.intensity))
+            self.intensitySlider.blockSignals(False)
+
+        self.setButtonColor(light.color)
+
+    def updateVisibility(self):
+        # This shows the visibility in our record without writing it back to the scene, for when it was set for us
+        self.name.blockSignals(True)
+        self.name.setChecked(self.light.visibility)
+        self.name.blockSignals(False)
+
+    def startIntensityDrag(self):
+        # Everything we do until the slider is released goes into one undo, so a single undo puts the whole drag back
+        cmds.undoInfo(openChunk=True, chunkName='lightIntensity')
+
+    def endIntensityDrag(self):
+        # We write the final value before we close the undo so that it's part of it
+        self.intensityThrottle.flush()
+        cmds.undoInfo(closeChunk=True)
+
+    def disableLight(self, val):
+        # This function takes a value, converts it to bool and then sets our checkbox to that value
+        self.name.setChecked(not bool(val))
+
+    def deleteLight(self):
+        # When we delete the light, we need to also delete our widget
+        # So lets set our parent to Nothing. This will remove it from the manager UI and tells Qt to stop holding onto it
+        self.setParent(None)
+        # There is a period of time before Qt deletes it after we tell it to remove it
+        # So lets mark its visibility to False
+        self.setVisible(False)
+        # Then we tell instruct it to delete it later just in case it hasn't gotten the hint yet
+        self.deleteLater()
+
+        # We let the manager know we're gone so it can forget about us
+        self.onDeleted.emit(self.light.uuid)
+
+        # We only delete the light itself after the widget is deleted so that in the event of an error, we don't do any damage to the scene
+        # We use the light's transform to make sure we are deleting at the transform level and not just the shape under it
+        cmds.delete(self.light.transform)
+
+    def setColor(self):
+        # First of all we get the color values from the light. This will be a list of 3 floats
+        lightColor = self.light.color
+        # Then we provide this to the maya's color editor which gives us back the color the user specified
+        color = cmds.colorEditor(rgbValue=lightColor)
+
+        # Annoyingly, it gives us back a string instead of a list of numbers.
+        # So we split the string, and then convert it to floats
+        r, g, b, a = [float(c) for c in color.split()]
+
+        # We then use the r,g,b to set the colors on the light and the button
+        color = (r, g, b)
+        self.setAttr('color', color)
+        self.setButtonColor(color)
+
+    def setButtonColor(self, color=None):
+        # This function sets the color on the color picker button
+        # If no color is provided, we get the color from the light
+        if not color:
+            # Our record already has the value
+            color = self.light.color
+
+        # We make sure that any provided color is a list of 3 items
+        # Assert is a one liner that is similar to this piece of code:
+        #
+        # if not len(color) == 3:
+        #       raise Exception("You must provide a list of 3 colors")
+        #
+        # It is generally useful for validating inputs with simple checks
+        assert len(color) == 3, "You must provide a list of 3 colors"
+
+        # If the button is already showing this color, there's nothing to do
+        key = quantizeColor(color)
+        if key == self.swatch:
+            return
+        self.swatch = key
+
+        # Qt lets us style objects using CSS similar to in websites, but parsing a style for every button is slow
+        # So instead we give the button an icon of the color, which is drawn once and shared by every button with that color
+        self.colorBtn.setIcon(swatchIcon(color, self.swatchSize))
+
+
+class LightTableModel(QtCore.QAbstractTableModel):
+    """
+    A model that holds the LightRecords for the table view of the LightingManager.
+
+    Making a LightWidget for every light gets slow with thousands of lights because each one is a handful of real widgets.
+    A table view instead asks this model for the values of only the rows it is currently showing,
+    and the delegates below paint them, so it doesn't matter how many lights there are.
+    """
+
+    # These are the columns of our table
+    NAME, SOLO, INTENSITY, COLOR = range(4)
+    headers = ('Light', 'Solo', 'Intensity', 'Color')
+
+    # This lets the manager know when a light has been soloed, with the row and whether it's soloed or not
+    onSolo = Signal(int, bool)
+
+    def __init__(self, parent=None):
+        super(LightTableModel, self).__init__(parent)
+        self.lights = []
+        self.rows = {}
+        # The uuid of the light that is soloed, if there is one
+        self.soloed = None
+
+    def setLights(self, lights):
+        # When we get a whole new list of lights we tell the view to throw away everything it knew
+        self.beginResetModel()
+        self.lights = list(lights)
+        self.updateRows()
+        self.endResetModel()
+
+    def updateRows(self):
+        # We keep a dictionary of which row each uuid is on so that we can find lights without searching
+        self.rows = dict((light.uuid, row) for row, light in enumerate(self.lights))
+
+    def addLights(self, lights):
+        # New lights go on the end, and we only tell the view about the new rows
+        lights = [light for light in lights if light.uuid not in self.rows]
+        if not lights:
+            return
+        start = len(self.lights)
+        self.beginInsertRows(QtCore.QModelIndex(), start, start + len(lights) - 1)
+        self.lights.extend(lights)
+        for row, light in enumerate(lights, start):
+            self.rows[light.uuid] = row
+        self.endInsertRows()
+
+    def removeLights(self, uuids):
+        # We remove the rows from the bottom up, so that removing one doesn't change the row numbers of the others
+        for row in sorted((self.rows[uuid] for uuid in uuids if uuid in self.rows), reverse=True):
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+            del self.lights[row]
+            self.endRemoveRows()
+        self.updateRows()
+
+    def updateLights(self, lights):
+        # We swap in the new records and tell the view to repaint only those rows
+        for light in lights:
+            row = self.rows.get(light.uuid)
+            if row is None:
+                continue
+            self.lights[row] = light
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+
+    def updateVisibility(self, lights):
+        # The records were already changed for us, so we just tell the view to repaint the visibility checkboxes
+        rows = [self.rows[light.uuid] for light in lights if light.uuid in self.rows]
+        if rows:
+            self.dataChanged.emit(self.index(min(rows), self.NAME), self.index(max(rows), self.NAME))
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        # Tables don't have children, so only the invisible root has rows
+        return 0 if parent.isValid() else len(self.lights)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def flags(self, index):
+        flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        if index.column() in (self.NAME, self.SOLO):
+            flags |= QtCore.Qt.ItemIsUserCheckable
+        elif index.column() == self.INTENSITY:
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        # The view calls this for every cell it paints, so it should be quick and never touch the scene
+        light = self.lights[index.row()]
+        column = index.column()
+
+        if column == self.NAME:
+            if role == QtCore.Qt.DisplayRole:
+                return light.name
+            if role == QtCore.Qt.CheckStateRole:
+                return QtCore.Qt.Checked if light.visibility else QtCore.Qt.Unchecked
+            if role == QtCore.Qt.ToolTipRole:
+                return '%s (%s)' % (light.transform, light.lightType)
+
+        elif column == self.SOLO:
+            if role == QtCore.Qt.CheckStateRole:
+                return QtCore.Qt.Checked if light.uuid == self.soloed else QtCore.Qt.Unchecked
+
+        elif column == self.INTENSITY:
+            if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+                return light.intensity
+
+        elif column == self.COLOR:
+            if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+                return light.color
+
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        light = self.lights[index.row()]
+        column = index.column()
+
+        if column == self.NAME and role == QtCore.Qt.CheckStateRole:
+            self.setLightAttr(index.row(), 'visibility', isChecked(value))
+        elif column == self.SOLO and role == QtCore.Qt.CheckStateRole:
+            soloed = isChecked(value)
+            self.soloed = light.uuid if soloed else None
+            # Soloing changes the solo checkbox on every row, so we tell the view the whole column changed
+            self.dataChanged.emit(self.index(0, self.SOLO), self.index(len(self.lights) - 1, self.SOLO))
+            self.onSolo.emit(index.row(), soloed)
+        elif column == self.INTENSITY and role == QtCore.Qt.EditRole:
+            self.setLightAttr(index.row(), 'intensity', float(value))
+        elif column == self.COLOR and role == QtCore.Qt.EditRole:
+            self.setLightAttr(index.row(), 'color', tuple(value))
+        else:
+            return False
+        return True
+
+    def setLightAttr(self, row, attr, value):
+        # This sets an attribute on the light in the scene, updates our record and tells the view to repaint the cell
+        light = self.lights[row]
+        if attr == 'color':
+            cmds.setAttr('%s.color' % light.shape, *value, type='double3')
+        else:
+            cmds.setAttr('%s.%s' % (light.shape, attr), value)
+        profiling.count('sceneWrites')
+        setattr(light, attr, value)
+
+        column = {'visibility': self.NAME, 'intensity': self.INTENSITY, 'color': self.COLOR}[attr]
+        index = self.index(row, column)
+        self.dataChanged.emit(index, index)
+
+
+def isChecked(value):
+    # Depending on the Qt binding, check states come to us as a Qt.CheckState or as a plain number
+    return value == QtCore.Qt.Checked or value == 2
+
+
+class IntensityDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Draws the intensity of a light as a bar, and gives us a slider to edit it
+    """
+    minimum = 1
+    maximum = 1000
+
+    def paint(self, painter, option, index):
+        # Instead of making a real slider for every row, we just paint something that looks like one
+        value = index.data(QtCore.Qt.DisplayRole) or 0
+
+        bar = QtWidgets.QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(2, 2, -2, -2)
+        bar.minimum = self.minimum
+        bar.maximum = self.maximum
+        bar.progress = int(max(self.minimum, min(self.maximum, value)))
+        bar.text = '%g' % value
+        bar.textVisible = True
+        QtWidgets.QApplication.style().drawControl(QtWidgets.QStyle.CE_ProgressBar, bar, painter)
+
+    def createEditor(self, parent, option, index):
+        # A real slider only exists while this cell is being edited
+        slider = QtWidgets.QSlider(QtCore.Qt.Horizontal, parent)
+        slider.setMinimum(self.minimum)
+        slider.setMaximum(self.maximum)
+        slider.setAutoFillBackground(True)
+        return slider
+
+    def setEditorData(self, editor, index):
+        editor.setValue(int(index.data(QtCore.Qt.EditRole)))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.value(), QtCore.Qt.EditRole)
+
+
+class ColorDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Draws the color of a light as a swatch, and opens Maya's color editor when it's double clicked
+    """
+
+    def paint(self, painter, option, index):
+        color = index.data(QtCore.Qt.DisplayRole)
+        if not color:
+            return
+        painter.fillRect(option.rect.adjusted(3, 3, -3, -3), swatchColor(color))
+
+    def editorEvent(self, event, model, option, index):
+        # We use Maya's color editor instead of a Qt editor, so we open it ourselves on a double click
+        if event.type() == QtCore.QEvent.MouseButtonDblClick:
+            color = cmds.colorEditor(rgbValue=index.data(QtCore.Qt.EditRole))
+            # The color editor tells us if the user cancelled
+            if cmds.colorEditor(query=True, result=True):
+                r, g, b, a = [float(c) for c in color.split()]
+                model.setData(index, (r, g, b), QtCore.Qt.EditRole)
+            return True
+        return super(ColorDelegate, self).editorEvent(event, model, option, index)
+
+
+class LightingManager(QtWidgets.QWidget):
+    """
+    This is the main lighting manager.
+    To call it we just do
+
+    LightingManager(dock=True) and it will display docked, otherwise dock=False will display it as a window
+
+    For scenes with lots of lights, LightingManager(table=True) shows the lights in a table instead of a widget per light.
+    The table only draws the rows that are on screen, so it stays fast with tens of thousands of lights.
+
+    """
+
+    # This is a dictionary of Light types to use for the Manager.
+    # The Key is the name that will be displayed in the UI
+    # The Value is the function that will be called
+    lightTypes = {
+        "Point Light": cmds.pointLight,
+        "Spot Light": cmds.spotLight,
+        # This is our first exposure to partial
+        # Partial is like a lambda, and in most cases are identical.
+        # The difference is lambdas get their values when they run, partials get their values when you create it
+        # In this case, we are saying make a partial function to call cmds.shadingNode and everything else will be arguments to it
+        # This is the same as
+        #
+        # def createAreaLight(self):
+        #     cmds.shadingNode('areaLight', asLight=True)
+        #
+        # But it can be convenient to just use a partial rather than making functions for everything
+        "Area Light": partial(cmds.shadingNode, 'areaLight', asLight=True),
+        "Directional Light": cmds.directionalLight,
+        "Volume Light": partial(cmds.shadingNode, 'volumeLight', asLight=True)
+    }
+
+    # This is the most LightWidgets we keep around to reuse after their lights are removed
+    poolSize = 20
+
+    def __init__(self, dock=False, table=False, eventSource=None, docker=None):
+        # We remember if we should show our lights in a table or as widgets
+        self.table = table
+
+        # This holds the LightWidget for each light's uuid when we're not using a table
+        self.widgets = {}
+        # And these are widgets we aren't showing anymore, that can be given a new light instead of making a new widget
+        self.pool = []
+
+        # The watcher keeps us in sync with the scene. We make it once we've populated
+        self.watcher = None
+
+        # These are the snapshots we've taken by their names, and the names of the last two we switched to
+        self.snapshots = {}
+        self.currentSnapshot = None
+        self.previousSnapshot = None
+
+        # Where we live depends on the version of Maya, since older ones dock with a dockControl instead
+        # So the docker works out our parent and shows us, and we don't need to know which one it is
+        self.docker = docker or WorkspaceControlDock()
+        parent = self.docker.getParent(dock)
+
+        # Now we are on to our actual widget
+        # We've figured out our parent, so lets send that to the QWidgets initialization method
+        super(LightingManager, self).__init__(parent=parent)
+
+        # We call our buildUI method to construct our UI
+        self.buildUI()
+
+        # Now we can tell it to populate with widgets for every light
+        self.populate()
+
+        # We listen for lights being added, removed or changed in the scene so we never need to refresh by hand
+        # The event source can be swapped out for a stand-in when testing
+        self.watcher = SceneWatcher(self.applyChanges, source=eventSource, parent=self)
+        self.watcher.watch([light.uuid for light in self.getLights()])
+        # When we go away, we must stop listening or Maya will try to call us after we're gone
+        self.destroyed.connect(self.watcher.source.stop)
+
+        # We then add ourself to our parents layout
+        self.parent().layout().addWidget(self)
+
+        # Finally we let the docker show us, which is where Maya 2016 and below dock us too
+        self.docker.show(parent, dock)
+
+    def buildUI(self):
+        # Like in the LightWidget we show our
+        layout = QtWidgets.QGridLayout(self)
+
+        # We create a combobox
+        # Comboboxes are essentially dropdown selectionwidgets
+        self.lightTypeCB = QtWidgets.QComboBox()
+        # We populate it with the items in our lightTypes dictionary
+        # I like to have my items alphabetically so I sort it to begin with
+        for lightType in sorted(self.lightTypes):
+            # We add the option to the combobox
+            self.lightTypeCB.addItem(lightType)
+        # Finally we add it to the layout in row 0, column 0
+        # We tell it take 1 row and two columns worth of space
+        layout.addWidget(self.lightTypeCB, 0, 0, 1, 2)
+
+        # We create a button to create the chosen lights
+        createBtn = QtWidgets.QPushButton('Create')
+        # We connect the button so it calls the createLight method when its clicked
+        createBtn.clicked.connect(self.createLight)
+        # We add it to the layout in row 0, column 2
+        layout.addWidget(createBtn, 0, 2)
+
+        # If we're using a table, we make the table view and its model instead of the scrolling container
+        if self.table:
+            self.model = LightTableModel(self)
+            self.model.onSolo.connect(self.isolateRow)
+
+            self.tableView = QtWidgets.QTableView()
+            self.tableView.setModel(self.model)
+            # The delegates take care of drawing and editing the intensity and color columns
+            self.tableView.setItemDelegateForColumn(LightTableModel.INTENSITY, IntensityDelegate(self.tableView))
+            self.tableView.setItemDelegateForColumn(LightTableModel.COLOR, ColorDelegate(self.tableView))
+            self.tableView.setEditTriggers(QtWidgets.QAbstractItemView.DoubleClicked |
+                                           QtWidgets.QAbstractItemView.SelectedClicked)
+            # We can select many rows at once to edit them all together
+            self.tableView.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+            self.tableView.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+            self.tableView.horizontalHeader().setStretchLastSection(True)
+            self.tableView.verticalHeader().setVisible(False)
+            # Telling the view every row is the same height means it never has to measure them
+            self.tableView.verticalHeader().setDefaultSectionSize(22)
+            self.tableView.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+            # We tell it to take 1 row and 3 columns of space
+            layout.addWidget(self.tableView, 1, 0, 1, 3)
+        else:
+            # We want to put all the LightWidgets inside a scrolling container
+            # We first need a container widget
+            scrollWidget = QtWidgets.QWidget()
+            # We want to make sure this widget only tries to be the maximum size of its contents
+            scrollWidget.setSizePolicy(QtWidgets.QSizePolicy.Maximum, QtWidgets.QSizePolicy.Maximum)
+            # Then we give it a vertical layout because we want everything arranged vertically
+            self.scrollLayout = QtWidgets.QVBoxLayout(scrollWidget)
+
+            # Finally we create a scrollArea that will be in charge of scrolling its contents
+            scrollArea = QtWidgets.QScrollArea()
+            # Make sure it's resizable so it resizes as the UI grows or shrinks
+            scrollArea.setWidgetResizable(True)
+            # Then we set it to use our container widget to scroll
+            scrollArea.setWidget(scrollWidget)
+            # Then we add this scrollArea to the main layout, at row 1, column 0
+            # We tell it to take 1 row and 3 columns of space
+            layout.addWidget(scrollArea, 1, 0, 1, 3)
+
+        # We add the save button to save our lights
+        saveBtn = QtWidgets.QPushButton('Save')
+        # When clicked it will call the saveLights method
+        # saveLights is wrapped for profiling, so we use a lambda to keep the value clicked gives us from being passed on
+        saveBtn.clicked.connect(lambda: self.saveLights())
+        # We add it to row 2, column 0
+        layout.addWidget(saveBtn, 2, 0)
+
+        # We also add an import button to import our lights
+        importBtn = QtWidgets.QPushButton('Import')
+        # Importing creates every light in the rig, unless this is checked
+        # Then it only changes the lights we already have to match the rig and creates the ones that are missing
+        self.applyImportCB = QtWidgets.QCheckBox('Apply')
+        self.applyImportCB.setToolTip("Change the lights we already have to match the rig instead of creating them all again")
+        # When clicked it will call the importLights method, telling it whether the checkbox is checked
+        # clicked gives us whether the button is checked, so we use a lambda to make sure that isn't taken as the apply argument
+        importBtn.clicked.connect(lambda: self.importLights(apply=self.applyImportCB.isChecked()))
+        # The button and its checkbox share row 2, column 1
+        importLayout = QtWidgets.QHBoxLayout()
+        importLayout.addWidget(importBtn)
+        importLayout.addWidget(self.applyImportCB)
+        layout.addLayout(importLayout, 2, 1)
+
+        # We need a refresh button to manually force the UI to refresh on changes
+        refreshBtn = QtWidgets.QPushButton('Refresh')
+        # We'll connect this to the refresh method, through a lambda for the same reason as the save button
+        refreshBtn.clicked.connect(lambda: self.refresh())
+        # Finally we add it to the layout at row 2, column 2
+        layout.addWidget(refreshBtn, 2, 2)
+
+        # Snapshots let us flip between lighting setups without saving them to disk
+        # The combobox lists the snapshots we've taken, and picking one switches to it
+        self.snapshotCB = QtWidgets.QComboBox()
+        self.snapshotCB.activated.connect(lambda index: self.switchSnapshot(self.snapshotCB.itemText(index)))
+        layout.addWidget(self.snapshotCB, 3, 0)
+
+        snapshotBtn = QtWidgets.QPushButton('Snapshot')
+        snapshotBtn.clicked.connect(lambda: self.takeSnapshot())
+        layout.addWidget(snapshotBtn, 3, 1)
+
+        # The A/B button flips back to whichever snapshot we were on before
+        abBtn = QtWidgets.QPushButton('A/B')
+        abBtn.clicked.connect(self.toggleSnapshot)
+        layout.addWidget(abBtn, 3, 2)
+
+        # These edit every selected light at once
+        # In the table we use the rows that are selected, otherwise we use the lights that are selected in Maya
+        editLayout = QtWidgets.QHBoxLayout()
+        # The spinbox holds the number that the scale and offset buttons use
+        self.editValue = QtWidgets.QDoubleSpinBox()
+        self.editValue.setRange(-1000, 1000)
+        self.editValue.setValue(1.0)
+        editLayout.addWidget(self.editValue)
+
+        # Every button calls bulkEdit with a different edit, and we use lambdas to ignore the value clicked gives us
+        for label, edit in (
+                ('Scale', lambda: self.bulkEdit(scale=self.editValue.value())),
+                ('Offset', lambda: self.bulkEdit(offset=self.editValue.value())),
+                ('Tint', lambda: self.bulkEdit(tint=self.pickColor())),
+                ('Color', lambda: self.bulkEdit(color=self.pickColor())),
+                ('Toggle', lambda: self.bulkEdit(visibility='toggle'))):
+            btn = QtWidgets.QPushButton(label)
+            btn.clicked.connect(edit)
+            editLayout.addWidget(btn)
+
+        layout.addLayout(editLayout, 4, 0, 1, 3)
+
+    @profiling.traced('refresh')
+    def refresh(self):
+        # Rebuilding every widget when only a few lights changed is slow,
+        # so instead we compare the lights in the scene to the ones we're showing by their uuid
+        lights = getLightStates()
+        current = dict((light.uuid, light) for light in self.getLights())
+        scene = set(light.uuid for light in lights)
+
+        # Then we work out which lights are new, which are gone and which have changed
+        added = [light for light in lights if light.uuid not in current]
+        removed = [uuid for uuid in current if uuid not in scene]
+        changed = [light for light in lights if light.uuid in current and not light.sameAs(current[light.uuid])]
+
+        # And we only touch those
+        self.applyChanges(added, removed, changed)
+
+    @profiling.traced('populate')
+    def populate(self):
+        # We read the state of every light in the scene in one go
+        lights = getLightStates()
+
+        # If we're listening to the scene, we need to listen to any new lights too
+        if self.watcher:
+            self.watcher.watch([light.uuid for light in lights])
+
+        # The table just needs the records, it will only draw the ones that are on screen
+        if self.table:
+            self.model.setLights(lights)
+            return
+
+        for light in lights:
+            # We get back a plain LightRecord for each light
+            # We will pass this to the addLight method that will create the widget for it
+            self.addLight(light)
+
+    # Whether we save our rigs as compressed binary files instead of text
+    compressRigs = False
+
+    @profiling.traced('saveLights')
+    def saveLights(self):
+        # We'll now save the lights down to a rig file that can be shared as a preset
+        # The saving itself doesn't need our UI, so it lives in the lightCore module where batch scripts can use it too
+        # We give it all the lights that exist in our manager
+        # It will name the file after the current time, so we'd end up with a name like lightRig_20170701_153000.rig
+        return exportLights(lights=self.getLights(), compress=self.compressRigs)
+
+    def getDirectory(self):
+        # The getDirectory method will give us back the name of our library directory and create it if it doesn't exist
+        return getDirectory()
+
+    def importLights(self, apply=False):
+        # This function goes over importing the lights back in.
+        # We first find the directory
+        directory = self.getDirectory()
+
+        # Then we use the QFileDialog to open a file browser so we can select the json file to import
+        # We give it self as the part, a name for the browser and tell it which directory to open to
+        # The filter lets us pick our rigs, as well as the json light files older versions of the manager saved
+        fileName = QtWidgets.QFileDialog.getOpenFileName(self, "Light Browser", directory,
+                                                         "Light Rigs (*%s *%s *.json)" % (lightRig.EXTENSION,
+                                                                                          lightRig.BINARY_EXTENSION))
+        # If the user cancelled, there's nothing to do
+        if not fileName[0]:
+            return
+
+        self.loadRig(fileName[0], apply=apply)
+
+    @profiling.traced('importLights')
+    def loadRig(self, path, apply=False):
+        """
+        Loads a rig into the scene
+        Args:
+            path: the rig file, or one of the json light files older versions of the manager saved
+            apply: whether to change the lights we already have to match it, or to create all of its lights again
+        """
+        # Next we read the rig, one column at a time
+        rig = lightRig.read(path)
+
+        if apply:
+            # We change only what's different about the lights we already have, and create the ones that are missing
+            # That way importing the same rig twice doesn't give us two of every light
+            report = applyRig(rig)
+            logger.info('Changed %s lights, created %s and %s were already the same',
+                        len(report['changed']), len(report['created']), report['unchanged'])
+        else:
+            # Then we create all of its lights in one go
+            createLights(rig)
+
+        # After that's done, we call the refresh method to show the new lights in our interface
+        self.refresh()
+
+    def createLight(self, lightType=None, add=True):
+        # This function creates lights. Duh.
+        # First we get the text of the combobox if we haven;t been given a light
+        if not lightType:
+            lightType = self.lightTypeCB.currentText()
+
+        # Then we look up the lightTypes dictionary to find the function to call
+        func = self.lightTypes[lightType]
+
+        # All our functions are maya.cmds functions so they give us back the name of the light they made
+        light = func()
+        # We wil pass this to the addLight method if the method has been told to add it
+        if add:
+            self.addLight(light)
+
+        return light
+
+    def getLights(self):
+        # This gives us the records of all the lights we are showing, whether they are in the table or in widgets
+        if self.table:
+            return list(self.model.lights)
+        return [widget.light for widget in self.widgets.values()]
+
+    def addLight(self, light):
+        # In the table, we just add a record for the light to the model
+        if self.table:
+            self.model.addLights([light] if isinstance(light, LightRecord) else getLightStates([light]))
+            return
+
+        # We make sure we have a record for the light
+        if not isinstance(light, LightRecord):
+            light = getLightStates([light])[0]
+
+        # If we already have a widget for this light, we don't need another one
+        if light.uuid in self.widgets:
+            return
+
+        # If we have a widget we're not using anymore, we give it this light instead of making a new one
+        if self.pool:
+            widget = self.pool.pop()
+            widget.updateLight(light)
+            # It might have been soloing its old light
+            widget.soloBtn.blockSignals(True)
+            widget.soloBtn.setChecked(False)
+            widget.soloBtn.blockSignals(False)
+            widget.setVisible(True)
+        else:
+            # This will create a LightWidget for the given light and add it to the UI
+            # First we create the LightWidget
+            widget = LightWidget(light)
+            widget.onDeleted.connect(self.forgetLight)
+
+            # Then we connect the onSolo signal from the widget to our isolate method
+            widget.onSolo.connect(self.isolate)
+
+        # We keep the widget by its light's uuid so we can find it again quickly
+        self.widgets[light.uuid] = widget
+        # Finally we add it to the scrollLayout
+        self.scrollLayout.addWidget(widget)
+
+    def removeWidget(self, uuid):
+        # This takes the widget for a light out of our UI
+        widget = self.widgets.pop(uuid, None)
+        if not widget:
+            return
+
+        self.scrollLayout.removeWidget(widget)
+        widget.setVisible(False)
+
+        # We keep a few of them around to reuse, and let Qt delete the rest
+        if len(self.pool) < self.poolSize:
+            self.pool.append(widget)
+        else:
+            widget.setParent(None)
+            widget.deleteLater()
+
+    def isolate(self, val):
+        # This function will isolate a single light
+        # Every signal lets us know who sent it that we can query with sender()
+        # So we ask the widget that was soloed which light it has
+        self.solo(self.sender().light.uuid, val)
+
+    @profiling.traced('isolate')
+    def solo(self, uuid, val):
+        """
+        Solos a light by hiding every other light, or shows all of them again when it is unsoloed
+        Args:
+            uuid: the uuid of the light to solo
+            val: whether to solo or unsolo it
+        """
+        # Our records already know every light, so we never need to go looking through our widgets or the scene
+        lights = self.getLights()
+
+        # The soloed light is always visible, and the rest are only visible when we unsolo
+        visible = [light.uuid == uuid or not val for light in lights]
+
+        # Then the scene is changed all at once and we only update the lights that changed
+        changed = setVisibilities(lights, visible)
+
+        if self.table:
+            self.model.updateVisibility(changed)
+            return
+
+        for light in changed:
+            widget = self.widgets.get(light.uuid)
+            if widget:
+                widget.updateVisibility()
+
+    def forgetLight(self, uuid):
+        # A widget deleted its light, so we stop keeping track of it
+        self.widgets.pop(uuid, None)
+        if self.watcher:
+            self.watcher.unwatch([uuid])
+
+    def applyChanges(self, added, removed, changed):
+        """
+        Applies changes from the scene to our UI without rebuilding it
+        Args:
+            added: LightRecords for the lights that were created
+            removed: the uuids of the lights that were deleted
+            changed: LightRecords for the lights that had attributes changed
+        """
+        if self.watcher:
+            self.watcher.unwatch(removed)
+            self.watcher.watch([light.uuid for light in added])
+
+        if self.table:
+            self.model.removeLights(removed)
+            self.model.addLights(added)
+            self.model.updateLights(changed)
+            return
+
+        for uuid in removed:
+            self.removeWidget(uuid)
+
+        for light in added:
+            self.addLight(light)
+
+        for light in changed:
+            widget = self.widgets.get(light.uuid)
+            if widget:
+                widget.updateLight(light)
+
+    def takeSnapshot(self, name=None):
+        """
+        Takes a snapshot of every light we're showing
+        Args:
+            name: the name of the snapshot. If not given, it's numbered
+        """
+        if not name:
+            name = 'Snapshot %s' % (len(self.snapshots) + 1)
+
+        # Our records might be a moment behind the scene, so we read the lights again
+        self.snapshots[name] = Snapshot.capture(name, [light.shape for light in self.getLights()])
+        if self.snapshotCB.findText(name) < 0:
+            self.snapshotCB.addItem(name)
+        self.snapshotCB.setCurrentIndex(self.snapshotCB.findText(name))
+
+        # The snapshot we just took is the one the scene looks like now
+        if name != self.currentSnapshot:
+            self.previousSnapshot, self.currentSnapshot = self.currentSnapshot, name
+        return self.snapshots[name]
+
+    def switchSnapshot(self, name):
+        """
+        Switches the lights to a snapshot, changing only the values that are different
+        """
+        snapshot = self.snapshots.get(name)
+        if not snapshot:
+            return
+
+        changed = applySnapshot(snapshot)
+        # We update only the lights that changed, instead of waiting for the scene to tell us about each of them
+        self.applyChanges([], [], changed)
+
+        if name != self.currentSnapshot:
+            self.previousSnapshot, self.currentSnapshot = self.currentSnapshot, name
+        self.snapshotCB.setCurrentIndex(self.snapshotCB.findText(name))
+
+    def toggleSnapshot(self):
+        # This flips between the last two snapshots, which is what lighters do to compare two setups
+        if self.previousSnapshot:
+            self.switchSnapshot(self.previousSnapshot)
+
+    def selectedLights(self):
+        # In the table we use the selected rows
+        if self.table:
+            rows = sorted(set(index.row() for index in self.tableView.selectionModel().selectedRows()))
+            return [self.model.lights[row] for row in rows]
+
+        # Our widgets can't be selected, so we use the lights that are selected in Maya instead
+        selected = set(cmds.ls(selection=True, dag=True, type=LIGHT_TYPES, long=True) or [])
+        return [light for light in self.getLights() if light.shape in selected]
+
+    def pickColor(self):
+        # This asks the user for a color with Maya's color editor and gives back None if they cancelled
+        color = cmds.colorEditor(rgbValue=(1, 1, 1))
+        if not cmds.colorEditor(query=True, result=True):
+            return None
+        r, g, b, a = [float(c) for c in color.split()]
+        return r, g, b
+
+    def bulkEdit(self, **edits):
+        """
+        Edits every selected light at once. See lightManager.editLights for the edits we can make
+        """
+        # If the user cancelled picking a color there is nothing to do
+        if any(value is None for value in edits.values()):
+            return
+
+        lights = self.selectedLights()
+        if not lights:
+            logger.info('Select some lights to edit first')
+            return
+
+        # The lights are all changed in the scene at once, then we update only the ones that changed in our UI
+        changed = editLights(lights, **edits)
+        self.applyChanges([], [], changed)
+
+    def isolateRow(self, row, val):
+        # This is the same as isolate, but for the rows of our table
+        self.solo(self.model.lights[row].uuid, val)
+
+
+def getMayaMainWindow():
+    """
+    Since Maya is Qt, we can parent our UIs to it.
+    This means that we don't have to manage our UI and can leave it to Maya.
+
+    Returns:
+        QtWidgets.QMainWindow: The Maya MainWindow
+    """
+    # We use the OpenMayaUI API to get a reference to Maya's MainWindow
+    win = omui.MQtUtil_mainWindow()
+    # When Maya runs without its interface, like in mayapy, there is no main window to parent to
+    if win is None:
+        return None
+    # Then we can use the wrapInstance method to convert it to something python can understand
+    # In this case, we're converting it to a QMainWindow
+    ptr = wrapInstance(long(win), QtWidgets.QMainWindow)
+    # Finally we return this to whoever wants it
+    return ptr
+
+
+def getDock(name='LightingManagerDock'):
+    """
+    This function creates a dock with the given name.
+    It's an example of how we can mix Maya's UI elements with Qt elements
+    Args:
+        name: The name of the dock to create
+
+    Returns:
+        QtWidget.QWidget: The dock's widget
+    """
+    # First lets delete any conflicting docks
+    deleteDock(name)
+    # Then we create a workspaceControl dock using Maya's UI tools
+    # This gives us back the name of the dock created
+    ctrl = cmds.workspaceControl(name, dockToMainWindow=('right', 1), label="Lighting Manager")
+
+    # We can use the OpenMayaUI API to get the actual Qt widget associated with the name
+    qtCtrl = omui.MQtUtil_findControl(ctrl)
+
+    # Finally we use wrapInstance to convert it to something Python can understand, in this case a QWidget
+    ptr = wrapInstance(long(qtCtrl), QtWidgets.QWidget)
+
+    # And we return that QWidget back to whoever wants it.
+    return ptr
+
+
+def deleteDock(name='LightingManagerDock'):
+    """
+    A simple function to delete the given dock
+    Args:
+        name: the name of the dock
+    """
+    # We use the workspaceControl to see if the dock exists
+    if cmds.workspaceControl(name, query=True, exists=True):
+        # If it does we delete it
+        cmds.deleteUI(name)
+
+
+def makeDialog():
+    """
+    Makes the window the Lighting Manager goes in when it isn't docked
+
+    Returns:
+        QtWidgets.QDialog: the window
+    """
+    # If we have a UI called lightingManager, we'll delete it so that we can only have one instance of this
+    # A try except is a very important part of programming when we don't want an error to stop our code
+    # We first try to do something and if we fail, then we do something else.
+    try:
+        cmds.deleteUI('lightingManager')
+    except:
+        logger.debug('No previous UI exists')
+
+    # Then we create a new dialog and give it the main maya window as its parent
+    dialog = QtWidgets.QDialog(parent=getMayaMainWindow())
+    # We set its name so that we can find and delete it later
+    dialog.setObjectName('lightingManager')
+    # Then we set the title
+    dialog.setWindowTitle('Lighting Manager')
+
+    # Finally we give it a layout
+    QtWidgets.QVBoxLayout(dialog)
+    return dialog
+
+
+class WorkspaceControlDock(object):
+    """
+    Docks the Lighting Manager in a workspaceControl, which is how Maya 2017 and above dock things.
+
+    A docker decides what the Lighting Manager's parent is and how it's shown.
+    That is the only thing that differs between the versions of Maya we support, so everything else is shared.
+    """
+
+    def __init__(self, name='LightingManagerDock'):
+        self.name = name
+
+    def getParent(self, dock):
+        # If we should be able to dock, then we go straight inside the dock
+        if dock:
+            return getDock(self.name)
+        # Otherwise, lets remove all instances of the dock incase it's already docked, and use a window instead
+        self.delete()
+        return makeDialog()
+
+    def show(self, parent, dock):
+        # The dock is already showing, so we only need to show our window if we're not docked
+        if not dock:
+            parent.show()
+
+    def delete(self):
+        deleteDock(self.name)
+
+
+class DockControlDock(WorkspaceControlDock):
+    """
+    Docks the Lighting Manager in a dockControl, for Maya 2016 and below which don't have the workspaceControl
+    """
+
+    def getParent(self, dock):
+        # <=Maya2016: For Maya 2016 and below we always put it inside a QDialog and only dock once we've been built
+        self.delete()
+        return makeDialog()
+
+    def show(self, parent, dock):
+        parent.show()
+        # <=Maya2016: We need to create the dock after we create our widget's parent window
+        if dock:
+            self.dock()
+
+    def dock(self):
+        """
+        Creates the dockControl holding the Lighting Manager's window
+        Returns:
+            str: the name of the dockControl
+        """
+        # We just give our window's object name to the dockControl, which is the name we set in makeDialog
+        return cmds.dockControl(self.name, area='right', content='lightingManager', allowedArea='all',
+                                label="Lighting Manager")
+
+    def delete(self):
+        # We use the dockControl to see if the dock exists
+        if cmds.dockControl(self.name, query=True, exists=True):
+            # If it does we delete it
+            cmds.deleteUI(self.name)
@@ -0,0 +1,396 @@
+"""
+A versioned file format for saving and loading light rigs.
+
+The old light files were one big indented JSON dictionary with an entry per light, which had to be loaded all at once.
+A rig instead stores its lights as columns, so every intensity sits together, every color sits together and so on.
+Each column is a flat list of numbers (or names), which is compact to store and quick to read back.
+
+There are two flavors of the same format:
+
+    .rig    text, one JSON line for the header followed by one JSON line for each column
+    .rigz   binary, compressed with zlib
+
+The header says which version of the format wrote the file, how many lights it holds and which columns follow.
+The binary flavor looks like this:
+
+    magic       4 bytes   'LRIG'
+    version     uint32    the version of the format
+    headerSize  uint32    the size of the header in bytes
+    header      json      the same header the text flavor has
+    data                  a zlib stream holding every column, each as a uint64 size followed by its bytes
+
+Both flavors are written and read one column at a time, so we never hold a second copy of the whole file in memory.
+The old light files can still be read, they just come back as a rig.
+
+The Maya specific parts (reading lights from the scene and creating them) live in lightCore.py
+"""
+import array
+import json
+import struct
+import sys
+import zlib
+
+# The magic is the first few bytes of a binary rig, it lets us quickly tell if a file is one of ours
+MAGIC = b'LRIG'
+
+# If we ever change the layout we bump the version so that old files can still be recognized
+VERSION = 1
+
+# The name we put in the header of text rigs, so that we can tell them apart from the old light files
+FORMAT = 'lightRig'
+
+# The file extensions we use for the text and binary flavors
+EXTENSION = '.rig'
+BINARY_EXTENSION = '.rigz'
+
+# The binary header is the magic, the version and the size of the json header
+# < means little endian, 4s is 4 bytes and I is an unsigned int
+HEADER = struct.Struct('<4sII')
+
+# Every column in the binary flavor starts with its size as an unsigned long long
+SIZE = struct.Struct('<Q')
+
+# These are the columns we save, with the kind of values they hold and how many values each light has
+COLUMNS = (
+    ('name', 'str', 1),
+    ('uuid', 'str', 1),
+    ('lightType', 'str', 1),
+    ('visibility', 'bool', 1),
+    ('intensity', 'float', 1),
+    ('color', 'float', 3),
+    ('translate', 'float', 3),
+    ('rotate', 'float', 3),
+)
+
+# The typecodes of the arrays that hold each kind of column in the binary flavor
+TYPECODES = {'bool': 'B', 'float': 'd'}
+
+# How much we read from a binary rig at a time
+CHUNK_SIZE = 1 << 16
+
+# These are the values we change on a light that already exists when a rig is applied to it
+APPLIED = ('visibility', 'intensity', 'color', 'translate', 'rotate')
+
+
+class LightRig(object):
+    """
+    The lights of a rig, stored as columns.
+
+    rig = LightRig.fromLights(getLightStates())
+    rig.column('intensity')
+    for light in rig.lights():
+        print(light['name'], light['color'])
+    """
+
+    def __init__(self, columns=None, count=0, info=None):
+        # A dictionary of each column's name to a flat list of its values
+        self.columns = columns or {}
+        self.count = count
+        # Anything else that was saved in the header, like the scene the rig came from
+        self.info = info or {}
+
+    @classmethod
+    def fromLights(cls, lights, **info):
+        """
+        Makes a rig from anything that has the attributes in COLUMNS, like the LightRecords from getLightStates
+        """
+        lights = list(lights)
+        columns = {}
+        for name, kind, size in COLUMNS:
+            if size == 1:
+                columns[name] = [getattr(light, name) for light in lights]
+            else:
+                # Values with many parts, like colors, are laid out one after the other in a single flat list
+                columns[name] = [value for light in lights for value in getattr(light, name)]
+        return cls(columns, len(lights), info)
+
+    def __len__(self):
+        return self.count
+
+    def column(self, name):
+        """
+        Gives back the values of a column. Values with many parts come back as tuples
+        """
+        size = dict((n, s) for n, k, s in COLUMNS).get(name, 1)
+        values = self.columns[name]
+        if size == 1:
+            return list(values)
+        return [tuple(values[i:i + size]) for i in range(0, len(values), size)]
+
+    def lights(self):
+        """
+        Yields a dictionary for every light in the rig
+        """
+        columns = [(name, self.column(name)) for name, kind, size in COLUMNS if name in self.columns]
+        for i in range(self.count):
+            yield dict((name, values[i]) for name, values in columns)
+
+    def header(self):
+        header = dict(self.info)
+        header.update({
+            'format': FORMAT,
+            'version': VERSION,
+            'count': self.count,
+            'columns': [[name, kind, size] for name, kind, size in COLUMNS if name in self.columns],
+        })
+        return header
+
+
+def write(path, rig, compress=None):
+    """
+    Writes a rig to a file
+    Args:
+        path: the file to write
+        rig: the LightRig to write
+        compress: whether to write the binary flavor. By default this is decided by the extension of the path
+
+    Returns:
+        str: the path that was written
+    """
+    if compress is None:
+        compress = path.endswith(BINARY_EXTENSION)
+
+    header = rig.header()
+
+    if not compress:
+        with open(path, 'w') as f:
+            f.write(json.dumps(header, sort_keys=True) + '\n')
+            # Every column goes on its own line, so a reader can take them one at a time
+            for name, kind, size in header['columns']:
+                f.write(json.dumps(rig.columns[name], separators=(',', ':')) + '\n')
+        return path
+
+    headerBytes = json.dumps(header, sort_keys=True).encode('utf-8')
+    compressor = zlib.compressobj()
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(headerBytes)))
+        f.write(headerBytes)
+        for name, kind, size in header['columns']:
+            data = _columnToBytes(rig.columns[name], kind)
+            f.write(compressor.compress(SIZE.pack(len(data))))
+            f.write(compressor.compress(data))
+        f.write(compressor.flush())
+    return path
+
+
+def read(path):
+    """
+    Reads a rig from a file of either flavor, or from one of the old light files
+    Returns:
+        LightRig: the rig
+    """
+    with open(path, 'rb') as f:
+        isBinary = f.read(len(MAGIC)) == MAGIC
+
+    if isBinary:
+        return _readBinary(path)
+
+    with open(path, 'r') as f:
+        # The text flavor always starts with its header on a single line
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            header = None
+
+        if not isinstance(header, dict) or header.get('format') != FORMAT:
+            # Otherwise it is one of the old light files, which we have to read in one go
+            f.seek(0)
+            return fromLegacy(json.load(f))
+
+        _checkVersion(path, header['version'])
+
+        columns = {}
+        for name, kind, size in header['columns']:
+            columns[name] = json.loads(f.readline())
+
+    return LightRig(columns, header['count'], _info(header))
+
+
+def isRig(path):
+    """
+    Checks if the given path is a rig of either flavor, going by its extension
+    """
+    return path.endswith((EXTENSION, BINARY_EXTENSION))
+
+
+def fromLegacy(properties):
+    """
+    Turns the dictionary of an old light file into a rig
+    Args:
+        properties: a dictionary of light names, each with their translate, rotation, lightType, intensity and color
+
+    Returns:
+        LightRig: the rig
+    """
+    names = sorted(properties)
+    lights = [properties[name] for name in names]
+    columns = {
+        'name': names,
+        # The old files didn't save these, so we leave the uuids blank and assume every light was visible
+        'uuid': [''] * len(names),
+        'visibility': [True] * len(names),
+        'lightType': [light.get('lightType') for light in lights],
+        'intensity': [float(light.get('intensity', 1)) for light in lights],
+        'color': [float(v) for light in lights for v in light.get('color', (1, 1, 1))],
+        'translate': [float(v) for light in lights for v in light.get('translate', (0, 0, 0))],
+        'rotate': [float(v) for light in lights for v in light.get('rotation', (0, 0, 0))],
+    }
+    return LightRig(columns, len(names))
+
+
+class Delta(object):
+    """
+    What would have to change in a scene for its lights to match a rig. See delta()
+    """
+
+    def __init__(self):
+        # A list of each light that differs from the rig, with a dictionary of the attributes to change and their new values
+        self.changed = []
+        # The lights in the rig that don't exist yet, as dictionaries like LightRig.lights gives
+        self.missing = []
+        # How many lights already match the rig
+        self.unchanged = 0
+
+    def __bool__(self):
+        return bool(self.changed or self.missing)
+
+    # Python 2 calls this __nonzero__ instead
+    __nonzero__ = __bool__
+
+    def report(self):
+        """
+        Gives back a plain dictionary of what changed, that can be logged or saved as json
+        """
+        return {
+            'changed': dict((light.name, changes) for light, changes in self.changed),
+            'missing': [light['name'] for light in self.missing],
+            'unchanged': self.unchanged,
+        }
+
+
+def delta(rig, lights, tolerance=1e-6):
+    """
+    Works out which values have to change for existing lights to match a rig.
+    Every light in the rig is matched to an existing light by its uuid, or by its name if the uuid isn't found.
+    Args:
+        rig: the LightRig to match
+        lights: the lights that exist now, as anything with the attributes in COLUMNS like the LightRecords from getLightStates
+        tolerance: numbers closer together than this count as the same
+
+    Returns:
+        Delta: the changes
+    """
+    lights = list(lights)
+    byUuid = dict((light.uuid, light) for light in lights)
+    byName = {}
+    for light in lights:
+        # Lights can be found by their name as we show it, or by the last part of it if it's a longer path
+        byName.setdefault(light.name, light)
+        byName.setdefault(light.name.split('|')[-1], light)
+
+    result = Delta()
+    # Each existing light can only be matched once, otherwise two lights in the rig could fight over it
+    matched = set()
+
+    for entry in rig.lights():
+        light = byUuid.get(entry.get('uuid'))
+        if light is None or light.uuid in matched:
+            light = byName.get(entry['name']) or byName.get(entry['name'].split('|')[-1])
+        if light is None or light.uuid in matched:
+            result.missing.append(entry)
+            continue
+        matched.add(light.uuid)
+
+        changes = {}
+        for attr in APPLIED:
+            if attr in entry and not _same(getattr(light, attr), entry[attr], tolerance):
+                changes[attr] = entry[attr]
+
+        if changes:
+            result.changed.append((light, changes))
+        else:
+            result.unchanged += 1
+
+    return result
+
+
+def _same(a, b, tolerance):
+    # Numbers and lists of numbers are the same if every number is within the tolerance
+    if isinstance(a, (tuple, list)):
+        return len(a) == len(b) and all(abs(x - y) <= tolerance for x, y in zip(a, b))
+    return abs(a - b) <= tolerance
+
+
+def _readBinary(path):
+    with open(path, 'rb') as f:
+        magic, version, headerSize = HEADER.unpack(f.read(HEADER.size))
+        _checkVersion(path, version)
+        header = json.loads(f.read(headerSize).decode('utf-8'))
+
+        # We decompress the data a chunk at a time, only as far as the column we're reading
+        stream = _Inflater(f)
+        columns = {}
+        for name, kind, size in header['columns']:
+            length, = SIZE.unpack(stream.read(SIZE.size))
+            columns[name] = _columnFromBytes(stream.read(length), kind)
+
+    return LightRig(columns, header['count'], _info(header))
+
+
+def _checkVersion(path, version):
+    if version > VERSION:
+        raise ValueError("%s was written with a newer version (%s) of the light rig format" % (path, version))
+
+
+def _info(header):
+    # Everything in the header that isn't about the layout of the file is info about the rig
+    return dict((k, v) for k, v in header.items() if k not in ('format', 'version', 'count', 'columns'))
+
+
+class _Inflater(object):
+    """
+    Decompresses a zlib stream from a file as it's read, so we never hold the whole compressed file in memory
+    """
+
+    def __init__(self, f):
+        self.file = f
+        self.decompressor = zlib.decompressobj()
+        self.buffer = b''
+
+    def read(self, size):
+        while len(self.buffer) < size:
+            chunk = self.file.read(CHUNK_SIZE)
+            if not chunk:
+                raise ValueError("The light rig %s ends too early" % self.file.name)
+            self.buffer += self.decompressor.decompress(chunk)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def _columnToBytes(values, kind):
+    # Names are stored as a json list, and numbers as a little endian array
+    if kind == 'str':
+        return json.dumps(values, separators=(',', ':')).encode('utf-8')
+
+    values = array.array(TYPECODES[kind], values)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes() if hasattr(values, 'tobytes') else values.tostring()
+
+
+def _columnFromBytes(data, kind):
+    if kind == 'str':
+        return json.loads(data.decode('utf-8'))
+
+    values = array.array(TYPECODES[kind])
+    # array.frombytes was called fromstring in Python 2
+    if hasattr(values, 'frombytes'):
+        values.frombytes(data)
+    else:
+        values.fromstring(data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+
+    if kind == 'bool':
+        return [bool(v) for v in values]
+    return values.tolist()
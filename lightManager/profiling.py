@@ -0,0 +1,172 @@
+"""
+A small layer for timing what the Lighting Manager does, so we can find out why it's slow in a particular scene.
+
+Spans time a piece of work, and counters count things like how many times we read from or wrote to the scene.
+Every span records how much each counter went up while it was running.
+
+    from lightManager import profiling
+    profiling.enable('/tmp/lightManager.jsonl')
+    ... use the Lighting Manager ...
+    profiling.profiler.writeChromeTrace('/tmp/lightManager.json')
+
+The JSON lines file gets a line for every span as soon as it finishes.
+The Chrome trace can be opened in chrome://tracing or https://ui.perfetto.dev to see the spans on a timeline.
+
+Profiling is off unless it's enabled, or the LIGHTMANAGER_PROFILE environment variable is set to the file to write to.
+When it's off, spans and counters do nothing, so they're safe to leave in the code.
+"""
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+timer = getattr(time, 'perf_counter', time.time)
+
+# The most spans we keep in memory for the Chrome trace. The oldest ones are dropped after this
+MAX_EVENTS = 100000
+
+
+class Profiler(object):
+    """
+    Records spans and counters
+    """
+
+    def __init__(self, enabled=False, output=None):
+        self.enabled = enabled
+        # The counters only ever go up, spans look at how much they changed
+        self.counters = collections.Counter()
+        self.events = collections.deque(maxlen=MAX_EVENTS)
+        # Every span time is measured from here, which is what the Chrome trace wants
+        self.origin = timer()
+        self.output = None
+        if output:
+            self.open(output)
+
+    def open(self, path):
+        # Spans are written to the file as they finish, so a crash doesn't lose what happened before it
+        self.close()
+        self.output = open(path, 'a')
+
+    def close(self):
+        if self.output:
+            self.output.close()
+            self.output = None
+
+    def count(self, name, amount=1):
+        """
+        Adds to one of our counters
+        """
+        if self.enabled:
+            self.counters[name] += amount
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        """
+        Times everything inside it
+        Args:
+            name: the name of the span
+            **args: anything else to record with the span, like how many lights there were
+        """
+        if not self.enabled:
+            yield
+            return
+
+        counters = dict(self.counters)
+        start = timer()
+        try:
+            yield
+        finally:
+            end = timer()
+            # We only record the counters that changed during the span
+            changed = dict((key, value - counters.get(key, 0)) for key, value in self.counters.items()
+                           if value != counters.get(key, 0))
+            changed.update(args)
+            self.record({
+                'name': name,
+                'start': start - self.origin,
+                'seconds': end - start,
+                'thread': threading.current_thread().name,
+                'args': changed,
+            })
+
+    def record(self, event):
+        self.events.append(event)
+        if self.output:
+            self.output.write(json.dumps(event, sort_keys=True) + '\n')
+            self.output.flush()
+
+    def chromeTrace(self):
+        """
+        Gives back our spans in the Chrome trace format
+        """
+        # Chrome wants its times in microseconds, and a complete event (X) for each span
+        # It also wants threads as numbers, so we number them in the order we first see them
+        threads = {}
+        for event in self.events:
+            threads.setdefault(event['thread'], len(threads))
+
+        return {'traceEvents': [{
+            'name': event['name'],
+            'ph': 'X',
+            'ts': event['start'] * 1e6,
+            'dur': event['seconds'] * 1e6,
+            'pid': os.getpid(),
+            'tid': threads[event['thread']],
+            'args': event['args'],
+        } for event in self.events]}
+
+    def writeChromeTrace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chromeTrace(), f)
+        return path
+
+
+# This is the profiler the Lighting Manager uses
+profiler = Profiler()
+
+
+def enable(output=None):
+    """
+    Turns profiling on
+    Args:
+        output: a JSON lines file to write each span to as it finishes
+    """
+    profiler.enabled = True
+    if output:
+        profiler.open(output)
+
+
+def disable():
+    profiler.enabled = False
+    profiler.close()
+
+
+def span(name, **args):
+    return profiler.span(name, **args)
+
+
+def count(name, amount=1):
+    profiler.count(name, amount)
+
+
+def traced(name):
+    """
+    A decorator that puts a span around every call of a function
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # We check here so that we skip the context manager altogether when profiling is off
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+if os.environ.get('LIGHTMANAGER_PROFILE'):
+    enable(os.environ['LIGHTMANAGER_PROFILE'])
@@ -0,0 +1,119 @@
+"""
+Keeps the Lighting Manager in sync with the scene by listening for lights being added, removed or changed.
+
+An EventSource hears about what happens to lights and tells a SceneWatcher, which collects it all and hands it over
+in batches. Neither of them imports Maya, so they can be tried out with stand-ins in plain Python.
+The ones that really listen to Maya build on these: MayaEventSource lives in lightCore, and the SceneWatcher that
+flushes once Qt is idle lives in lightManagerUI.
+"""
+
+
+class EventSource(object):
+    """
+    Tells a SceneWatcher about lights that are added, removed or changed in the scene.
+
+    This base class doesn't listen to anything by itself, which makes it a handy stand-in for testing without Maya.
+    Call nodeAdded, nodeRemoved and attributeChanged with the uuid of a light to pretend something happened.
+    lightCore.MayaEventSource hooks these up to real Maya callbacks.
+    """
+
+    def __init__(self):
+        self.watcher = None
+
+    def start(self, watcher):
+        self.watcher = watcher
+
+    def stop(self):
+        self.watcher = None
+
+    def watch(self, uuids):
+        # Called with the uuids of lights we want to hear about attribute changes for
+        pass
+
+    def unwatch(self, uuids):
+        pass
+
+    def nodeAdded(self, uuid):
+        if self.watcher:
+            self.watcher.queue(self.watcher.added, uuid)
+
+    def nodeRemoved(self, uuid):
+        if self.watcher:
+            self.watcher.queue(self.watcher.removed, uuid)
+
+    def attributeChanged(self, uuid):
+        if self.watcher:
+            self.watcher.queue(self.watcher.changed, uuid)
+
+
+class SceneWatcher(object):
+    """
+    Collects changes to lights in the scene and hands them over in batches.
+
+    A single action in Maya can change many lights at once, and we don't want to update our UI for each one.
+    So we collect everything that happens, and when flush is called we read all the changed lights in one go
+    and call our callback once with the lights that were added, the uuids that were removed and the lights that changed.
+
+    This class doesn't know when to flush or how to read lights. Subclasses decide by overriding schedule and read,
+    or by passing a read function in.
+    """
+
+    def __init__(self, callback, source, read=None):
+        """
+        Args:
+            callback: called with the added records, the removed uuids and the changed records
+            source: the EventSource to listen to
+            read: a function that takes a list of uuids and gives back a record for each light that still exists
+        """
+        self.callback = callback
+        self.source = source
+        if read is not None:
+            self.read = read
+
+        self.added = set()
+        self.removed = set()
+        self.changed = set()
+
+        # Whether a flush is already on its way, so we only ask for one however many changes come in
+        self.scheduled = False
+
+        self.source.start(self)
+
+    def queue(self, pending, uuid):
+        pending.add(uuid)
+        if not self.scheduled:
+            self.scheduled = True
+            self.schedule()
+
+    def schedule(self):
+        # Arranges for flush to be called soon. By default nothing does, and flush has to be called by hand
+        pass
+
+    def read(self, uuids):
+        raise NotImplementedError("SceneWatcher needs to be told how to read lights")
+
+    def watch(self, uuids):
+        self.source.watch(uuids)
+
+    def unwatch(self, uuids):
+        self.source.unwatch(uuids)
+
+    def stop(self):
+        self.source.stop()
+
+    def flush(self):
+        self.scheduled = False
+        added, removed, changed = self.added, self.removed, self.changed
+        self.added, self.removed, self.changed = set(), set(), set()
+
+        # A light that was made and deleted before we got here never needs to be shown
+        added, removed = added - removed, removed - added
+        # We don't need to update lights that are new or gone
+        changed = changed - added - removed
+
+        # We read all the lights we need in one go
+        uuids = sorted(added | changed)
+        records = self.read(uuids) if uuids else []
+
+        self.callback([r for r in records if r.uuid in added], sorted(removed),
+                      [r for r in records if r.uuid in changed])
@@ -0,0 +1,89 @@
+"""
+Runs the quick checks that come with the tools in this repository.
+
+    python runChecks.py                         runs the checks of every tool
+    python runChecks.py controllerLibrary       runs the checks of just one tool
+    mayapy runChecks.py                         runs the checks that need Maya too
+
+Every tool that has checks keeps them in its own checks module. That module has a CHECKS list of the checks that
+work in plain Python, and a MAYA_CHECKS list of the ones that need Maya. Outside of mayapy the Maya ones are skipped.
+Each check is a function that's given its own empty temporary directory to work in, and fails by raising an error.
+"""
+import argparse
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import traceback
+
+# The folder this script is in, which is where all the tools live
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def findTools():
+    """
+    Returns:
+        list: the names of all the tools that have a checks module
+    """
+    return sorted(name for name in os.listdir(ROOT) if os.path.isfile(os.path.join(ROOT, name, 'checks.py')))
+
+
+def mayaAvailable():
+    """
+    Starts Maya if we can, which we can only do when running in mayapy
+    Returns:
+        bool: whether Maya is available
+    """
+    try:
+        import maya.standalone
+    except ImportError:
+        return False
+    try:
+        maya.standalone.initialize(name='python')
+    except RuntimeError:
+        # It was already started
+        pass
+    return True
+
+
+def runCheck(check, prefix):
+    # Every check gets its own empty directory to work in, which we clean up afterwards whatever happens
+    directory = tempfile.mkdtemp(prefix=prefix)
+    try:
+        check(directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the quick checks of the tools in this repository",
+                                     usage="python runChecks.py [tool [tool ...]]")
+    parser.add_argument('tools', nargs='*', help="The tools to check. By default every tool that has checks")
+    args = parser.parse_args()
+
+    withMaya = mayaAvailable()
+    failed = 0
+    for tool in args.tools or findTools():
+        module = importlib.import_module('%s.checks' % tool)
+        checks = [(check, False) for check in module.CHECKS] + [(check, True) for check in module.MAYA_CHECKS]
+
+        for check, needsMaya in checks:
+            name = '%s.%s' % (tool, check.__name__)
+            if needsMaya and not withMaya:
+                print('skipped %s: it needs Maya, run this with mayapy to check it' % name)
+                continue
+
+            try:
+                runCheck(check, tool)
+                print('ok      %s' % name)
+            except Exception:
+                failed += 1
+                print('FAILED  %s' % name)
+                traceback.print_exc()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
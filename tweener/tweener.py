@@ -1,110 +1,226 @@
 from maya import cmds
 
+# These are the kinds of animation curves that are keyed over time, like the ones made when we set a key
+# Driven keys use curves too, but they are keyed against another attribute instead of time so we leave them alone
+TIME_CURVES = ['animCurveTL', 'animCurveTA', 'animCurveTT', 'animCurveTU']
+
+
 # It is important when programming, to split out our logic from our UI
 # This lets us call our tween code from other places without calling our UI, and also lets us test if its working properly
 def tween(percentage, obj=None, attrs=None, selection=True):
     """
-    This function will tween the keyed attributes on an object.
+    This function will tween the keyed attributes on one or many objects.
     Args:
         percentage (float): This is a mandatory argument (since it has no default) and will be the percentage to tween
-        obj (str): the name of the object to use. This is optional since it has a default value
+        obj (str or list): the name of the object to use, or a list of them. This is optional since it has a default value
         attrs (list): A list of the attributes to tween. This is optional since it has a default value
         selection (bool): Whether to use the selection or not. Again, optional because it has a default
+
+    Returns:
+        int: how many attributes were tweened
     """
     # We need to error early if we aren't given an object AND we are told not to use the selection
     if not obj and not selection:
         # We raise a ValueError saying we got nothing to work with
         raise ValueError("No object given to tween")
 
-    # If there is no object given, but selection must be true by now, we will get the current selection
+    # If there is no object given, but selection must be true by now, we will tween everything that's selected
     if not obj:
-        # We list the selection. sl is shorthand for selection. [0] is beacause we only care about the first item
-        obj = cmds.ls(sl=1)[0]
+        # We list the selection. sl is shorthand for selection
+        objects = cmds.ls(sl=1)
+    elif isinstance(obj, (list, tuple)):
+        objects = list(obj)
+    else:
+        # A single object is the same as a list with one object in it
+        objects = [obj]
 
-    # If we don't have a list of attrs to work with, we'll query which attributes are keyable
-    if not attrs:
-        attrs = cmds.listAttr(obj, keyable=True)
+    if not objects:
+        raise ValueError("Nothing selected to tween")
 
     # Now we need to get the current frame from Maya
     currentTime = cmds.currentTime(query=True)
 
-    # Now we have everything to start, lets loop through all the attributes
-    for attr in attrs:
-        # It's common to need the object and attribute together like pCube1.translateX so we prepare the full name before hand
-        attrFull = '%s.%s' % (obj, attr)
+    # Asking Maya one question at a time is slow when we have hundreds of attributes
+    # So we gather everything we need first, then work out all the values, and only then change the scene
+    plugs, previousValues, nextValues = getNeighbourValues(objects, currentTime, attrs)
+
+    # Now we can work out every new value at once
+    values = blend(previousValues, nextValues, percentage)
+
+    setKeys(plugs, values, currentTime)
+    return len(plugs)
+
+
+def getKeyedPlugs(objects, attrs=None):
+    """
+    Finds the keyed attributes of many objects at once
+    Args:
+        objects (list): the objects to look at
+        attrs (list): only look at these attributes. If not given, every keyed attribute is used
+
+    Returns:
+        list: a tuple of the attribute, like pCube1.translateX, and the animation curve that keys it for each of them
+    """
+    # We ask for the names of the animation curves on every object in one go, instead of checking attributes one by one
+    # Attributes that aren't keyed don't have curves, so this also skips them for us
+    kwargs = {'attribute': attrs} if attrs else {}
+    curves = cmds.keyframe(objects, query=True, name=True, **kwargs)
+    if not curves:
+        return []
+
+    # We only want the curves that are keyed over time
+    curves = cmds.ls(curves, type=TIME_CURVES)
+    if not curves:
+        return []
+
+    # Then we find which attribute each curve drives, again in one go
+    # connections=True gives us back pairs of the curve's output and the attribute it's connected to
+    # skipConversionNodes lets us see past the unitConversion nodes Maya puts in between curves and rotations
+    connections = cmds.listConnections(['%s.output' % curve for curve in curves], source=False, destination=True,
+                                       plugs=True, connections=True, skipConversionNodes=True) or []
+
+    # The list goes curve, attribute, curve, attribute, so we pair them up by stepping through it two at a time
+    return [(connections[i + 1], connections[i].split('.')[0]) for i in range(0, len(connections), 2)]
 
-        # We query what keyframes exist for that attribute
-        keyframes = cmds.keyframe(attrFull, query=True)
 
-        # If there are no keyframes, then it isn't keyed so we skip it
-        if not keyframes:
-            # We continue on to the next item in the loop
+def getNeighbourValues(objects, time, attrs=None):
+    """
+    Finds the values of the keys on either side of the given time, for every keyed attribute of many objects
+    Args:
+        objects (list): the objects to look at
+        time (float): the frame to find the keys around
+        attrs (list): only look at these attributes. If not given, every keyed attribute is used
+
+    Returns:
+        tuple: three lists of the same length, the attributes, the values of their previous keys and of their next keys
+    """
+    plugs = []
+    previousValues = []
+    nextValues = []
+
+    keyedPlugs = getKeyedPlugs(objects, attrs)
+
+    # The same curve can drive more than one attribute, so we make a list with each curve only once
+    curves = []
+    for plug, curve in keyedPlugs:
+        if curve not in curves:
+            curves.append(curve)
+    curveKeys = getKeys(curves)
+
+    for plug, curve in keyedPlugs:
+        # The keys are one flat list of time, value, time, value and so on
+        keys = curveKeys.get(curve)
+        if not keys:
             continue
 
-        # We create an empty list to hold the values of our previous keyframes
-        previousKeyframes = []
-        # We loop through all the keyframes
-        for k in keyframes:
-            # If they are less than our current frame we will add them to the list
-            if k < currentTime:
-                # We append the frame value to the list
-                previousKeyframes.append(k)
-
-        # This is the same as above but it uses a concept called list comprehension
-        # It lets us flatten all the logic we just used into a single line
-        # It says add every frame from keyframes if the frame is greater than the current time
-        laterKeyframes = [frame for frame in keyframes if frame > currentTime]
-
-        # If we have neither previous or later frames, then skip ahead
-        if not previousKeyframes and not laterKeyframes:
+        previousKey = None
+        nextKey = None
+        # The keys come back in order, so we can step through them and stop as soon as we're past the current time
+        for i in range(0, len(keys), 2):
+            frame, value = keys[i], keys[i + 1]
+            if frame < time:
+                previousKey = value
+            elif frame > time:
+                nextKey = value
+                break
+
+        # If we have neither previous or later keys, then skip ahead
+        if previousKey is None and nextKey is None:
             continue
 
-        # If we do have previous keyframes, we need to find the nearest one to us
-        if previousKeyframes:
-            # This will be the highest of the previous keyframes, so it can be found using max
-            previousFrame = max(previousKeyframes)
-        else:
-            # But if there are no previous keyframes, we'll set previousFrame to None to say we didn't find one
-            previousFrame = None
-
-        # Instead of doing a multiline if statement like above, we can do it in one line like here
-        # If there are laterKeyframes, we'll find the minimum value to get the closest
-        # Otherwise we'll set it to None to indicate we couldn't find it
-        nextFrame = min(laterKeyframes) if laterKeyframes else None
-
-        # If we didn't find it, we'll set previousFrame to be the same as the nextFrame.
-        # This helps simplify our logic later
-        if previousFrame is None:
-            previousFrame = nextFrame
-
-        # SImilar to the above if statement, we can condense it to a single line
-        nextFrame = previousFrame if nextFrame is None else nextFrame
-
-        # Now we query the values on the respective frames for this attribute
-        # Because we prepared the attrFull variable above, we can reuse it here
-        previousValue = cmds.getAttr(attrFull, time=previousFrame)
-        nextValue = cmds.getAttr(attrFull, time=nextFrame)
-
-        if nextFrame is None:
-            # If there is no nextFrame, then set our currentValue to the previousValue
-            currentValue = previousValue
-        elif previousFrame is None:
-            # if there is no previousFrame, set our currentValue to the nextValue
-            currentValue = nextValue
-        elif previousValue == nextValue:
-            # If they are both equal, then just pick one of them
-            currentValue = previousValue
-        else:
-            # If they are different, we calculate the tween value
-            difference = nextValue - previousValue
-            biasedDifference = (difference * percentage) / 100.0
-            currentValue = previousValue + biasedDifference
-
-        # Finally we set this value
-        # Sometimes Maya doesn't update the viewport when just setting a key so also do a setAttr
-        cmds.setAttr(attrFull, currentValue)
-        # Then finally set the key
-        cmds.setKeyframe(attrFull, time=currentTime, value=currentValue)
+        # If we only found one of them, we use it for both. This helps simplify our logic later
+        if previousKey is None:
+            previousKey = nextKey
+        if nextKey is None:
+            nextKey = previousKey
+
+        plugs.append(plug)
+        previousValues.append(previousKey)
+        nextValues.append(nextKey)
+
+    return plugs, previousValues, nextValues
+
+
+def getKeys(curves):
+    """
+    Gets the time and value of every key on many animation curves, with two queries however many curves there are
+    Args:
+        curves (list): the animation curves
+
+    Returns:
+        dict: a flat list of time, value, time, value and so on for each curve
+    """
+    if not curves:
+        return {}
+
+    # Asking about many curves at once gives us one flat list for all of them, in the order we gave the curves
+    # keyframeCount would only tell us how many keys there are in total, so we can't use it to split the list up.
+    # But every curve numbers its keys starting from 0, so each 0 in the indices is where the next curve's keys begin
+    indices = cmds.keyframe(curves, query=True, indexValue=True) or []
+    keys = cmds.keyframe(curves, query=True, timeChange=True, valueChange=True) or []
+
+    counts = []
+    for index in indices:
+        if index == 0 or not counts:
+            counts.append(0)
+        counts[-1] += 1
+
+    # A curve without any keys doesn't show up in the lists at all, and then we can't tell whose keys are whose.
+    # That hardly ever happens, so when it does we just ask about each curve on its own
+    if len(counts) != len(curves) or sum(counts) * 2 != len(keys):
+        return dict((curve, cmds.keyframe(curve, query=True, timeChange=True, valueChange=True) or [])
+                    for curve in curves)
+
+    result = {}
+    start = 0
+    for curve, count in zip(curves, counts):
+        result[curve] = keys[start:start + count * 2]
+        start += count * 2
+    return result
+
+
+def blend(previousValues, nextValues, percentage):
+    """
+    Works out the tweened values for many attributes at once
+    Args:
+        previousValues (list): the values of the previous keys
+        nextValues (list): the values of the next keys
+        percentage (float): how far to go from the previous values to the next ones, from 0 to 100
+
+    Returns:
+        list: the tweened values
+    """
+    # The percentage is the same for every attribute, so we only turn it into a fraction once
+    bias = percentage / 100.0
+    # When the previous and next values are the same, this gives back that same value
+    return [previous + (following - previous) * bias for previous, following in zip(previousValues, nextValues)]
+
+
+def setKeys(plugs, values, time):
+    """
+    Sets a key on many attributes, as a single undo
+    Args:
+        plugs (list): the attributes to key
+        values (list): the value to key each attribute with
+        time (float): the frame to key them on
+    """
+    if not plugs:
+        return
+
+    # We put every change in a single undo chunk, so that one undo takes back the whole tween instead of each attribute
+    cmds.undoInfo(openChunk=True, chunkName='tween')
+    # We also stop Maya from redrawing the viewport after every change, and let it draw once at the end
+    cmds.refresh(suspend=True)
+    try:
+        for plug, value in zip(plugs, values):
+            # Sometimes Maya doesn't update the viewport when just setting a key so also do a setAttr
+            cmds.setAttr(plug, value)
+            # Then finally set the key
+            cmds.setKeyframe(plug, time=time, value=value)
+    finally:
+        # We use finally so that even if something goes wrong, we never leave Maya unable to undo or redraw
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
 
 
 # Again we create a class to contain functions(also called methods) that relate to each other